@@ -0,0 +1,181 @@
+from functools import reduce
+import operator
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+
+from .models import AccessEntry
+
+# Поля M2M с выдачей доступа, атрибуты профиля сотрудника и области индекса доступа
+GRANT_FIELDS = (
+    ('allowed_employees', 'employee_id', AccessEntry.SCOPE_EMPLOYEE),
+    ('allowed_divisions', 'division_id', AccessEntry.SCOPE_DIVISION),
+    ('allowed_departments', 'department_id', AccessEntry.SCOPE_DEPARTMENT),
+    ('allowed_clusters', 'cluster_id', AccessEntry.SCOPE_CLUSTER),
+)
+
+# Объекты с уровнем допуска не выше этого доступны всем, включая анонимов
+PUBLIC_CLEARANCE = 1
+
+
+class AccessProfile(NamedTuple):
+    employee_id: int
+    clearance: Optional[int]
+    division_id: int
+    department_id: int
+    cluster_id: int
+    # label_lower моделей, объекты которых выданы сотруднику персонально (allowed_employees)
+    personal_grants: tuple = ()
+
+
+def personal_grant_fields():
+    """Поля allowed_employees всех моделей с персональной выдачей доступа."""
+    from employees.models import Employee
+
+    return [relation.field for relation in Employee._meta.related_objects
+            if relation.many_to_many and relation.field.name == 'allowed_employees']
+
+
+def get_access_profile(user) -> Optional[AccessProfile]:
+    """Плоский профиль доступа пользователя, загружаемый одним запросом."""
+    if user is None or not user.is_authenticated:
+        return None
+
+    if hasattr(user, '_access_profile'):
+        return user._access_profile
+
+    from employees.models import Employee
+
+    grants = {
+        field.model._meta.label_lower: Exists(field.remote_field.through.objects.filter(
+            **{f'{field.m2m_reverse_field_name()}_id': OuterRef('pk')}
+        ))
+        for field in personal_grant_fields()
+    }
+    row = Employee.objects.filter(user_id=user.id).annotate(
+        **{f'grant_{index}': grant for index, grant in enumerate(grants.values())}
+    ).values_list(
+        'id',
+        'clearance_level__number',
+        'division_id',
+        'division__department_id',
+        'division__department__cluster_id',
+        *(f'grant_{index}' for index in range(len(grants))),
+    ).first()
+
+    profile = None
+    if row:
+        personal_grants = tuple(label for label, granted in zip(grants, row[5:]) if granted)
+        profile = AccessProfile(*row[:5], personal_grants=personal_grants)
+    user._access_profile = profile
+    return profile
+
+
+def _grant_rows(model, field_name):
+    """Строки through-таблицы allowed_* для внешнего объекта и имя целевого поля."""
+    field = model._meta.get_field(field_name)
+    rows = field.remote_field.through.objects.filter(
+        **{field.m2m_field_name(): OuterRef('pk')}
+    )
+    return rows, field.m2m_reverse_field_name()
+
+
+def _index_entries(model, profile: AccessProfile):
+    """Записи индекса доступа для типа объекта, подходящие профилю сотрудника."""
+    scopes = Q(scope=AccessEntry.SCOPE_ALL)
+    for _, profile_attr, scope in GRANT_FIELDS:
+        scopes |= Q(scope=scope, scope_id=getattr(profile, profile_attr))
+    return AccessEntry.objects.filter(scopes, object_type=model._meta.label_lower)
+
+
+def visibility_q(model, profile: Optional[AccessProfile]) -> Q:
+    """
+    Условие видимости объектов с required_clearance и allowed_* для профиля.
+    Повторяет правила HasRequiredClearanceLevel в виде одного SQL-предиката.
+    При включенном ACCESS_CONTROL_INDEX проверяет одну таблицу AccessEntry вместо четырех M2M.
+    """
+    public = Q(required_clearance__number__lte=PUBLIC_CLEARANCE)
+
+    if profile is None or profile.clearance is None:
+        return public
+
+    if settings.ACCESS_CONTROL_INDEX:
+        entries = _index_entries(model, profile).filter(
+            object_id=OuterRef('pk'),
+            required_clearance__lte=profile.clearance,
+        )
+        return public | Q(Exists(entries))
+
+    unrestricted = []
+    granted = []
+    for field_name, profile_attr, _ in GRANT_FIELDS:
+        rows, target = _grant_rows(model, field_name)
+        unrestricted.append(~Exists(rows))
+        granted.append(Exists(rows.filter(**{target: getattr(profile, profile_attr)})))
+
+    # Если allowed_* пустые - доступно всем с нужным УД, иначе нужно попасть хотя бы в один список
+    allowed = Q(reduce(operator.and_, unrestricted)) | Q(reduce(operator.or_, granted))
+
+    return public | (Q(required_clearance__number__lte=profile.clearance) & allowed)
+
+
+def resolve_grant(obj, profile: AccessProfile) -> Optional[str]:
+    """
+    Проверка списков allowed_* для объекта. Возвращает причину выдачи доступа
+    или None, если сотрудник не входит ни в один из непустых списков.
+
+    Использует связи, уже загруженные prefetch_related, иначе делает один запрос.
+    """
+    prefetched = getattr(obj, '_prefetched_objects_cache', {})
+
+    if (settings.ACCESS_CONTROL_INDEX
+            and not all(field_name in prefetched for field_name, _, _ in GRANT_FIELDS)):
+        scopes = set(_index_entries(type(obj), profile).filter(
+            object_id=obj.pk).values_list('scope', flat=True))
+        if AccessEntry.SCOPE_ALL in scopes:
+            return 'has_required_clearance'
+        for field_name, _, scope in GRANT_FIELDS:
+            if scope in scopes:
+                return f'in_{field_name}'
+        return None
+
+    if all(field_name in prefetched for field_name, _, _ in GRANT_FIELDS):
+        flags = {}
+        for field_name, profile_attr, _ in GRANT_FIELDS:
+            ids = {related.pk for related in prefetched[field_name]}
+            flags[f'{field_name}_any'] = bool(ids)
+            flags[f'{field_name}_match'] = getattr(profile, profile_attr) in ids
+    else:
+        model = type(obj)
+        annotations = {}
+        for field_name, profile_attr, _ in GRANT_FIELDS:
+            rows, target = _grant_rows(model, field_name)
+            annotations[f'{field_name}_any'] = Exists(rows)
+            annotations[f'{field_name}_match'] = Exists(
+                rows.filter(**{target: getattr(profile, profile_attr)})
+            )
+        flags = model._default_manager.filter(pk=obj.pk).values(**annotations).first() or {}
+
+    if not any(flags.get(f'{field_name}_any') for field_name, _, _ in GRANT_FIELDS):
+        return 'has_required_clearance'
+
+    for field_name, _, _ in GRANT_FIELDS:
+        if flags.get(f'{field_name}_match'):
+            return f'in_{field_name}'
+
+    return None
+
+
+def access_fingerprint(model, profile: Optional[AccessProfile]) -> str:
+    """
+    Класс доступа: пользователи с одинаковым отпечатком видят одинаковые выборки model.
+    Сотрудник включается в отпечаток, только если ему выдан персональный доступ к объектам model
+    (по профилю, без запроса к БД).
+    """
+    if profile is None or profile.clearance is None:
+        return 'public'
+
+    has_personal_grants = model._meta.label_lower in profile.personal_grants
+    return (f"c{profile.clearance}:k{profile.cluster_id}:d{profile.department_id}"
+            f":v{profile.division_id}:e{profile.employee_id if has_personal_grants else '-'}")
@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from .access import GRANT_FIELDS
+from .models import AccessEntry
+
+# Модели, для которых ведется индекс доступа
+INDEXED_MODELS = ('documentation.Documentation', 'research.Research')
+
+
+def build_entries(entry_model, model, ids=None, batch_size=1000):
+    """
+    Пересчитывает записи индекса доступа для объектов model (всех или с pk из ids).
+    Миграция 0002 заполняет индекс собственной копией этой логики.
+    """
+    object_type = model._meta.label_lower
+    objects = model._default_manager.all()
+    if ids is not None:
+        objects = objects.filter(pk__in=ids)
+
+    clearance = dict(objects.values_list('pk', 'required_clearance__number'))
+
+    grants = defaultdict(list)
+    for field_name, _, scope in GRANT_FIELDS:
+        field = model._meta.get_field(field_name)
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        rows = field.remote_field.through._default_manager.all()
+        if ids is not None:
+            rows = rows.filter(**{f'{source}_id__in': list(clearance)})
+        for object_id, scope_id in rows.values_list(f'{source}_id', f'{target}_id'):
+            grants[object_id].append((scope, scope_id))
+
+    # Объект без ограничений доступен всем с нужным УД
+    entries = [
+        entry_model(object_type=object_type, object_id=pk, required_clearance=level,
+                    scope=scope, scope_id=scope_id)
+        for pk, level in clearance.items()
+        for scope, scope_id in grants.get(pk) or [(AccessEntry.SCOPE_ALL, None)]
+    ]
+
+    with transaction.atomic():
+        stale = entry_model._default_manager.filter(object_type=object_type)
+        if ids is not None:
+            stale = stale.filter(object_id__in=ids)
+        stale.delete()
+        entry_model._default_manager.bulk_create(entries, batch_size=batch_size)
+
+    return len(entries)
+
+
+def sync_access_entries(model, ids):
+    return build_entries(AccessEntry, model, ids=list(ids))
+
+
+def schedule_sync(model, ids):
+    """Пересчитывает индекс после коммита, когда все изменения M2M уже применены."""
+    ids = list(ids)
+    if ids:
+        transaction.on_commit(lambda: sync_access_entries(model, ids))
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import AccessEvent
+from .pagination import EstimatedCountPaginator
+
+
+@admin.register(AccessEvent)
+class AccessEventAdmin(admin.ModelAdmin):
+    list_display = ('timestamp', 'username', 'action', 'object_type', 'object_id', 'object_title', 'required_clearance', 'ip')
+    list_filter = ('action', 'object_type')
+    search_fields = ('=username',)
+    date_hierarchy = 'timestamp'
+    # Оценка числа строк вместо COUNT(*) по всему журналу
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Журнал только для чтения: записи добавляет api.audit_trail
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -3,4 +3,11 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api'
\ No newline at end of file
+    name = 'api'
+
+    def ready(self):
+        from .signals import (connect_access_index_signals, connect_cache_invalidation_signals,
+                              connect_claims_revocation_signals)
+        connect_access_index_signals()
+        connect_claims_revocation_signals()
+        connect_cache_invalidation_signals()
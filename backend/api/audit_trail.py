@@ -0,0 +1,200 @@
+import atexit
+import ipaddress
+import logging
+import os
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+from django.utils import timezone
+
+from .metrics import ACCESS_EVENTS_DROPPED
+
+logger = logging.getLogger('audit')
+
+TABLE = 'api_accessevent'
+
+
+def month_start(moment, offset=0):
+    month_index = moment.year * 12 + moment.month - 1 + offset
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    return f'{TABLE}_y{month.year}m{month.month:02d}'
+
+
+def ensure_partitions(first_month, months=1):
+    """Создает месячные секции таблицы AccessEvent начиная с месяца first_month."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for offset in range(months):
+            start, end = month_start(first_month, offset), month_start(first_month, offset + 1)
+            try:
+                cursor.execute(
+                    f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(partition_name(start))} '
+                    f'PARTITION OF {connection.ops.quote_name(TABLE)} FOR VALUES FROM (%s) TO (%s)',
+                    [start, end],
+                )
+            except DatabaseError:
+                # Строки за этот месяц уже лежат в секции по умолчанию: новые записи пойдут туда же
+                logger.warning("Access events partition was not created", exc_info=True, extra={
+                    'event_type': 'access_events_partition_error', 'partition': partition_name(start),
+                })
+
+
+def drop_partitions_before(month):
+    """Удаляет секции за месяцы раньше month. Возвращает имена удаленных секций."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s AND child.relname ~ '_y[0-9]{4}m[0-9]{2}$'",
+            [TABLE],
+        )
+        boundary = partition_name(month_start(month))
+        # Имена секций сравниваются как строки: yYYYYmMM упорядочены по времени
+        names = sorted(name for name, in cursor.fetchall() if name < boundary)
+        for name in names:
+            cursor.execute(f'DROP TABLE {connection.ops.quote_name(name)}')
+    return names
+
+
+def _client_ip(request):
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    value = forwarded.split(',')[0].strip() if forwarded else request.META.get('REMOTE_ADDR')
+    try:
+        return str(ipaddress.ip_address(value)) if value else None
+    except ValueError:
+        return None
+
+
+class AccessEventBuffer:
+    """
+    Буфер записей журнала обращений в памяти воркера. Записи сохраняются одним bulk_create
+    в фоновом потоке: при накоплении batch_size записей или раз в flush_interval секунд.
+    В буфере не больше max_size записей: пока БД недоступна или отвечает медленно, более
+    старые отбрасываются. Отброшенные считаются в dropped и метрике access_events_dropped,
+    поток сброса пишет о них предупреждение.
+    """
+
+    def __init__(self, batch_size, flush_interval, max_size):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._events = []
+        self._pid = None
+        self.dropped = 0
+        self._reported = 0
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._events = []
+            thread = threading.Thread(target=self._run, name='access-event-flusher', daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def add(self, event):
+        if self._pid != os.getpid():
+            self._start()
+        with self._lock:
+            self._events.append(event)
+            self._trim()
+            full = len(self._events) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _trim(self):
+        # Вызывается под self._lock
+        overflow = len(self._events) - self.max_size
+        if overflow > 0:
+            del self._events[:overflow]
+            self.dropped += overflow
+            ACCESS_EVENTS_DROPPED.inc(overflow)
+
+    def report_dropped(self):
+        dropped = self.dropped
+        if dropped > self._reported:
+            logger.warning("Access events buffer overflow, events dropped", extra={
+                'event_type': 'access_events_dropped', 'dropped': dropped - self._reported,
+                'dropped_total': dropped,
+            })
+            self._reported = dropped
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        from .models import AccessEvent
+
+        self.report_dropped()
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return
+
+        close_old_connections()
+        try:
+            # Секции создает manage.py access_event_partitions по расписанию: DDL в воркере
+            # блокировал бы таблицу. Записи месяца без секции попадают в секцию по умолчанию
+            AccessEvent.objects.bulk_create(
+                [AccessEvent(**event) for event in events], batch_size=self.batch_size,
+            )
+        except Exception:
+            logger.exception("Access events flush failed", extra={
+                'event_type': 'access_events_flush_error', 'count': len(events),
+            })
+            with self._lock:
+                self._events[:0] = events
+                self._trim()
+        finally:
+            close_old_connections()
+
+    def stop(self):
+        if self._pid == os.getpid():
+            self.flush()
+
+
+_buffer = None
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        _buffer = AccessEventBuffer(
+            settings.ACCESS_EVENTS_BATCH_SIZE,
+            settings.ACCESS_EVENTS_FLUSH_INTERVAL,
+            settings.ACCESS_EVENTS_BUFFER_MAX_SIZE,
+        )
+        atexit.register(_buffer.stop)
+    return _buffer
+
+
+def record_access_event(request, obj, object_type, action, duration_ms=None):
+    """Ставит обращение к объекту в буфер журнала AccessEvent."""
+    if not settings.ACCESS_EVENTS_ENABLED:
+        return
+    user = request.user if request.user.is_authenticated else None
+    required_clearance = getattr(obj, 'required_clearance', None) if obj is not None else None
+    get_buffer().add({
+        'timestamp': timezone.now(),
+        'user_id': user.id if user else None,
+        'username': user.username if user else '',
+        'action': action,
+        'object_type': object_type,
+        'object_id': obj.pk if obj is not None else None,
+        'object_title': getattr(obj, 'title', '')[:100] if obj is not None else '',
+        'required_clearance': getattr(required_clearance, 'number', None),
+        'ip': _client_ip(request),
+        'duration_ms': duration_ms,
+    })
@@ -1,12 +1,16 @@
 import logging
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from django.utils.timezone import now
+from .instrumentation import timed
+from .tokens import ClaimsUser, claims_revoked, has_access_claims
 
 logger = logging.getLogger('api.security')
 
 class AuditedJWTAuthentication(JWTAuthentication):
     
+    @timed('auth')
     def authenticate(self, request):
         try:
             result = super().authenticate(request)
@@ -45,4 +49,20 @@ class AuditedJWTAuthentication(JWTAuthentication):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
             return x_forwarded_for.split(',')[0]
-        return request.META.get('REMOTE_ADDR')
\ No newline at end of file
+        return request.META.get('REMOTE_ADDR')
+
+
+class ClaimsJWTAuthentication(AuditedJWTAuthentication):
+    """
+    Собирает пользователя из утверждений access-токена без запросов к БД.
+    Токены без утверждений или с отозванными утверждениями проверяются по БД.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+
+        if (user_id is not None and has_access_claims(validated_token)
+                and not claims_revoked(validated_token, user_id)):
+            return ClaimsUser(validated_token)
+
+        return super().get_user(validated_token)
@@ -0,0 +1,241 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from .access import access_fingerprint, get_access_profile
+from .metrics import RESPONSE_CACHE
+
+# Пространства имен кеша и модели, изменение которых их инвалидирует
+CACHE_NAMESPACES = {
+    'org': ('employees.Cluster', 'employees.Department', 'employees.Division',
+            'employees.Position', 'employees.ClearanceLevel'),
+    'employees': ('employees.Employee', 'employees.Cluster', 'employees.Department',
+                  'employees.Division', 'employees.Position', 'employees.ClearanceLevel'),
+    'documentation': ('documentation.Documentation', 'documentation.DocumentType',
+                      'employees.Employee', 'employees.ClearanceLevel', 'employees.Cluster',
+                      'employees.Department', 'employees.Division'),
+    'document_types': ('documentation.DocumentType',),
+    'research': ('research.Research', 'research.ResearchStatus',
+                 'employees.Employee', 'employees.ClearanceLevel', 'employees.Cluster',
+                 'employees.Department', 'employees.Division'),
+    'research_statuses': ('research.ResearchStatus',),
+}
+
+VERSION_KEY = 'cache_version:{namespace}'
+
+# Блокировка пересчета ответа одним воркером. Остальные отдают устаревшую запись, а при
+# пустом кеше ждут недолго: дольше выгоднее посчитать ответ самим, чем держать воркер
+LOCK_TIMEOUT = 30
+LOCK_WAIT_TIMEOUT = 0.15
+LOCK_WAIT_INTERVAL = 0.025
+
+# Локальный уровень кеша в каждом воркере: готовые ответы справочников (cache_response(local=True))
+# и версии пространств имен. Строки справочников отдельно не кешируются: их читает только
+# пересчет ответа, который и так выполняется при промахе кеша ответов
+LOCAL_CACHE_MAX_ENTRIES = 1024
+LOCAL_CACHE_TIMEOUT = 60 * 5
+# Как долго воркер доверяет локально закешированной версии пространства имен
+LOCAL_VERSION_TIMEOUT = 5
+
+
+class LocalLRUCache:
+    """Ограниченный по числу записей LRU-кеш процесса с временем жизни записей."""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalLRUCache(LOCAL_CACHE_MAX_ENTRIES, LOCAL_CACHE_TIMEOUT)
+
+
+def _initial_version():
+    # Версия, вытесненная из Redis, не должна совпасть с уже использованной
+    return int(time.time() * 1000)
+
+
+def get_namespace_versions(namespaces, local=False):
+    keys = [VERSION_KEY.format(namespace=namespace) for namespace in namespaces]
+
+    versions = {}
+    if local:
+        for key in keys:
+            version = local_cache.get(key)
+            if version is not None:
+                versions[key] = version
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        versions.update(cache.get_many(missing))
+
+    for key in missing:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key, 0)
+        if local:
+            local_cache.set(key, versions[key], LOCAL_VERSION_TIMEOUT)
+
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_namespace(namespace):
+    """Делает недействительными все ключи пространства имен без их перебора."""
+    key = VERSION_KEY.format(namespace=namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, _initial_version(), None):
+            cache.incr(key)
+    # Остальные воркеры увидят новую версию не позже LOCAL_VERSION_TIMEOUT
+    local_cache.delete(key)
+
+
+def bump_namespaces_on_commit(namespaces):
+    namespaces = tuple(namespaces)
+    transaction.on_commit(lambda: [bump_namespace(namespace) for namespace in namespaces])
+
+
+def _view_name(view):
+    return getattr(view, 'basename', None) or type(view).__name__
+
+
+def response_cache_key(view, request, namespaces, access_aware=False, local=False):
+    # Порядок параметров запроса не должен порождать разные ключи
+    query = '&'.join(f'{key}={value}' for key, values in sorted(request.GET.lists())
+                     for value in sorted(values))
+    query_hash = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+
+    if access_aware:
+        model = view.get_queryset().model
+        access = access_fingerprint(model, get_access_profile(request.user))
+    else:
+        access = 'all'
+
+    name = _view_name(view)
+    versions = get_namespace_versions(namespaces, local=local)
+
+    return f'response_cache:{name}:{versions}:{access}:{query_hash}'
+
+
+def _store_response(key, response, timeout, stale_timeout, local):
+    if response.status_code == 200:
+        entry = {'data': response.data, 'expires': time.time() + timeout}
+        cache.set(key, entry, timeout + stale_timeout)
+        if local:
+            local_cache.set(key, entry, min(timeout, LOCAL_CACHE_TIMEOUT))
+    return response
+
+
+def get_cached_entry(key, local):
+    """Свежая запись из локального уровня, иначе запись из Redis (возможно устаревшая)."""
+    if local:
+        entry = local_cache.get(key)
+        if entry is not None and entry['expires'] > time.time():
+            return entry
+
+    entry = cache.get(key)
+    if local and entry is not None:
+        remaining = entry['expires'] - time.time()
+        if remaining > 0:
+            local_cache.set(key, entry, min(remaining, LOCAL_CACHE_TIMEOUT))
+    return entry
+
+
+def _wait_for_entry(key, lock_key):
+    deadline = time.monotonic() + LOCK_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_WAIT_INTERVAL)
+        values = cache.get_many([key, lock_key])
+        entry = values.get(key)
+        # Блокировка снята без записи (ошибка или ответ не 200): ждать больше нечего
+        if entry is not None or lock_key not in values:
+            return entry
+    return None
+
+
+def cache_response(timeout, namespaces, access_aware=False, stale_timeout=None, local=False):
+    """
+    Кеширует данные ответа метода представления DRF.
+    Ключ включает версии пространств имен, которые сбрасываются сигналами моделей.
+    При access_aware ключ включает класс доступа пользователя вместо URL и заголовков,
+    поэтому пользователи с одинаковой видимостью делят записи кеша.
+
+    После истечения timeout запись еще stale_timeout секунд отдается как устаревшая,
+    пока один воркер под блокировкой пересчитывает ответ. Без записи остальные воркеры
+    ждут ее не дольше LOCK_WAIT_TIMEOUT и затем считают ответ сами.
+
+    При local записи дополнительно хранятся в LRU-кеше процесса (для справочных данных).
+    """
+    if stale_timeout is None:
+        stale_timeout = timeout
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_cache_key(self, request, namespaces, access_aware, local)
+            view_name = _view_name(self)
+
+            entry = get_cached_entry(key, local)
+            if entry is not None and entry['expires'] > time.time():
+                RESPONSE_CACHE.labels(view_name, 'hit').inc()
+                return Response(entry['data'])
+
+            lock_key = f'{key}:lock'
+            if cache.add(lock_key, 1, LOCK_TIMEOUT):
+                RESPONSE_CACHE.labels(view_name, 'miss').inc()
+                try:
+                    response = method(self, request, *args, **kwargs)
+                    return _store_response(key, response, timeout, stale_timeout, local)
+                finally:
+                    cache.delete(lock_key)
+
+            # Ответ уже пересчитывает другой воркер: устаревшая запись отдается без ожидания
+            if entry is not None:
+                RESPONSE_CACHE.labels(view_name, 'stale').inc()
+                return Response(entry['data'])
+            entry = _wait_for_entry(key, lock_key)
+            if entry is not None:
+                RESPONSE_CACHE.labels(view_name, 'wait').inc()
+                return Response(entry['data'])
+
+            RESPONSE_CACHE.labels(view_name, 'miss').inc()
+            response = method(self, request, *args, **kwargs)
+            return _store_response(key, response, timeout, stale_timeout, local)
+        return wrapper
+    return decorator
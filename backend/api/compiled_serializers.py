@@ -0,0 +1,199 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .instrumentation import timed
+
+# Поля DRF, которые выводят значение из БД без преобразования
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+# Скомпилированные планы по (класс сериализатора, ?fields=, ?expand=)
+COMPILED_CACHE_MAX_ENTRIES = 256
+_compiled_cache = {}
+
+
+class NotCompilable(Exception):
+    """Поле сериализатора нельзя вывести из строк .values()."""
+
+
+class CompiledSerializer:
+    """
+    План вывода сериализатора, скомпилированный в функции над строками .values():
+    значения связанных объектов берутся одним запросом с соединениями,
+    словари ответа собираются без полей DRF.
+    """
+
+    def __init__(self, values, annotations, builders):
+        self.values = values
+        self.annotations = annotations
+        self.builders = builders
+
+    def values_queryset(self, queryset):
+        # Аннотации (например, фрагмент поиска) есть не в каждом запросе
+        annotations = [name for name in self.annotations if name in queryset.query.annotations]
+        return queryset.prefetch_related(None).values(*self.values, *annotations)
+
+    @timed('serialize')
+    def to_representation(self, rows, request):
+        builders = self.builders
+        return [{name: build(row, request) for name, build in builders} for row in rows]
+
+
+def _join(prefix, path):
+    return f'{prefix}__{path}' if prefix else path
+
+
+def _resolve(model, source):
+    """Путь .values() для источника поля и модель, на которую он указывает."""
+    parts = source.split('.')
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            raise NotCompilable(f'{model.__name__}.{part} не является полем модели')
+        if field.many_to_many or field.one_to_many:
+            raise NotCompilable(f'{model.__name__}.{part} - связь ко многим')
+        if field.is_relation:
+            model = field.related_model
+        elif index != len(parts) - 1:
+            raise NotCompilable(source)
+    return '__'.join(parts), field, model
+
+
+def _value_getter(key, field):
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return lambda row, request: row[key]
+
+    # Несвязанная копия поля: план переживает запрос, контекст которого хранит исходное поле
+    to_representation = type(field)(*field._args, **field._kwargs).to_representation
+
+    def get(row, request):
+        value = row[key]
+        return None if value is None else to_representation(value)
+    return get
+
+
+def _file_getter(key, model_field, field):
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def get(row, request):
+        name = row[key]
+        if not name:
+            return None
+        if not use_url:
+            return name
+        url = model_field.storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return get
+
+
+def _function_getter(keys, function):
+    if function is None:
+        key, = keys
+        return lambda row, request: row.get(key)
+
+    def get(row, request):
+        values = [row.get(key) for key in keys]
+        return None if None in values else function(*values)
+    return get
+
+
+def _nested_getter(key, builders):
+    def get(row, request):
+        if row[key] is None:
+            return None
+        return {name: build(row, request) for name, build in builders}
+    return get
+
+
+def compile_serializer(serializer, model=None, prefix=''):
+    """
+    Компилирует поля сериализатора (уже с учетом ?fields= и ?expand=).
+    Значения, которых нет среди полей модели (свойства, методы), описываются в
+    Meta.values_fields: {поле: (пути .values(), функция от значений или None)}.
+    """
+    meta = serializer.Meta
+    model = model or meta.model
+    values_fields = getattr(meta, 'values_fields', {})
+    values, annotations, builders = [], [], []
+
+    for name, field in serializer.fields.items():
+        if name in values_fields:
+            paths, function = values_fields[name]
+            keys = []
+            for path in paths:
+                key = _join(prefix, path)
+                try:
+                    _resolve(model, path.replace('__', '.'))
+                    values.append(key)
+                except NotCompilable:
+                    if prefix:
+                        raise
+                    annotations.append(key)
+                keys.append(key)
+            builders.append((name, _function_getter(keys, function)))
+            continue
+
+        if (isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField,
+                               serializers.SerializerMethodField))
+                or field.source == '*'):
+            raise NotCompilable(name)
+
+        path, model_field, related_model = _resolve(model, field.source)
+        key = _join(prefix, path)
+        values.append(key)
+
+        if isinstance(field, serializers.BaseSerializer):
+            nested = compile_serializer(field, related_model, key)
+            values.extend(nested.values)
+            builders.append((name, _nested_getter(key, nested.builders)))
+        elif isinstance(model_field, models.FileField):
+            builders.append((name, _file_getter(key, model_field, field)))
+        else:
+            builders.append((name, _value_getter(key, field)))
+
+    return CompiledSerializer(list(dict.fromkeys(values)), annotations, builders)
+
+
+class CompiledListMixin:
+    """
+    Список через .values() и скомпилированный план сериализатора вместо
+    поштучной сериализации полями DRF. Если план не строится (поля ко многим,
+    методы без Meta.values_fields), используется обычный путь DRF.
+    """
+    compiled_serializer = None
+
+    def get_compiled_serializer(self):
+        serializer_class = self.get_serializer_class()
+        params = self.request.query_params
+        key = (serializer_class, params.get('fields'), params.get('expand'))
+
+        if key not in _compiled_cache:
+            if len(_compiled_cache) >= COMPILED_CACHE_MAX_ENTRIES:
+                _compiled_cache.clear()
+            try:
+                _compiled_cache[key] = compile_serializer(self.get_serializer())
+            except NotCompilable:
+                _compiled_cache[key] = None
+        return _compiled_cache[key]
+
+    def list(self, request, *args, **kwargs):
+        self.compiled_serializer = self.get_compiled_serializer()
+        if self.compiled_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.compiled_serializer.values_queryset(queryset)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.compiled_serializer.to_representation(page, request))
+        return Response(self.compiled_serializer.to_representation(queryset, request))
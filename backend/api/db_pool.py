@@ -0,0 +1,27 @@
+from django.db import connections
+
+try:
+    from psycopg_pool import PoolTimeout
+except ImportError:  # драйвер без psycopg_pool: пул недоступен, таймаутов пула не бывает
+    PoolTimeout = None
+
+POOL_TIMEOUT_MESSAGE = 'Сервис перегружен, повторите запрос позже'
+
+
+def database_pools():
+    """(алиас, пул psycopg_pool) для подключений с OPTIONS['pool']."""
+    for connection in connections.all():
+        if connection.vendor == 'postgresql' and connection.settings_dict['OPTIONS'].get('pool'):
+            pool = connection.pool
+            if pool is not None:
+                yield connection.alias, pool
+
+
+def is_pool_timeout(exc):
+    """Запрос не дождался соединения из пула за DB_POOL_TIMEOUT секунд."""
+    # Django оборачивает ошибку драйвера в django.db.OperationalError, исходная - в __cause__
+    while exc is not None and PoolTimeout is not None:
+        if isinstance(exc, PoolTimeout):
+            return True
+        exc = exc.__cause__
+    return False
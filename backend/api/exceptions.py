@@ -3,14 +3,30 @@ import logging
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import Throttled
 from django.conf import settings
+from .access import get_access_profile
+from .db_pool import POOL_TIMEOUT_MESSAGE, is_pool_timeout
+from .metrics import THROTTLED_REQUESTS
 
 logger = logging.getLogger('api')
 
 def custom_exception_handler(exc, context):
     response = exception_handler(exc, context)
     request = context.get('request')
+
+    if isinstance(exc, Throttled):
+        THROTTLED_REQUESTS.labels(getattr(context.get('view'), 'throttle_scope', None) or 'default').inc()
     
+    if response is None and is_pool_timeout(exc):
+        logger.warning("Нет свободного соединения в пуле БД", extra={'event_type': 'db_pool_timeout'})
+        return Response({
+            'error': True,
+            'type': 'service_unavailable',
+            'message': POOL_TIMEOUT_MESSAGE
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': str(settings.DB_POOL_RETRY_AFTER)})
+
     if response is None:
         user_info = f"user:{request.user.username}" if request and request.user.is_authenticated else "user:anonymous"
         logger.error(
@@ -64,7 +80,7 @@ def custom_exception_handler(exc, context):
         
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             try:
-                user_clearance = request.user.employee.clearance_level.number
+                user_clearance = get_access_profile(request.user).clearance
                 error_data['details'] = {
                     'user_clearance': user_clearance,
                     'required_clearance': 'недостаточно'
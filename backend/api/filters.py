@@ -0,0 +1,166 @@
+from functools import reduce
+import operator
+
+from django.contrib.postgres.search import (SearchHeadline, SearchQuery, SearchRank,
+                                            TrigramWordSimilarity)
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+from .access import get_access_profile, visibility_q
+from .transliteration import transliteration_variants
+
+# Конфигурация полнотекстового поиска Postgres, совпадает с выражением search_vector моделей
+SEARCH_CONFIG = 'russian'
+
+
+class ClearanceFilterBackend(filters.BaseFilterBackend):
+    """
+    Оставляет в выборке только объекты, доступные пользователю
+    по уровню допуска и спискам allowed_*.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        profile = get_access_profile(request.user)
+        return queryset.filter(visibility_q(queryset.model, profile))
+
+
+class NameSearchFilter(filters.SearchFilter):
+    """
+    Поиск по подстроке в search_fields. При ?search_mode=fuzzy поля дополнительно
+    сравниваются по триграммному сходству (pg_trgm) с учетом опечаток и транслитерации,
+    а результаты сортируются по сходству.
+    Поля через M2M проверяются подзапросом EXISTS, поэтому строки не размножаются.
+    """
+    search_mode_param = 'search_mode'
+    fuzzy_mode = 'fuzzy'
+
+    def is_fuzzy(self, request):
+        return request.query_params.get(self.search_mode_param) == self.fuzzy_mode
+
+    def _lookups_condition(self, orm_lookups, variants, fuzzy):
+        conditions = []
+        for orm_lookup in orm_lookups:
+            lookups = [orm_lookup]
+            if fuzzy:
+                field_path = orm_lookup.rsplit(LOOKUP_SEP, 1)[0]
+                lookups.append(f'{field_path}{LOOKUP_SEP}trigram_word_similar')
+            conditions.extend(Q(**{lookup: variant}) for lookup in lookups for variant in variants)
+        return reduce(operator.or_, conditions, Q())
+
+    def get_search_condition(self, queryset, search_fields, search_terms, fuzzy):
+        """Каждое слово запроса должно найтись хотя бы в одном из полей."""
+        direct, through_m2m = [], []
+        for search_field in search_fields:
+            lookup = self.construct_search(str(search_field), queryset)
+            if self.must_call_distinct(queryset, [search_field]):
+                through_m2m.append(lookup)
+            else:
+                direct.append(lookup)
+
+        term_conditions = []
+        for term in search_terms:
+            variants = transliteration_variants(term) if fuzzy else [term]
+            condition = self._lookups_condition(direct, variants, fuzzy)
+            if through_m2m:
+                rows = queryset.model._default_manager.filter(
+                    self._lookups_condition(through_m2m, variants, fuzzy), pk=OuterRef('pk'),
+                )
+                condition |= Q(Exists(rows))
+            term_conditions.append(condition)
+        return reduce(operator.and_, term_conditions)
+
+    def get_similarity(self, queryset, search_fields, search_terms):
+        """Сумма по словам запроса наибольшего сходства с полями без M2M."""
+        field_paths = [
+            self.construct_search(str(search_field), queryset).rsplit(LOOKUP_SEP, 1)[0]
+            for search_field in search_fields
+            if not self.must_call_distinct(queryset, [search_field])
+        ]
+        if not field_paths:
+            return None
+
+        term_similarities = []
+        for term in search_terms:
+            similarities = [TrigramWordSimilarity(variant, field_path)
+                            for variant in transliteration_variants(term)
+                            for field_path in field_paths]
+            term_similarities.append(
+                similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+            )
+        return reduce(operator.add, term_similarities)
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        fuzzy = self.is_fuzzy(request)
+        queryset = queryset.filter(
+            self.get_search_condition(queryset, search_fields, search_terms, fuzzy)
+        )
+
+        similarity = self.get_similarity(queryset, search_fields, search_terms) if fuzzy else None
+        if similarity is not None:
+            queryset = queryset.annotate(search_similarity=similarity)
+            queryset = queryset.order_by('-search_similarity', *queryset.query.order_by)
+        return queryset
+
+
+class FullTextSearchFilter(NameSearchFilter):
+    """
+    Полнотекстовый поиск по индексированному полю search_vector (заголовок и содержимое)
+    с ранжированием по релевантности. Поля search_fields (имена авторов и т.п., кроме полей
+    search_vector) ищутся по подстроке, каждое отдельной веткой UNION. Для списка добавляется
+    фрагмент содержимого с подсвеченными совпадениями в аннотации search_headline.
+    """
+    vector_field = 'search_vector'
+    headline_field = 'content'
+
+    def get_matches(self, queryset, query, search_fields, search_terms, fuzzy):
+        """
+        pk объектов, найденных по search_vector или по одному из полей search_fields.
+        Условие OR по разным таблицам Postgres проверяет перебором всех строк, а каждая ветка
+        UNION выбирается своим индексом: GIN search_vector и триграммными индексами имен.
+        """
+        manager = queryset.model._default_manager
+        branches = []
+        for search_field in search_fields:
+            lookup = self.construct_search(str(search_field), queryset)
+            # Все слова запроса ищутся в одном поле; дубли строк через M2M убирает UNION
+            condition = reduce(operator.and_, (
+                self._lookups_condition([lookup], transliteration_variants(term) if fuzzy else [term], fuzzy)
+                for term in search_terms
+            ))
+            branches.append(manager.filter(condition).order_by().values('pk'))
+        return manager.filter(**{self.vector_field: query}).order_by().values('pk').union(*branches)
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+
+        fuzzy = self.is_fuzzy(request)
+        query = SearchQuery(' '.join(search_terms), config=SEARCH_CONFIG, search_type='websearch')
+        conditions = Q(**{self.vector_field: query})
+        rank = SearchRank(F(self.vector_field), query)
+
+        search_fields = self.get_search_fields(view, request)
+        if search_fields:
+            conditions = Q(pk__in=self.get_matches(queryset, query, search_fields, search_terms, fuzzy))
+            similarity = self.get_similarity(queryset, search_fields, search_terms) if fuzzy else None
+            if similarity is not None:
+                rank = rank + similarity
+
+        queryset = queryset.filter(conditions).annotate(search_rank=rank)
+
+        if getattr(view, 'action', None) == 'list':
+            queryset = queryset.annotate(search_headline=SearchHeadline(
+                self.headline_field, query, config=SEARCH_CONFIG,
+                start_sel='<mark>', stop_sel='</mark>', max_words=35, min_words=15,
+            ))
+
+        # Явный ?ordering= применяется OrderingFilter позже и заменяет сортировку по рангу
+        return queryset.order_by('-search_rank', *queryset.query.order_by)
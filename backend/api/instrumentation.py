@@ -0,0 +1,177 @@
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django_redis.cache import RedisCache
+
+# Участки запроса в порядке вывода; время вне них считается как app
+SECTIONS = ('auth', 'permission', 'db', 'cache', 'serialize', 'render')
+# Участки, для которых в Server-Timing и журнал выводится и число вызовов
+COUNTED_SECTIONS = {'db': 'queries', 'cache': 'calls'}
+
+_current_profile = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """
+    Распределение времени запроса по участкам. Время участка собственное:
+    вложенный участок (запрос к БД при сериализации) вычитается из внешнего,
+    поэтому сумма участков не превышает общего времени.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(SECTIONS, 0.0)
+        self.counts = dict.fromkeys(SECTIONS, 0)
+        self._stack = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def breakdown(self):
+        """{участок: мс} с app - временем вне участков - и total."""
+        total = self.elapsed()
+        result = {name: duration * 1000 for name, duration in self.durations.items()}
+        result['app'] = max(0.0, total - sum(self.durations.values())) * 1000
+        result['total'] = total * 1000
+        return result
+
+    def log_fields(self):
+        fields = {f'{name}_ms': round(value, 2) for name, value in self.breakdown().items()}
+        for name, unit in COUNTED_SECTIONS.items():
+            fields[f'{name}_{unit}'] = self.counts[name]
+        return fields
+
+    def server_timing(self):
+        entries = []
+        for name, value in self.breakdown().items():
+            entry = f'{name};dur={value:.2f}'
+            if name in COUNTED_SECTIONS:
+                entry += f';desc="{self.counts[name]} {COUNTED_SECTIONS[name]}"'
+            entries.append(entry)
+        return ', '.join(entries)
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+@contextmanager
+def timed(name):
+    """Относит время блока к участку name текущего запроса. Вне запроса ничего не делает."""
+    profile = _current_profile.get()
+    # Повторный вход в тот же участок (вложенные сериализаторы, get_or_set кеша) не считается отдельно
+    if profile is None or (profile._stack and profile._stack[-1][0] == name):
+        yield
+        return
+
+    frame = [name, 0.0]
+    profile._stack.append(frame)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        profile._stack.pop()
+        profile.durations[name] += elapsed - frame[1]
+        profile.counts[name] += 1
+        if profile._stack:
+            profile._stack[-1][1] += elapsed
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    with timed('db'):
+        return execute(sql, params, many, context)
+
+
+class InstrumentedCacheMixin:
+    """Относит вызовы бэкенда кеша к участку cache текущего запроса."""
+
+    def get(self, *args, **kwargs):
+        with timed('cache'):
+            return super().get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        with timed('cache'):
+            return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        with timed('cache'):
+            return super().add(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with timed('cache'):
+            return super().delete(*args, **kwargs)
+
+    def get_many(self, *args, **kwargs):
+        with timed('cache'):
+            return super().get_many(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        with timed('cache'):
+            return super().set_many(*args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        with timed('cache'):
+            return super().delete_many(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        with timed('cache'):
+            return super().incr(*args, **kwargs)
+
+    def decr(self, *args, **kwargs):
+        with timed('cache'):
+            return super().decr(*args, **kwargs)
+
+    def has_key(self, *args, **kwargs):
+        with timed('cache'):
+            return super().has_key(*args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        with timed('cache'):
+            return super().touch(*args, **kwargs)
+
+    def delete_pattern(self, *args, **kwargs):
+        with timed('cache'):
+            return super().delete_pattern(*args, **kwargs)
+
+    def ttl(self, *args, **kwargs):
+        with timed('cache'):
+            return super().ttl(*args, **kwargs)
+
+    def expire(self, *args, **kwargs):
+        with timed('cache'):
+            return super().expire(*args, **kwargs)
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
+
+
+class RequestProfilingMiddleware:
+    """
+    Собирает RequestProfile запроса: запросы к БД через execute_wrapper,
+    остальные участки - через timed() в аутентификации, правах, сериализаторах и рендерере.
+    Результат - заголовок Server-Timing (SERVER_TIMING_ENABLED) и request.profile
+    для полей журнала.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = request.profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+
+        if settings.SERVER_TIMING_ENABLED:
+            response['Server-Timing'] = profile.server_timing()
+        return response
@@ -1,13 +1,96 @@
 import logging
-import json
-from typing import Dict, Any
+import orjson
+from functools import lru_cache
 from django.utils.timezone import now
 
+# Даты, время и Decimal в контексте записываются через str(), как раньше с json.dumps(default=str)
+LOG_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# Атрибуты LogRecord, которые не попадают в context
+STANDARD_FIELDS = frozenset({
+    'args', 'asctime', 'created', 'exc_info', 'exc_text', 'filename',
+    'funcName', 'levelname', 'levelno', 'lineno', 'module', 'msecs',
+    'message', 'msg', 'name', 'pathname', 'process', 'processName',
+    'relativeCreated', 'stack_info', 'thread', 'threadName', 'taskName',
+    'server_time', 'path',
+})
+
+SENSITIVE_KEY_PARTS = ('password', 'token', 'secret', 'key', 'auth')
+MASKED_VALUE = '***MASKED***'
+
+# Ограничения вложенных словарей и списков в context
+MAX_DEPTH = 6
+MAX_ITEMS = 200
+MAX_STRING_LENGTH = 4096
+TRUNCATED = '<truncated>'
+
+# Значения, которые записываются как есть
+SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+@lru_cache(maxsize=4096)
+def is_sensitive_key(key):
+    lower_key = str(key).lower()
+    return any(part in lower_key for part in SENSITIVE_KEY_PARTS)
+
+
+def _sanitize(data, depth):
+    if depth >= MAX_DEPTH:
+        return TRUNCATED
+
+    if isinstance(data, dict):
+        sanitized = {}
+        for index, (key, value) in enumerate(data.items()):
+            if index >= MAX_ITEMS:
+                sanitized[TRUNCATED] = len(data) - MAX_ITEMS
+                break
+            sanitized[key] = MASKED_VALUE if is_sensitive_key(key) else _sanitize_value(value, depth)
+        return sanitized
+
+    sanitized = [_sanitize_value(item, depth) for item in data[:MAX_ITEMS]]
+    if len(data) > MAX_ITEMS:
+        sanitized.append(TRUNCATED)
+    return sanitized
+
+
+def _sanitize_value(value, depth):
+    value_type = type(value)
+    if value_type is str:
+        return value if len(value) <= MAX_STRING_LENGTH else value[:MAX_STRING_LENGTH] + TRUNCATED
+    if value_type in SCALAR_TYPES or not isinstance(value, (dict, list)):
+        return value
+    return _sanitize(value, depth + 1)
+
+
+def _object_value(value):
+    # Объекты моделей записываются ссылкой "Модель:pk", прочие объекты - строкой
+    if hasattr(value, 'pk'):
+        return f"{value.__class__.__name__}:{value.pk}"
+    if hasattr(value, 'id'):
+        return f"{value.__class__.__name__}:{value.id}"
+    try:
+        return str(value)
+    except Exception:
+        return f"<{type(value).__name__}>"
+
+
+def _context_value(value):
+    value_type = type(value)
+    if value_type is dict or value_type is list or value_type is tuple:
+        return _sanitize(value, 0)
+    if hasattr(value, '__dict__'):
+        return _object_value(value)
+    if isinstance(value, (dict, list, tuple)):
+        return _sanitize(value, 0)
+    return value
+
+
 class AuditLogFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
-        if not hasattr(record, 'server_time'):
+        record_dict = record.__dict__
+        if 'server_time' not in record_dict:
             record.server_time = now().isoformat()
-        
+
         log_data = {
             'timestamp': record.server_time,
             'level': record.levelname,
@@ -16,57 +99,24 @@ class AuditLogFormatter(logging.Formatter):
             'function': record.funcName,
             'line': record.lineno,
             'message': record.getMessage(),
-            'path': getattr(record, 'path', ''),
+            'path': record_dict.get('path', ''),
         }
-        
+
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
-        
-        standard_fields = {
-            'args', 'asctime', 'created', 'exc_info', 'exc_text', 'filename',
-            'funcName', 'levelname', 'levelno', 'lineno', 'module', 'msecs',
-            'message', 'msg', 'name', 'pathname', 'process', 'processName',
-            'relativeCreated', 'stack_info', 'thread', 'threadName', 'taskName',
-            'server_time', 'path'
-        }
-        
+
         extra_fields = {}
-        for key, value in record.__dict__.items():
-            if key not in standard_fields and not key.startswith('_'):
-                if hasattr(value, '__dict__'):
-                    if hasattr(value, 'pk'):
-                        value = f"{value.__class__.__name__}:{value.pk}"
-                    elif hasattr(value, 'id'):
-                        value = f"{value.__class__.__name__}:{value.id}"
-                    else:
-                        try:
-                            value = str(value)
-                        except:
-                            value = f"<{type(value).__name__}>"
-                elif isinstance(value, (dict, list, tuple)):
-                    value = self._sanitize_data(value)
-                extra_fields[key] = value
-        
+        for key, value in record_dict.items():
+            if key in STANDARD_FIELDS or key[:1] == '_':
+                continue
+            if type(value) not in SCALAR_TYPES:
+                value = _context_value(value)
+            extra_fields[key] = value
         if extra_fields:
             log_data['context'] = extra_fields
-        
+
         try:
-            return json.dumps(log_data, ensure_ascii=False, default=str)
+            return orjson.dumps(log_data, default=str, option=LOG_ORJSON_OPTIONS).decode()
         except (TypeError, ValueError):
             safe_data = {k: str(v) for k, v in log_data.items()}
-            return json.dumps(safe_data, ensure_ascii=False)
-    
-    def _sanitize_data(self, data):
-        if isinstance(data, dict):
-            sanitized = {}
-            for key, value in data.items():
-                lower_key = key.lower()
-                if any(sensitive in lower_key for sensitive in 
-                      ['password', 'token', 'secret', 'key', 'auth']):
-                    sanitized[key] = '***MASKED***'
-                else:
-                    sanitized[key] = self._sanitize_data(value)
-            return sanitized
-        elif isinstance(data, list):
-            return [self._sanitize_data(item) for item in data]
-        return data
\ No newline at end of file
+            return orjson.dumps(safe_data).decode()
@@ -0,0 +1,173 @@
+import atexit
+import copy
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+# Записи, которые при заполненной очереди ждут места, а не отбрасываются сразу
+BLOCKING_LEVEL = logging.WARNING
+# Не чаще одного предупреждения об отброшенных записях за интервал, секунды
+DROP_REPORT_INTERVAL = 10
+
+logger = logging.getLogger('api.logging')
+
+
+class LogPipeline:
+    """
+    Очередь записей журнала и поток QueueListener процесса: форматирование и запись
+    в файлы, stdout и почту выполняются вне потока запроса. Очередь ограничена:
+    при переполнении записи ниже WARNING отбрасываются сразу, остальные ждут
+    block_timeout секунд. Отброшенные записи считаются по уровням, и поток
+    пишет об этом предупреждение, когда очередь освобождается.
+    После fork (gunicorn --preload) очередь и поток создаются заново в дочернем процессе.
+    """
+
+    def __init__(self, maxsize, block_timeout):
+        self.maxsize = maxsize
+        self.block_timeout = block_timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self.queue = None
+        self.listener = None
+        self.dropped = {}
+        self._reported = 0
+        self._reported_at = 0.0
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.maxsize)
+            self.listener = DispatchingQueueListener(self.queue, self)
+            self.listener.start()
+            self.dropped = {}
+            self._reported = 0
+            self._pid = os.getpid()
+
+    def put(self, record, handlers):
+        if self._pid != os.getpid():
+            self._start()
+        if threading.current_thread() is self.listener._thread:
+            # Записи из самого потока очереди (отчет о переполнении, ошибки обработчиков)
+            # выводятся сразу, а не ставятся в собственную заполненную очередь
+            self.listener.dispatch(record, handlers)
+            return
+
+        item = (record, handlers)
+        try:
+            if record.levelno >= BLOCKING_LEVEL:
+                self.queue.put(item, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(item)
+        except queue.Full:
+            # Записи отбрасываются из разных потоков: счетчик меняется под блокировкой
+            with self._lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+    def report_dropped(self):
+        with self._lock:
+            dropped = dict(self.dropped)
+        total = sum(dropped.values())
+        now = time.monotonic()
+        if total > self._reported and now - self._reported_at >= DROP_REPORT_INTERVAL:
+            self._reported = total
+            self._reported_at = now
+            logger.warning(
+                "Log queue overflow, records dropped",
+                extra={'event_type': 'log_queue_overflow', 'dropped': dropped},
+            )
+
+    def stats(self):
+        with self._lock:
+            dropped = dict(self.dropped)
+        return {
+            'queued': self.queue.qsize() if self.queue is not None else 0,
+            'maxsize': self.maxsize,
+            'dropped': dropped,
+        }
+
+    def stop(self):
+        if self._pid == os.getpid() and self.listener is not None:
+            self.listener.stop()
+            self._pid = None
+
+
+class DispatchingQueueListener(logging.handlers.QueueListener):
+    """Передает запись обработчикам логгера, из которого она пришла, с учетом их уровней."""
+
+    def __init__(self, log_queue, pipeline):
+        super().__init__(log_queue)
+        self.pipeline = pipeline
+
+    def dispatch(self, record, handlers):
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self):
+        # Остановка дожидается записи накопленных сообщений, даже если очередь заполнена
+        self.queue.put(self._sentinel)
+
+    def handle(self, item):
+        self.dispatch(*item)
+        if self.pipeline.dropped:
+            self.pipeline.report_dropped()
+
+
+class PipelineQueueHandler(logging.handlers.QueueHandler):
+    """
+    Заменяет обработчики логгера: запись ставится в общую очередь процесса вместе
+    с исходными обработчиками. В потоке запроса только подставляются аргументы сообщения;
+    формат JSON и вывод выполняются потоком очереди.
+    """
+
+    def __init__(self, pipeline, handlers):
+        super().__init__(None)
+        self.pipeline = pipeline
+        self.handlers = tuple(handlers)
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self.pipeline.put(record, self.handlers)
+
+
+pipeline = None
+
+
+def configure_logging(logging_settings):
+    """
+    LOGGING_CONFIG: настраивает журналы через dictConfig, затем переводит
+    обработчики всех логгеров на очередь процесса (LOG_QUEUE_ENABLED=False отключает).
+    """
+    global pipeline
+    from django.conf import settings
+
+    logging.config.dictConfig(logging_settings)
+    if not getattr(settings, 'LOG_QUEUE_ENABLED', True):
+        return
+
+    if pipeline is not None:
+        pipeline.stop()
+    pipeline = LogPipeline(settings.LOG_QUEUE_SIZE, settings.LOG_QUEUE_BLOCK_TIMEOUT)
+
+    names = [''] + list(logging_settings.get('loggers', {}))
+    for name in names:
+        target = logging.getLogger(name)
+        handlers = [handler for handler in target.handlers
+                    if not isinstance(handler, PipelineQueueHandler)]
+        if not handlers:
+            continue
+        for handler in handlers:
+            target.removeHandler(handler)
+        target.addHandler(PipelineQueueHandler(pipeline, handlers))
+
+    atexit.register(pipeline.stop)
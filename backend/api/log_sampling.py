@@ -0,0 +1,95 @@
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+summary_logger = logging.getLogger('api.log_sampling')
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Выборочная запись частых событий по event_type.
+    rules: {event_type: {'rate': доля сохраняемых записей, 'limit': максимум за интервал}}.
+    Записи WARNING и выше (отказы в доступе, ошибки аутентификации) и события без правила
+    сохраняются всегда. Поток процесса раз в interval секунд и при завершении процесса
+    пишет сводку со счетчиками по каждому событию и фактическими границами окна.
+    """
+
+    def __init__(self, rules=None, interval=60, name=''):
+        super().__init__(name)
+        self.rules = rules or {}
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._started = time.time()
+        self._pid = None
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # После fork счетчики родителя уже попадут в его сводку
+            self._counters = {}
+            self._started = time.time()
+            thread = threading.Thread(target=self._run, name='log-sampling-summary', daemon=True)
+            thread.start()
+            # Регистрируется после configure_logging: сводка уходит в очередь до ее остановки
+            atexit.register(self.stop)
+            self._pid = os.getpid()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        event_type = getattr(record, 'event_type', None)
+        rule = self.rules.get(event_type)
+        if rule is None:
+            return True
+        if self._pid != os.getpid():
+            self._start()
+
+        with self._lock:
+            counters = self._counters.setdefault(event_type, {'seen': 0, 'kept': 0})
+            counters['seen'] += 1
+            keep = (counters['kept'] < rule.get('limit', float('inf'))
+                    and random.random() < rule.get('rate', 1.0))
+            if keep:
+                counters['kept'] += 1
+        return keep
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Пишет сводку за окно с последней сводки и начинает новое окно."""
+        now = time.time()
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            started, self._started = self._started, now
+        if counters:
+            self._emit_summary(counters, started, now)
+
+    def stop(self):
+        if self._pid == os.getpid():
+            self.flush()
+
+    def _emit_summary(self, counters, started, ended):
+        summary_logger.info(
+            "Log sampling summary",
+            extra={
+                'event_type': 'log_sampling_summary',
+                'window_start': datetime.fromtimestamp(started, timezone.utc).isoformat(),
+                'window_end': datetime.fromtimestamp(ended, timezone.utc).isoformat(),
+                'window_seconds': round(ended - started, 3),
+                # Список, а не словарь: имена событий вроде jwt_auth маскировались бы как ключи
+                'events': [
+                    {'event_type': event_type, 'seen': values['seen'], 'kept': values['kept'],
+                     'dropped': values['seen'] - values['kept']}
+                    for event_type, values in counters.items()
+                ],
+            },
+        )
@@ -0,0 +1,288 @@
+import logging
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+
+from django.conf import settings
+
+# Кадр: длина (4 байта, big-endian), затем "назначение\0строка" в UTF-8
+FRAME_HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# Пауза перед повторным подключением воркера к недоступному процессу записи, секунды
+RECONNECT_INTERVAL = 1.0
+
+
+def encode_frame(destination, line):
+    payload = destination.encode() + b'\0' + line.encode('utf-8', 'backslashreplace')
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class RotatingLogFile:
+    """Файл журнала с ротацией по размеру, как у RotatingFileHandler, но с записью пачками."""
+
+    def __init__(self, filename, max_bytes=0, backup_count=0):
+        self.filename = os.path.abspath(filename)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.pending = []
+        self.pending_size = 0
+        self.stream = None
+
+    def append(self, line):
+        self.pending.append(line)
+        self.pending_size += len(line) + 1
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        self.stream = open(self.filename, 'ab')
+
+    def _rollover(self):
+        self.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f'{self.filename}.{index}'
+                if os.path.exists(source):
+                    os.replace(source, f'{self.filename}.{index + 1}')
+            if os.path.exists(self.filename):
+                os.replace(self.filename, f'{self.filename}.1')
+        self._open()
+
+    def flush(self):
+        if not self.pending:
+            return
+        lines, self.pending, self.pending_size = self.pending, [], 0
+        if self.stream is None:
+            self._open()
+
+        # Пачка делится по границе ротации, чтобы файл не превышал max_bytes
+        size, chunk = self.stream.tell(), []
+        for line in lines:
+            if self.max_bytes and size and size + len(line) + 1 > self.max_bytes:
+                if chunk:
+                    self.stream.write(b'\n'.join(chunk) + b'\n')
+                    chunk = []
+                self._rollover()
+                size = 0
+            chunk.append(line)
+            size += len(line) + 1
+        if chunk:
+            self.stream.write(b'\n'.join(chunk) + b'\n')
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+class LogWriterServer:
+    """
+    Единственный процесс, который пишет файлы журналов. Воркеры присылают готовые строки
+    через локальный Unix-сокет; строки копятся по файлам и записываются пачками раз в
+    flush_interval секунд или при накоплении batch_bytes. Ротацией владеет только этот процесс,
+    поэтому файлы не повреждаются при любом числе воркеров.
+    """
+
+    def __init__(self, socket_path, files, flush_interval=0.2, batch_bytes=256 * 1024):
+        self.socket_path = socket_path
+        self.files = {name: RotatingLogFile(**options) for name, options in files.items()}
+        self.flush_interval = flush_interval
+        self.batch_bytes = batch_bytes
+        self.selector = selectors.DefaultSelector()
+        self.buffers = {}
+        self.running = False
+
+    def _listen(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        server.listen(128)
+        server.setblocking(False)
+        self.selector.register(server, selectors.EVENT_READ)
+        return server
+
+    def _accept(self, server):
+        connection, _ = server.accept()
+        connection.setblocking(False)
+        self.buffers[connection] = bytearray()
+        self.selector.register(connection, selectors.EVENT_READ)
+
+    def _close_connection(self, connection):
+        # Незаконченный кадр отбрасывается: воркер отправит его заново по новому подключению
+        self.selector.unregister(connection)
+        self.buffers.pop(connection, None)
+        connection.close()
+
+    def _read(self, connection):
+        try:
+            data = connection.recv(256 * 1024)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._close_connection(connection)
+            return
+
+        buffer = self.buffers[connection]
+        buffer.extend(data)
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            size, = FRAME_HEADER.unpack_from(buffer, offset)
+            if size > MAX_FRAME_SIZE:
+                self._close_connection(connection)
+                return
+            end = offset + FRAME_HEADER.size + size
+            if len(buffer) < end:
+                break
+            self._route(bytes(buffer[offset + FRAME_HEADER.size:end]))
+            offset = end
+        del buffer[:offset]
+
+    def _route(self, payload):
+        destination, _, line = payload.partition(b'\0')
+        log_file = self.files.get(destination.decode(errors='replace'))
+        if log_file is None:
+            sys.stderr.write(line.decode('utf-8', 'replace') + '\n')
+            return
+        log_file.append(line)
+        if log_file.pending_size >= self.batch_bytes:
+            log_file.flush()
+
+    def flush(self):
+        for log_file in self.files.values():
+            try:
+                log_file.flush()
+            except OSError as e:
+                sys.stderr.write(f'log writer: {log_file.filename}: {e}\n')
+
+    def stop(self, *args):
+        self.running = False
+
+    def serve_forever(self):
+        server = self._listen()
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        next_flush = time.monotonic() + self.flush_interval
+        try:
+            while self.running:
+                timeout = max(0.0, next_flush - time.monotonic())
+                for key, _ in self.selector.select(timeout):
+                    if key.fileobj is server:
+                        self._accept(server)
+                    else:
+                        self._read(key.fileobj)
+                if time.monotonic() >= next_flush:
+                    self.flush()
+                    next_flush = time.monotonic() + self.flush_interval
+        finally:
+            # Перед выходом дочитываются уже отправленные строки
+            for connection in list(self.buffers):
+                self._read(connection)
+            self.flush()
+            for log_file in self.files.values():
+                log_file.close()
+            self.selector.close()
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class LogWriterHandler(logging.Handler):
+    """
+    Отправляет отформатированные строки процессу записи журналов (manage.py log_writer).
+    Пока он недоступен, строки дописываются в файл назначения напрямую, без ротации,
+    чтобы записи журнала безопасности не терялись. Переход на прямую запись и обратно
+    сообщается в stderr, число таких строк - метрикой log_writer_fallback_writes.
+    """
+
+    def __init__(self, destination, level=logging.NOTSET):
+        super().__init__(level)
+        self.destination = destination
+        self.socket_path = settings.LOG_WRITER_SOCKET
+        self.filename = settings.LOG_WRITER_FILES[destination]['filename']
+        self.sock = None
+        self._pid = None
+        self._retry_at = 0.0
+        self._fallback_lines = 0
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(settings.LOG_WRITER_SEND_TIMEOUT)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _send(self, frame):
+        if self._pid != os.getpid():
+            # Подключение родителя после fork не используется
+            self.sock, self._pid = None, os.getpid()
+
+        # Вторая попытка - по новому подключению, если процесс записи перезапускался
+        for _ in range(2):
+            if self.sock is None:
+                if time.monotonic() < self._retry_at:
+                    return False
+                try:
+                    self.sock = self._connect()
+                except OSError:
+                    self._retry_at = time.monotonic() + RECONNECT_INTERVAL
+                    return False
+            try:
+                self.sock.sendall(frame)
+                return True
+            except OSError:
+                self._close_socket()
+        return False
+
+    def _close_socket(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _write_directly(self, line):
+        from .metrics import LOG_WRITER_FALLBACKS
+
+        if not self._fallback_lines:
+            sys.stderr.write(f'log writer: {self.socket_path} is unavailable, writing {self.destination} '
+                             f'directly to {self.filename} without rotation\n')
+        self._fallback_lines += 1
+        LOG_WRITER_FALLBACKS.labels(self.destination).inc()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+        # Одна запись в режиме O_APPEND не перемешивается с записями других процессов
+        with open(self.filename, 'ab') as stream:
+            stream.write(line.encode('utf-8', 'backslashreplace') + b'\n')
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+            if not self._send(encode_frame(self.destination, line)):
+                self._write_directly(line)
+            elif self._fallback_lines:
+                sys.stderr.write(f'log writer: reconnected, {self._fallback_lines} {self.destination} '
+                                 f'lines were written directly\n')
+                self._fallback_lines = 0
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            self._close_socket()
+        finally:
+            self.release()
+        super().close()
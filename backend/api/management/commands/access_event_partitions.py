@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.audit_trail import month_start, drop_partitions_before, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = 'Создает месячные секции журнала обращений (api.AccessEvent) заранее и удаляет устаревшие'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=3,
+                            help='Количество месяцев начиная с текущего, для которых создаются секции')
+        parser.add_argument('--retention-months', type=int, default=None,
+                            help='Удалить секции старше указанного количества месяцев')
+
+    def handle(self, *args, **options):
+        current_month = month_start(timezone.now())
+        ensure_partitions(current_month, months=options['months'])
+        self.stdout.write(self.style.SUCCESS(f"Секции созданы на {options['months']} мес."))
+
+        if options['retention_months'] is not None:
+            dropped = drop_partitions_before(month_start(current_month, -options['retention_months']))
+            self.stdout.write(self.style.SUCCESS(f"Удалено секций: {len(dropped)} {', '.join(dropped)}"))
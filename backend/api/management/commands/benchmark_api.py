@@ -0,0 +1,311 @@
+import http.client
+import json
+import platform
+import re
+import statistics
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from unittest import mock
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from documentation.models import Documentation
+from employees.models import Employee
+from research.models import Research
+
+SCENARIOS = (
+    'login', 'refresh',
+    'documents_list', 'documents_retrieve', 'documents_search', 'documents_filter',
+    'research_list', 'research_retrieve', 'research_search', 'research_filter',
+    'employees_list',
+)
+# db;dur=12.34;desc="3 queries" из заголовка Server-Timing (api.instrumentation)
+SERVER_TIMING_DB_RE = re.compile(r'(?:^|,\s*)db;dur=([\d.]+);desc="(\d+) ')
+
+
+class InProcessTransport:
+    """Запросы через django.test.Client: без сети и WSGI-сервера, в том же процессе."""
+
+    def __init__(self):
+        self.client = Client(HTTP_HOST='localhost')
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        if body is None:
+            response = getattr(self.client, method.lower())(path, **headers)
+        else:
+            response = getattr(self.client, method.lower())(
+                path, json.dumps(body), content_type='application/json', **headers)
+        return response.status_code, response.content, response.get('Server-Timing')
+
+
+class HttpTransport:
+    """Запросы к запущенному серверу; одно keep-alive соединение на поток, свои cookie."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.netloc, timeout=60)
+        self.prefix = parts.path.rstrip('/')
+        self.host = parts.netloc
+        self.cookies = {}
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Host': self.host, 'Accept': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+
+        self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+        response = self.connection.getresponse()
+        content = response.read()
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status, content, response.getheader('Server-Timing')
+
+
+def percentiles(latencies):
+    if len(latencies) < 2:
+        value = latencies[0] if latencies else None
+        return value, value, value
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5, cwd=settings.BASE_DIR).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Worker:
+    """Сессия одного пользователя: токен доступа, cookie обновления и id объектов для детальных запросов."""
+
+    def __init__(self, transport, username, password):
+        self.transport = transport
+        self.credentials = {'username': username, 'password': password}
+        self.token = None
+        self.ids = {}
+        self.filters = {}
+        self.counter = 0
+
+    def call(self, method, path, body=None, authorized=True):
+        return self.transport.request(method, path, body, self.token if authorized else None)
+
+    def login(self):
+        status, content, _ = self.call('POST', '/api/auth/login/', self.credentials, authorized=False)
+        if status != 200:
+            raise CommandError(f'Вход не выполнен: статус {status}, {content[:200]!r}')
+        self.token = json.loads(content)['access']
+
+    def prepare(self):
+        """id объектов для retrieve и значения фильтров берутся из ответов API."""
+        self.login()
+        for resource, path in (('documents', '/api/documentation/'), ('research', '/api/research/')):
+            status, content, _ = self.call('GET', path)
+            rows = json.loads(content).get('results', []) if status == 200 else []
+            self.ids[resource] = [row['id'] for row in rows]
+            # Фильтр по уровню допуска первого объекта: выборка заведомо не пустая
+            self.filters[resource] = {'required_clearance': rows[0]['required_clearance']} if rows else {}
+
+    def next_id(self, resource):
+        ids = self.ids[resource]
+        if not ids:
+            raise CommandError(f'Нет объектов {resource} для детальных запросов: сгенерируйте данные '
+                               f'командой generate_synthetic_data')
+        self.counter += 1
+        return ids[self.counter % len(ids)]
+
+    def run(self, scenario, search):
+        if scenario == 'login':
+            return self.call('POST', '/api/auth/login/', self.credentials, authorized=False)
+        if scenario == 'refresh':
+            # Токен обновления ротируется: следующий запрос идет с новой cookie из ответа
+            return self.call('POST', '/api/auth/refresh/', authorized=False)
+        if scenario == 'employees_list':
+            return self.call('GET', '/api/employees/')
+
+        resource, action = scenario.split('_')
+        path = '/api/documentation/' if resource == 'documents' else '/api/research/'
+        if action == 'retrieve':
+            return self.call('GET', f'{path}{self.next_id(resource)}/')
+        if action == 'search':
+            return self.call('GET', f'{path}?{urlencode({"search": search})}')
+        if action == 'filter':
+            params = dict(self.filters[resource], ordering='-created_date')
+            return self.call('GET', f'{path}?{urlencode(params)}')
+        return self.call('GET', path)
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный прогон API: вход, обновление токена, списки, детальные запросы, поиск и фильтры. '
+            'Выводит пропускную способность и p50/p95/p99 по сценариям, сохраняет результат в JSON '
+            'и сравнивает его с прошлым прогоном')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='Пользователь с профилем сотрудника')
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--url', default=None,
+                            help='Адрес запущенного сервера (http://localhost:8000). Без него запросы '
+                                 'выполняются в процессе через django.test.Client')
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на сценарий')
+        parser.add_argument('--warmup', type=int, default=20, help='Запросов прогрева на сценарий, не учитываются')
+        parser.add_argument('--concurrency', type=int, default=1, help='Параллельных клиентов')
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help=f'Сценарии через запятую: {", ".join(SCENARIOS)}')
+        parser.add_argument('--search', default='протокол', help='Строка полнотекстового поиска')
+        parser.add_argument('--keep-throttling', action='store_true',
+                            help='Не отключать ограничение частоты запросов (только без --url)')
+        parser.add_argument('--output', default=None, help='Файл для результатов в JSON')
+        parser.add_argument('--compare', default=None, help='JSON прошлого прогона для сравнения')
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Неизвестные сценарии: {", ".join(sorted(unknown))}')
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+
+        with ExitStack() as stack:
+            if options['url']:
+                def make_transport():
+                    return HttpTransport(options['url'])
+            else:
+                make_transport = InProcessTransport
+                # Ограничения частоты (auth: 50/hour) оборвали бы прогон входов и обновлений
+                if not options['keep_throttling']:
+                    stack.enter_context(mock.patch.object(
+                        SimpleRateThrottle, 'THROTTLE_RATES', defaultdict(lambda: None)))
+                # Число запросов к БД берется из заголовка Server-Timing
+                stack.enter_context(override_settings(SERVER_TIMING_ENABLED=True))
+
+            workers = []
+            for _ in range(options['concurrency']):
+                worker = Worker(make_transport(), options['username'], options['password'])
+                worker.prepare()
+                workers.append(worker)
+
+            results = {}
+            for scenario in scenarios:
+                results[scenario] = self.run_scenario(workers, scenario, options)
+                self.report(scenario, results[scenario], (baseline or {}).get('scenarios', {}).get(scenario))
+
+        report = {'meta': self.metadata(options), 'scenarios': results}
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Результаты сохранены в {options['output']}"))
+
+    def run_scenario(self, workers, scenario, options):
+        search = options['search']
+        for index in range(options['warmup']):
+            workers[index % len(workers)].run(scenario, search)
+
+        total = options['requests']
+        shares = [total // len(workers) + (index < total % len(workers)) for index in range(len(workers))]
+        samples = []
+        lock = threading.Lock()
+
+        def work(worker, count):
+            local = []
+            for _ in range(count):
+                started = time.perf_counter()
+                status, _, server_timing = worker.run(scenario, search)
+                local.append((time.perf_counter() - started, status, server_timing))
+            with lock:
+                samples.extend(local)
+
+        started = time.perf_counter()
+        if len(workers) == 1:
+            work(workers[0], total)
+        else:
+            with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+                for future in [executor.submit(work, worker, count) for worker, count in zip(workers, shares)]:
+                    future.result()
+        wall = time.perf_counter() - started
+
+        latencies = [duration * 1000 for duration, status, _ in samples if status < 400]
+        db = [SERVER_TIMING_DB_RE.search(header or '') for _, status, header in samples if status < 400]
+        db = [match for match in db if match]
+        p50, p95, p99 = percentiles(latencies)
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for _, status, _ in samples if status >= 400),
+            'throughput_rps': round(len(latencies) / wall, 2) if wall else None,
+            'mean_ms': round(statistics.fmean(latencies), 2) if latencies else None,
+            'p50_ms': p50 and round(p50, 2),
+            'p95_ms': p95 and round(p95, 2),
+            'p99_ms': p99 and round(p99, 2),
+            'max_ms': round(max(latencies), 2) if latencies else None,
+            'db_queries': round(statistics.fmean(int(m.group(2)) for m in db), 2) if db else None,
+            'db_ms': round(statistics.fmean(float(m.group(1)) for m in db), 2) if db else None,
+        }
+
+    def report(self, scenario, result, previous):
+        def fmt(value, spec):
+            return '-' if value is None else format(value, spec)
+
+        line = (f"{scenario:20} {fmt(result['throughput_rps'], '9.1f')} rps  "
+                f"p50 {fmt(result['p50_ms'], '8.2f')}  p95 {fmt(result['p95_ms'], '8.2f')}  "
+                f"p99 {fmt(result['p99_ms'], '8.2f')} ms  db {fmt(result['db_queries'], '5.1f')}")
+        if result['errors']:
+            line += f"  ошибок {result['errors']}"
+        self.stdout.write(self.style.ERROR(line) if result['errors'] else line)
+
+        if previous:
+            deltas = []
+            for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+                old, new = previous.get(key), result[key]
+                if old and new is not None:
+                    deltas.append(f'{key} {(new - old) / old * 100:+.1f}%')
+            if deltas:
+                self.stdout.write(f"{'':20} к прошлому прогону: {', '.join(deltas)}")
+
+    def metadata(self, options):
+        database = settings.DATABASES['default']
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'mode': 'http' if options['url'] else 'in-process',
+            'url': options['url'],
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'warmup': options['warmup'],
+            'throttling': bool(options['url'] or options['keep_throttling']),
+            'settings': {
+                'DEBUG': settings.DEBUG,
+                'CACHE_BACKEND': settings.CACHES['default']['BACKEND'],
+                'CONN_MAX_AGE': database.get('CONN_MAX_AGE', 0),
+                'DB_POOL': database.get('OPTIONS', {}).get('pool'),
+                'QUERY_INSPECTION': getattr(settings, 'QUERY_INSPECTION', None),
+            },
+            # Объем данных локальной БД; при --url совпадает с сервером, только если БД общая
+            'data': {
+                'documents': Documentation.objects.count(),
+                'research': Research.objects.count(),
+                'employees': Employee.objects.count(),
+            },
+        }
@@ -0,0 +1,139 @@
+import logging
+import time
+
+import orjson
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from api.log_formatters import LOG_ORJSON_OPTIONS, AuditLogFormatter
+from employees.models import ClearanceLevel
+
+
+class LegacyAuditLogFormatter(logging.Formatter):
+    """Прежняя реализация AuditLogFormatter, для сравнения."""
+
+    def format(self, record):
+        if not hasattr(record, 'server_time'):
+            record.server_time = now().isoformat()
+
+        log_data = {
+            'timestamp': record.server_time,
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+            'path': getattr(record, 'path', ''),
+        }
+
+        if record.exc_info:
+            log_data['exception'] = self.formatException(record.exc_info)
+
+        standard_fields = {
+            'args', 'asctime', 'created', 'exc_info', 'exc_text', 'filename',
+            'funcName', 'levelname', 'levelno', 'lineno', 'module', 'msecs',
+            'message', 'msg', 'name', 'pathname', 'process', 'processName',
+            'relativeCreated', 'stack_info', 'thread', 'threadName', 'taskName',
+            'server_time', 'path'
+        }
+
+        extra_fields = {}
+        for key, value in record.__dict__.items():
+            if key not in standard_fields and not key.startswith('_'):
+                if hasattr(value, '__dict__'):
+                    if hasattr(value, 'pk'):
+                        value = f"{value.__class__.__name__}:{value.pk}"
+                    elif hasattr(value, 'id'):
+                        value = f"{value.__class__.__name__}:{value.id}"
+                    else:
+                        try:
+                            value = str(value)
+                        except Exception:
+                            value = f"<{type(value).__name__}>"
+                elif isinstance(value, (dict, list, tuple)):
+                    value = self._sanitize_data(value)
+                extra_fields[key] = value
+
+        if extra_fields:
+            log_data['context'] = extra_fields
+
+        try:
+            return orjson.dumps(log_data, default=str, option=LOG_ORJSON_OPTIONS).decode()
+        except (TypeError, ValueError):
+            safe_data = {k: str(v) for k, v in log_data.items()}
+            return orjson.dumps(safe_data).decode()
+
+    def _sanitize_data(self, data):
+        if isinstance(data, dict):
+            sanitized = {}
+            for key, value in data.items():
+                lower_key = key.lower()
+                if any(sensitive in lower_key for sensitive in
+                       ['password', 'token', 'secret', 'key', 'auth']):
+                    sanitized[key] = '***MASKED***'
+                else:
+                    sanitized[key] = self._sanitize_data(value)
+            return sanitized
+        elif isinstance(data, list):
+            return [self._sanitize_data(item) for item in data]
+        return data
+
+
+def sample_records():
+    """Записи, похожие на журналы API: доступ к документу, проверка допуска, список с фильтрами."""
+    def make(name, level, message, **extra):
+        record = logging.LogRecord(name, level, __file__, 1, message, None, None, func='handle')
+        record.__dict__.update(extra)
+        return record
+
+    clearance = ClearanceLevel(id=3, number=3)
+    return [
+        make('audit', logging.INFO, 'Document view', event_type='document_access',
+             timestamp=now().isoformat(), user_id=12, username='ivanov', action='view',
+             document_id=481, document_title='Отчет о полевых испытаниях',
+             document_type='Отчет', required_clearance=clearance, ip='10.0.0.15', duration_ms=14),
+        make('api.security', logging.INFO, 'Access granted: has required clearance',
+             event_type='clearance_check', timestamp=now().isoformat(), user='ivanov', user_id=12,
+             object_type='Documentation', object_id=481, method='GET',
+             path='/api/documentation/481/', ip='10.0.0.15', user_clearance=3,
+             reason='has_required_clearance'),
+        make('documentation', logging.INFO, 'Document list retrieved', event_type='document_list',
+             user='ivanov', count=20, duration_ms=35,
+             filters={'search': ['отчет'], 'ordering': ['-created_date'], 'access_token': ['x'],
+                      'type': ['1', '2'], 'page': ['2']}),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает производительность AuditLogFormatter с прежней реализацией (записей в секунду)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=100000,
+                            help='Количество форматируемых записей для каждой реализации')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Количество прогонов, берется лучший')
+
+    def measure(self, formatter, records, total):
+        best = None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            for index in range(total):
+                formatter.format(records[index % len(records)])
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return total / best
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        total = options['records']
+        records = sample_records()
+
+        results = {}
+        for name, formatter in (('legacy', LegacyAuditLogFormatter()), ('current', AuditLogFormatter())):
+            results[name] = self.measure(formatter, records, total)
+            self.stdout.write(f"{name:8} {results[name]:12,.0f} records/sec")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Ускорение: x{results['current'] / results['legacy']:.2f}"
+        ))
@@ -0,0 +1,117 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+
+from api.cache import local_cache
+from api.query_inspection import inspect_queries, view_query_budget
+
+# Каждый запрос выполняется с пустым кешем: считаются запросы к БД без попаданий в кеш
+ISOLATED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                               'LOCATION': 'query-budgets'}}
+
+
+def _budget_routes(resolver):
+    """(имя маршрута, класс представления, действие GET) для представлений с query_budget."""
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _budget_routes(pattern)
+            continue
+        callback = pattern.callback
+        view_class = getattr(callback, 'cls', None)
+        action = (getattr(callback, 'actions', None) or {}).get('get')
+        if pattern.name and action and getattr(view_class, 'query_budget', None) is not None:
+            yield pattern.name, view_class, action
+
+
+class Command(BaseCommand):
+    help = ('Проверяет число запросов к БД на эндпоинтах API с бюджетом query_budget и на страницах '
+            'списков админки: превышение бюджета или повторяющиеся запросы (N+1) завершают команду ошибкой')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True,
+                            help='Пользователь, от имени которого выполняются запросы (нужен профиль сотрудника)')
+        parser.add_argument('--repeat-threshold', type=int, default=None,
+                            help='Число одинаковых запросов, с которого они считаются N+1 (QUERY_REPEAT_THRESHOLD)')
+        parser.add_argument('--skip-admin', action='store_true', help='Не проверять страницы админки')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {options['username']} не найден")
+
+        if not options['skip_admin'] and not user.is_staff:
+            raise CommandError(f'Пользователь {user.username} не is_staff: админка недоступна, '
+                               f'укажите другого пользователя или --skip-admin')
+
+        self.user = user
+        self.client = Client(HTTP_HOST='localhost')
+        self.repeat_threshold = options['repeat_threshold']
+        self.failures = 0
+
+        with override_settings(CACHES=ISOLATED_CACHES, QUERY_INSPECTION='off'):
+            self.check_api()
+            if not options['skip_admin']:
+                self.check_admin()
+
+        if self.failures:
+            raise CommandError(f'Нарушений: {self.failures}')
+        self.stdout.write(self.style.SUCCESS('Все бюджеты запросов соблюдены'))
+
+    def fetch(self, url, budget):
+        cache.clear()
+        local_cache.clear()
+        # Сессия тоже может храниться в кеше
+        self.client.force_login(self.user)
+        with inspect_queries(self.repeat_threshold) as inspector:
+            response = self.client.get(url)
+        problems = inspector.problems(budget)
+        if response.status_code != 200:
+            problems.append(f'статус ответа {response.status_code}')
+
+        budget_text = '-' if budget is None else budget
+        if problems:
+            self.failures += 1
+            self.stdout.write(self.style.ERROR(f'FAIL {url}: {inspector.count}/{budget_text}'))
+            for problem in problems:
+                self.stdout.write(f'    {problem}')
+        else:
+            self.stdout.write(f'ok   {url}: {inspector.count}/{budget_text}')
+        return response
+
+    def check_api(self):
+        routes = {}
+        for name, view_class, action in _budget_routes(get_resolver()):
+            routes.setdefault(name, (view_class, action))
+
+        # Сначала списки: id для детальных маршрутов берется из первой строки списка
+        first_ids = {}
+        for name, (view_class, action) in sorted(routes.items(), key=lambda item: item[1][1] != 'list'):
+            budget = view_query_budget(view_class, action)
+            if budget is None:
+                continue
+            try:
+                url = reverse(name)
+            except NoReverseMatch:
+                pk = first_ids.get(view_class)
+                if pk is None:
+                    self.stdout.write(self.style.WARNING(f'skip {name}: нет объектов в списке'))
+                    continue
+                url = reverse(name, kwargs={view_class.lookup_url_kwarg or view_class.lookup_field: pk})
+
+            response = self.fetch(url, budget)
+            if action == 'list' and response.status_code == 200:
+                data = response.json()
+                results = data.get('results', data) if isinstance(data, dict) else data
+                if results:
+                    first_ids[view_class] = results[0]['id']
+
+    def check_admin(self):
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+            self.fetch(url, getattr(model_admin, 'query_budget', None))
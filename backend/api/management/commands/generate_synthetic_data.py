@@ -0,0 +1,217 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.access_index import sync_access_entries
+from api.cache import CACHE_NAMESPACES, bump_namespace
+from documentation.models import Documentation, DocumentType
+from employees.models import ClearanceLevel, Cluster, Department, Division, Employee, Position
+from research.models import Research, ResearchStatus
+
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Алексей', 'Ольга', 'Дмитрий', 'Елена', 'Сергей',
+               'Наталья', 'Андрей', 'Татьяна', 'Михаил', 'Ирина', 'Павел', 'Светлана', 'Борис')
+LAST_NAMES = ('Иванов', 'Петров', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев',
+              'Козлов', 'Новиков', 'Морозов', 'Волков', 'Соловьев', 'Васильев', 'Зайцев')
+POSITION_NAMES = ('Лаборант', 'Научный сотрудник', 'Старший научный сотрудник', 'Инженер',
+                  'Руководитель группы', 'Аналитик')
+DOCUMENT_TYPES = ('Отчет', 'Протокол', 'Инструкция', 'Служебная записка', 'Регламент')
+RESEARCH_STATUSES = ('Планируется', 'В процессе', 'Приостановлено', 'Завершено')
+WORDS = ('образец', 'испытание', 'реактор', 'протокол', 'аномалия', 'контейнер', 'излучение',
+         'эксперимент', 'объект', 'наблюдение', 'периметр', 'сектор', 'анализ', 'датчик',
+         'температура', 'давление', 'результат', 'методика', 'оборудование', 'персонал',
+         'изоляция', 'спектр', 'частота', 'поле', 'стабильность', 'отклонение', 'журнал')
+
+CLEARANCE_NUMBERS = range(1, 6)
+# Созданные объекты распределяются по датам создания за этот период
+CREATED_PERIOD = timedelta(days=365)
+
+
+class Command(BaseCommand):
+    help = ('Заполняет БД синтетической оргструктурой, сотрудниками, документами и исследованиями '
+            'с выдачами доступа для нагрузочных тестов и manage.py benchmark_api')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clusters', type=int, default=5)
+        parser.add_argument('--departments', type=int, default=4, help='Департаментов в каждом кластере')
+        parser.add_argument('--divisions', type=int, default=3, help='Отделов в каждом департаменте')
+        parser.add_argument('--employees', type=int, default=500)
+        parser.add_argument('--documents', type=int, default=5000)
+        parser.add_argument('--research', type=int, default=1000)
+        parser.add_argument('--restricted', type=float, default=0.3,
+                            help='Доля документов и исследований с выдачами доступа allowed_*')
+        parser.add_argument('--max-grants', type=int, default=3,
+                            help='Максимум выдач каждого вида у объекта с ограниченным доступом')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора: одинаковые данные при повторе')
+        parser.add_argument('--prefix', default='synthetic',
+                            help='Префикс имен кластеров и пользователей, по нему же удаляются данные')
+        parser.add_argument('--password', default='synthetic', help='Пароль всех созданных пользователей')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--clear', action='store_true',
+                            help='Удалить ранее созданные данные с этим префиксом перед генерацией')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.options = options
+        started = time.monotonic()
+
+        if options['clear']:
+            self.clear()
+        elif Cluster.objects.filter(name__startswith=f'{self.prefix} ').exists():
+            raise CommandError(f'Данные с префиксом {self.prefix} уже есть: укажите --clear или другой --prefix')
+
+        with transaction.atomic():
+            self.levels = [ClearanceLevel.objects.get_or_create(number=number)[0] for number in CLEARANCE_NUMBERS]
+            self.create_org_structure()
+            self.create_employees()
+            documents = self.create_documents()
+            research = self.create_research()
+
+        # Массовые вставки не вызывают сигналы: индекс доступа и версии кеша обновляются явно
+        sync_access_entries(Documentation, documents)
+        sync_access_entries(Research, research)
+        for namespace in CACHE_NAMESPACES:
+            bump_namespace(namespace)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано за {time.monotonic() - started:.1f} с: кластеров {len(self.clusters)}, "
+            f"департаментов {len(self.departments)}, отделов {len(self.divisions)}, "
+            f"сотрудников {len(self.employees)}, документов {len(documents)}, исследований {len(research)}. "
+            f"Пользователь с максимальным допуском: {self.prefix}_0 / {options['password']}"
+        ))
+
+    def clear(self):
+        users = User.objects.filter(username__startswith=f'{self.prefix}_')
+        with transaction.atomic():
+            documents = Documentation.objects.filter(author__user__in=users).delete()[1]
+            research = Research.objects.filter(lead__user__in=users).delete()[1]
+            Employee.objects.filter(user__in=users).delete()
+            employees = users.delete()[1]
+            Cluster.objects.filter(name__startswith=f'{self.prefix} ').delete()
+        self.stdout.write(
+            f"Удалено: документов {documents.get(Documentation._meta.label, 0)}, "
+            f"исследований {research.get(Research._meta.label, 0)}, "
+            f"пользователей {employees.get(User._meta.label, 0)}"
+        )
+
+    def bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def create_org_structure(self):
+        options = self.options
+        self.clusters = self.bulk_create(Cluster, [
+            Cluster(name=f'{self.prefix} кластер {index + 1}') for index in range(options['clusters'])
+        ])
+        self.departments = self.bulk_create(Department, [
+            Department(name=f'Департамент {index + 1}', cluster=cluster)
+            for cluster in self.clusters for index in range(options['departments'])
+        ])
+        self.divisions = self.bulk_create(Division, [
+            Division(name=f'Отдел {index + 1}', department=department)
+            for department in self.departments for index in range(options['divisions'])
+        ])
+        self.positions = self.bulk_create(Position, [
+            Position(name=name, cluster=cluster) for cluster in self.clusters for name in POSITION_NAMES
+        ])
+
+    def create_employees(self):
+        # Хеш пароля считается один раз: он одинаков для всех пользователей
+        password = make_password(self.options['password'])
+        count = self.options['employees']
+        users = self.bulk_create(User, [
+            User(username=f'{self.prefix}_{index}', password=password) for index in range(count)
+        ])
+        rng = self.rng
+        self.employees = self.bulk_create(Employee, [
+            Employee(
+                user=user,
+                name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                # Первый пользователь видит все объекты без выдач, остальные - по случайному допуску
+                clearance_level=self.levels[-1] if index == 0 else rng.choice(self.levels),
+                division=rng.choice(self.divisions),
+                position=rng.choice(self.positions),
+            )
+            for index, user in enumerate(users)
+        ])
+
+    def text(self, words):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words))
+
+    def spread_created_dates(self, model, objects):
+        # auto_now_add перезаписывает дату при вставке, поэтому даты задаются отдельным обновлением
+        now = timezone.now()
+        for obj in objects:
+            obj.created_date = now - CREATED_PERIOD * self.rng.random()
+        model.objects.bulk_update(objects, ['created_date'], batch_size=self.batch_size)
+
+    def create_grants(self, model, objects):
+        grant_targets = {
+            'allowed_clusters': self.clusters,
+            'allowed_departments': self.departments,
+            'allowed_divisions': self.divisions,
+            'allowed_employees': self.employees,
+        }
+        rng = self.rng
+        max_grants = self.options['max_grants']
+        rows = {field_name: [] for field_name in grant_targets}
+        for obj in objects:
+            if rng.random() >= self.options['restricted']:
+                continue
+            field_name = rng.choice(list(grant_targets))
+            targets = grant_targets[field_name]
+            for target in rng.sample(targets, min(len(targets), rng.randint(1, max_grants))):
+                rows[field_name].append((obj.pk, target.pk))
+
+        for field_name, pairs in rows.items():
+            field = model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source, target = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+            self.bulk_create(through, [through(**{source: obj_id, target: target_id}) for obj_id, target_id in pairs])
+
+    def create_documents(self):
+        rng = self.rng
+        types = [DocumentType.objects.get_or_create(name=name)[0] for name in DOCUMENT_TYPES]
+        documents = self.bulk_create(Documentation, [
+            Documentation(
+                title=f'{rng.choice(DOCUMENT_TYPES)} №{index + 1}: {self.text(4)}'[:256],
+                type=rng.choice(types),
+                content=self.text(rng.randint(50, 400)),
+                author=rng.choice(self.employees),
+                required_clearance=rng.choice(self.levels),
+            )
+            for index in range(self.options['documents'])
+        ])
+        self.spread_created_dates(Documentation, documents)
+        self.create_grants(Documentation, documents)
+        return [document.pk for document in documents]
+
+    def create_research(self):
+        rng = self.rng
+        statuses = [ResearchStatus.objects.get_or_create(name=name)[0] for name in RESEARCH_STATUSES]
+        research = self.bulk_create(Research, [
+            Research(
+                title=f'Исследование №{index + 1}: {self.text(4)}'[:256],
+                status=rng.choice(statuses),
+                content=self.text(rng.randint(50, 400)),
+                lead=rng.choice(self.employees),
+                required_clearance=rng.choice(self.levels),
+            )
+            for index in range(self.options['research'])
+        ])
+        self.spread_created_dates(Research, research)
+        self.create_grants(Research, research)
+
+        through = Research.team.through
+        self.bulk_create(through, [
+            through(research_id=item.pk, employee_id=member.pk)
+            for item in research
+            for member in rng.sample(self.employees, min(len(self.employees), rng.randint(2, 8)))
+        ])
+        return [item.pk for item in research]
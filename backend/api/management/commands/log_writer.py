@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.log_writer import LogWriterServer
+
+
+class Command(BaseCommand):
+    help = 'Процесс записи файлов журналов: принимает строки от воркеров через Unix-сокет и владеет ротацией'
+
+    def handle(self, *args, **options):
+        server = LogWriterServer(
+            settings.LOG_WRITER_SOCKET,
+            settings.LOG_WRITER_FILES,
+            flush_interval=settings.LOG_WRITER_FLUSH_INTERVAL,
+        )
+        self.stdout.write(f"Log writer listening on {settings.LOG_WRITER_SOCKET}")
+        server.serve_forever()
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from api.access_index import INDEXED_MODELS, sync_access_entries
+from api.models import AccessEntry
+
+
+class Command(BaseCommand):
+    help = 'Полностью пересобирает индекс доступа (api.AccessEntry) для документов и исследований'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Количество объектов, пересчитываемых за одну транзакцию')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for label in INDEXED_MODELS:
+            model = apps.get_model(label)
+            object_type = model._meta.label_lower
+
+            # Записи удаленных объектов, на которые не пришли сигналы
+            orphaned, _ = AccessEntry.objects.filter(object_type=object_type).exclude(
+                object_id__in=model.objects.values('pk')).delete()
+
+            ids = list(model.objects.order_by('pk').values_list('pk', flat=True))
+            total = 0
+            for start in range(0, len(ids), batch_size):
+                total += sync_access_entries(model, ids[start:start + batch_size])
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{label}: {len(ids)} объектов, {total} записей индекса, удалено устаревших: {orphaned}"
+            ))
@@ -0,0 +1,126 @@
+import os
+import time
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest)
+from prometheus_client import multiprocess
+
+from .db_pool import database_pools
+
+# Воркеры gunicorn пишут значения в файлы каталога PROMETHEUS_MULTIPROC_DIR (mmap, без блокировок
+# между процессами и без обращений к Redis), /api/metrics суммирует файлы всех воркеров.
+# Без переменной окружения метрики хранятся в памяти процесса (runserver).
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Длительность обработки запроса',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Число запросов к БД за один запрос',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_TIME = Counter(
+    'http_request_db_seconds', 'Время запросов к БД', ['route'],
+)
+RESPONSE_CACHE = Counter(
+    'api_response_cache_requests', 'Обращения к кешу ответов cache_response',
+    ['view', 'result'],
+)
+THROTTLED_REQUESTS = Counter(
+    'api_throttled_requests', 'Запросы, отклоненные ограничением частоты', ['scope'],
+)
+LOGIN_ATTEMPTS = Counter(
+    'api_login_attempts', 'Попытки входа', ['result'],
+)
+LOG_WRITER_FALLBACKS = Counter(
+    'log_writer_fallback_writes', 'Строки журнала, записанные в файл напрямую: процесс записи недоступен',
+    ['destination'],
+)
+ACCESS_EVENTS_DROPPED = Counter(
+    'access_events_dropped', 'Записи журнала обращений, отброшенные при переполнении буфера',
+)
+
+# Пул соединений с БД (DB_POOL): состояние в момент последнего запроса воркера и счетчики
+# из pop_stats() psycopg_pool. В режиме multiprocess значения живых воркеров суммируются
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Соединения пула: всего открыто (size) и свободно (available)',
+    ['alias', 'state'], multiprocess_mode='livesum',
+)
+DB_POOL_WAITING = Gauge(
+    'db_pool_requests_waiting', 'Запросы, ожидающие соединение из пула',
+    ['alias'], multiprocess_mode='livesum',
+)
+DB_POOL_STATS = {
+    # ключ pop_stats(): (счетчик, множитель)
+    'requests_num': (Counter('db_pool_requests', 'Выдачи соединений из пула', ['alias']), 1),
+    'requests_queued': (Counter('db_pool_requests_queued', 'Выдачи, которым пришлось ждать', ['alias']), 1),
+    'requests_wait_ms': (Counter('db_pool_wait_seconds', 'Время ожидания соединения', ['alias']), 0.001),
+    'requests_errors': (Counter('db_pool_timeouts', 'Запросы, не дождавшиеся соединения', ['alias']), 1),
+    'connections_num': (Counter('db_pool_connections_opened', 'Открытые пулом соединения', ['alias']), 1),
+    'connections_errors': (Counter('db_pool_connection_errors', 'Ошибки открытия соединений', ['alias']), 1),
+    'connections_lost': (Counter('db_pool_connections_lost', 'Соединения, не прошедшие проверку', ['alias']), 1),
+}
+
+UNRESOLVED_ROUTE = '<unresolved>'
+# Метод приходит от клиента: нестандартные значения сводятся в одну серию
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'})
+OTHER_METHOD = 'other'
+
+
+def request_route(request):
+    # Имя маршрута, а не путь: у /api/documentation/<id>/ одна серия на все документы
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_ROUTE
+    return match.view_name or match.route or UNRESOLVED_ROUTE
+
+
+def request_method(request):
+    return request.method if request.method in HTTP_METHODS else OTHER_METHOD
+
+
+def observe_db_pools():
+    for alias, pool in database_pools():
+        stats = pool.pop_stats()
+        DB_POOL_CONNECTIONS.labels(alias, 'size').set(stats.get('pool_size', 0))
+        DB_POOL_CONNECTIONS.labels(alias, 'available').set(stats.get('pool_available', 0))
+        DB_POOL_WAITING.labels(alias).set(stats.get('requests_waiting', 0))
+        for key, (counter, scale) in DB_POOL_STATS.items():
+            if stats.get(key):
+                counter.labels(alias).inc(stats[key] * scale)
+
+
+def render_metrics():
+    """Текст метрик в формате Prometheus и его Content-Type."""
+    observe_db_pools()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Длительность и число запросов к БД по маршруту и статусу ответа."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+
+        route = request_route(request)
+        REQUEST_LATENCY.labels(request_method(request), route, response.status_code).observe(
+            time.perf_counter() - started)
+
+        # Разбивка из api.instrumentation.RequestProfilingMiddleware
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            REQUEST_DB_QUERIES.labels(route).observe(profile.counts['db'])
+            REQUEST_DB_TIME.labels(route).inc(profile.durations['db'])
+        observe_db_pools()
+        return response
@@ -1,6 +1,7 @@
 import uuid
 import time
 import logging
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.models import AnonymousUser
 
@@ -17,6 +18,7 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         logger.info(
             "Request started",
             extra={
+                'event_type': 'request_started',
                 'request_id': request.id,
                 'user_id': user_id,
                 'method': request.method,
@@ -32,16 +34,33 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         
         if hasattr(request, 'start_time'):
             duration = time.time() - request.start_time
+            # Разбивка времени по участкам из api.instrumentation.RequestProfilingMiddleware
+            profile = getattr(request, 'profile', None)
+            timings = profile.log_fields() if profile is not None else {}
             
             if response.status_code in [403, 404, 500]:
                 logger.warning(
                     f"Request completed with status {response.status_code}",
                     extra={
+                        'event_type': 'request_failed',
                         'request_id': getattr(request, 'id', 'unknown'),
                         'duration': f"{duration:.3f}s",
                         'status_code': response.status_code,
                         'path': request.path,
                         'method': request.method,
+                        **timings,
+                    }
+                )
+            elif timings and timings['total_ms'] >= settings.SLOW_REQUEST_MS:
+                logger.warning(
+                    "Slow request",
+                    extra={
+                        'event_type': 'slow_request',
+                        'request_id': getattr(request, 'id', 'unknown'),
+                        'status_code': response.status_code,
+                        'path': request.path,
+                        'method': request.method,
+                        **timings,
                     }
                 )
             
@@ -49,12 +68,14 @@ class RequestLoggingMiddleware(MiddlewareMixin):
                 logger.info(
                     "Access to confidential resource",
                     extra={
+                        'event_type': 'confidential_access',
                         'request_id': getattr(request, 'id', 'unknown'),
                         'resource': request.path,
                         'method': request.method,
                         'user_id': getattr(request.user, 'id', 'anonymous'),
                         'duration': f"{duration:.3f}s",
                         'status': response.status_code,
+                        **timings,
                     }
                 )
         
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccessEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(max_length=64, verbose_name='Тип Объекта')),
+                ('object_id', models.BigIntegerField(verbose_name='ID Объекта')),
+                ('required_clearance', models.IntegerField(verbose_name='Уровень Допуска')),
+                ('scope', models.CharField(choices=[('all', 'Все с нужным УД'), ('employee', 'Сотрудник'), ('division', 'Отдел'), ('department', 'Департамент'), ('cluster', 'Кластер')], max_length=16, verbose_name='Область Доступа')),
+                ('scope_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID Области')),
+            ],
+            options={
+                'verbose_name': 'Запись Индекса Доступа',
+                'verbose_name_plural': 'Индекс Доступа',
+                'indexes': [models.Index(fields=['object_type', 'object_id', 'scope', 'scope_id'], name='api_accesse_object__5bde4c_idx'), models.Index(fields=['object_type', 'scope', 'scope_id', 'required_clearance'], name='api_accesse_object__754b67_idx')],
+            },
+        ),
+    ]
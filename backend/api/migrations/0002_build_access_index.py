@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# Логика заполнения индекса зафиксирована на момент миграции и не зависит от кода приложения:
+# модели берутся из состояния миграций, области - значения AccessEntry.scope
+INDEXED_MODELS = (('documentation', 'Documentation'), ('research', 'Research'))
+GRANT_FIELDS = (
+    ('allowed_employees', 'employee'),
+    ('allowed_divisions', 'division'),
+    ('allowed_departments', 'department'),
+    ('allowed_clusters', 'cluster'),
+)
+SCOPE_ALL = 'all'
+BATCH_SIZE = 1000
+
+
+def build_access_index(apps, schema_editor):
+    AccessEntry = apps.get_model('api', 'AccessEntry')
+    for app_label, model_name in INDEXED_MODELS:
+        model = apps.get_model(app_label, model_name)
+        clearance = dict(model._default_manager.values_list('pk', 'required_clearance__number'))
+
+        grants = {}
+        for field_name, scope in GRANT_FIELDS:
+            field = model._meta.get_field(field_name)
+            rows = field.remote_field.through._default_manager.values_list(
+                f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id')
+            for object_id, scope_id in rows:
+                grants.setdefault(object_id, []).append((scope, scope_id))
+
+        # Объект без ограничений доступен всем с нужным УД
+        AccessEntry.objects.bulk_create(
+            [
+                AccessEntry(object_type=model._meta.label_lower, object_id=pk, required_clearance=level,
+                            scope=scope, scope_id=scope_id)
+                for pk, level in clearance.items()
+                for scope, scope_id in grants.get(pk) or [(SCOPE_ALL, None)]
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+
+def clear_access_index(apps, schema_editor):
+    apps.get_model('api', 'AccessEntry').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        ('documentation', '0005_documentation_allowed_clusters_and_more'),
+        ('research', '0004_research_allowed_clusters_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_access_index, clear_access_index),
+    ]
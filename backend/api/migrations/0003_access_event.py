@@ -0,0 +1,95 @@
+from datetime import datetime, timezone as dt_timezone
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.utils import timezone
+
+# Таблица секционирована по месяцам; первичный ключ включает ключ секционирования.
+# Секция по умолчанию принимает записи, для месяца которых секция еще не создана
+CREATE_TABLE = """
+CREATE TABLE "api_accessevent" (
+    "id" bigserial NOT NULL,
+    "timestamp" timestamp with time zone NOT NULL,
+    "user_id" bigint NULL,
+    "username" varchar(150) NOT NULL,
+    "action" varchar(16) NOT NULL,
+    "object_type" varchar(64) NOT NULL,
+    "object_id" bigint NULL,
+    "object_title" varchar(100) NOT NULL,
+    "required_clearance" integer NULL,
+    "ip" inet NULL,
+    "duration_ms" integer NULL,
+    PRIMARY KEY ("id", "timestamp")
+) PARTITION BY RANGE ("timestamp");
+CREATE TABLE "api_accessevent_default" PARTITION OF "api_accessevent" DEFAULT;
+"""
+
+DROP_TABLE = 'DROP TABLE "api_accessevent";'
+
+
+# Секции текущего и двух следующих месяцев; имена вида api_accessevent_y2026m10, как у
+# manage.py access_event_partitions, который создает следующие секции и удаляет старые
+PARTITION_MONTHS = 3
+
+
+def create_partitions(apps, schema_editor):
+    now = timezone.now()
+    for offset in range(PARTITION_MONTHS):
+        month_index = now.year * 12 + now.month - 1 + offset
+        start = datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+        end = datetime((month_index + 1) // 12, (month_index + 1) % 12 + 1, 1, tzinfo=dt_timezone.utc)
+        name = schema_editor.quote_name(f'api_accessevent_y{start.year}m{start.month:02d}')
+        schema_editor.execute(
+            f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF "api_accessevent" FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_build_access_index'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(CREATE_TABLE, DROP_TABLE)],
+            state_operations=[
+                migrations.CreateModel(
+                    name='AccessEvent',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('timestamp', models.DateTimeField(verbose_name='Время')),
+                        ('user_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID Пользователя')),
+                        ('username', models.CharField(blank=True, max_length=150, verbose_name='Пользователь')),
+                        ('action', models.CharField(choices=[('view', 'Просмотр'), ('list', 'Список'), ('create', 'Создание'), ('update', 'Изменение'), ('delete', 'Удаление')], max_length=16, verbose_name='Действие')),
+                        ('object_type', models.CharField(max_length=64, verbose_name='Тип Объекта')),
+                        ('object_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID Объекта')),
+                        ('object_title', models.CharField(blank=True, max_length=100, verbose_name='Название Объекта')),
+                        ('required_clearance', models.IntegerField(blank=True, null=True, verbose_name='Уровень Допуска')),
+                        ('ip', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP')),
+                        ('duration_ms', models.IntegerField(blank=True, null=True, verbose_name='Длительность, мс')),
+                    ],
+                    options={
+                        'verbose_name': 'Обращение к Объекту',
+                        'verbose_name_plural': 'Журнал Обращений',
+                        'ordering': ['-timestamp'],
+                    },
+                ),
+            ],
+        ),
+        # Индексы секционированной таблицы создаются и во всех ее секциях
+        migrations.AddIndex(
+            model_name='accessevent',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='accessevent_timestamp_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='accessevent',
+            index=models.Index(fields=['object_type', 'object_id', 'timestamp'], name='accessevent_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='accessevent',
+            index=models.Index(fields=['user_id', 'timestamp'], name='accessevent_user_idx'),
+        ),
+        migrations.RunPython(create_partitions, migrations.RunPython.noop),
+    ]
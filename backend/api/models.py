@@ -0,0 +1,73 @@
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import models
+
+
+# Денормализованный индекс доступа: одна строка на каждую выдачу доступа объекту
+class AccessEntry(models.Model):
+    SCOPE_ALL = 'all'
+    SCOPE_EMPLOYEE = 'employee'
+    SCOPE_DIVISION = 'division'
+    SCOPE_DEPARTMENT = 'department'
+    SCOPE_CLUSTER = 'cluster'
+
+    SCOPE_CHOICES = [
+        (SCOPE_ALL, 'Все с нужным УД'),
+        (SCOPE_EMPLOYEE, 'Сотрудник'),
+        (SCOPE_DIVISION, 'Отдел'),
+        (SCOPE_DEPARTMENT, 'Департамент'),
+        (SCOPE_CLUSTER, 'Кластер'),
+    ]
+
+    object_type = models.CharField(max_length=64, verbose_name='Тип Объекта')
+    object_id = models.BigIntegerField(verbose_name='ID Объекта')
+    required_clearance = models.IntegerField(verbose_name='Уровень Допуска')
+    scope = models.CharField(max_length=16, choices=SCOPE_CHOICES, verbose_name='Область Доступа')
+    scope_id = models.BigIntegerField(null=True, blank=True, verbose_name='ID Области')
+
+    class Meta:
+        verbose_name = 'Запись Индекса Доступа'
+        verbose_name_plural = 'Индекс Доступа'
+        indexes = [
+            models.Index(fields=['object_type', 'object_id', 'scope', 'scope_id']),
+            models.Index(fields=['object_type', 'scope', 'scope_id', 'required_clearance']),
+        ]
+
+    def __str__(self):
+        return f"{self.object_type}:{self.object_id} -> {self.scope}:{self.scope_id}"
+
+
+# Журнал обращений к документам и исследованиям. Таблица секционирована по месяцам
+# (PARTITION BY RANGE (timestamp), миграция 0003), записи добавляются пачками из api.audit_trail
+class AccessEvent(models.Model):
+    ACTION_CHOICES = [
+        ('view', 'Просмотр'),
+        ('list', 'Список'),
+        ('create', 'Создание'),
+        ('update', 'Изменение'),
+        ('delete', 'Удаление'),
+    ]
+
+    timestamp = models.DateTimeField(verbose_name='Время')
+    user_id = models.BigIntegerField(null=True, blank=True, verbose_name='ID Пользователя')
+    username = models.CharField(max_length=150, blank=True, verbose_name='Пользователь')
+    action = models.CharField(max_length=16, choices=ACTION_CHOICES, verbose_name='Действие')
+    object_type = models.CharField(max_length=64, verbose_name='Тип Объекта')
+    object_id = models.BigIntegerField(null=True, blank=True, verbose_name='ID Объекта')
+    object_title = models.CharField(max_length=100, blank=True, verbose_name='Название Объекта')
+    required_clearance = models.IntegerField(null=True, blank=True, verbose_name='Уровень Допуска')
+    ip = models.GenericIPAddressField(null=True, blank=True, verbose_name='IP')
+    duration_ms = models.IntegerField(null=True, blank=True, verbose_name='Длительность, мс')
+
+    class Meta:
+        verbose_name = 'Обращение к Объекту'
+        verbose_name_plural = 'Журнал Обращений'
+        ordering = ['-timestamp']
+        indexes = [
+            # Время растет вместе с физическим порядком строк: BRIN в сотни раз меньше B-tree
+            BrinIndex(fields=['timestamp'], name='accessevent_timestamp_brin'),
+            models.Index(fields=['object_type', 'object_id', 'timestamp'], name='accessevent_object_idx'),
+            models.Index(fields=['user_id', 'timestamp'], name='accessevent_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.username or self.user_id} {self.action} {self.object_type}:{self.object_id}"
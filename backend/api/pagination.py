@@ -0,0 +1,376 @@
+import base64
+import datetime
+import decimal
+import json
+import uuid
+from functools import reduce
+import operator
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.db import connections, models
+from django.db.models import F, Func, Q, Value
+from django.db.models.expressions import OrderBy
+from django.db.models.functions import Cast
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from django.utils.functional import cached_property
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class Row(Func):
+    """Значение-строка Postgres (a, b, ...) для сравнения нескольких столбцов сразу."""
+    function = 'ROW'
+
+    def __init__(self, *expressions):
+        super().__init__(*expressions, output_field=models.Field())
+
+
+class KeysetKey(NamedTuple):
+    alias: str
+    path: str
+    descending: bool
+    nullable: bool
+    field: models.Field
+
+
+def _cursor_default(value):
+    # Полная точность: DjangoJSONEncoder обрезает микросекунды, и строки на границе терялись бы
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _expand_ordering(model, path, descending):
+    """
+    Раскрывает элемент сортировки до столбцов, как это делает Django:
+    связь сортируется по Meta.ordering связанной модели, иначе по ее pk.
+    Возвращает список (путь, по убыванию, может ли быть NULL, поле).
+    """
+    opts = model._meta
+    nullable = False
+    field = None
+    for part in path.split('__'):
+        try:
+            field = opts.pk if part == 'pk' else opts.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if field.is_relation and part == field.attname != field.name:
+            # Столбец внешнего ключа (author_id) сортируется как есть
+            field = field.target_field
+        nullable = nullable or field.null
+        if field.is_relation:
+            opts = field.related_model._meta
+
+    if field.is_relation:
+        related_ordering = opts.ordering
+        if not related_ordering:
+            return [(f'{path}__pk', descending, nullable, opts.pk)]
+        keys = []
+        for term in related_ordering:
+            related_descending = term.startswith('-')
+            for key_path, key_descending, key_nullable, key_field in _expand_ordering(
+                    field.related_model, term.lstrip('-'), related_descending):
+                keys.append((f'{path}__{key_path}', key_descending != descending,
+                             nullable or key_nullable, key_field))
+        return keys
+
+    return [(path, descending, nullable, field)]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу: следующая страница выбирается условием
+    «после последней строки» по полям сортировки вместо COUNT(*) и OFFSET,
+    поэтому стоимость страницы не растет с глубиной.
+
+    Сортировка берется из queryset после OrderingFilter, связи раскрываются
+    до столбцов, последним ключом для устойчивости добавляется id.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор'
+
+    def get_keys(self, queryset):
+        model = queryset.model
+        ordering = queryset.query.order_by or model._meta.ordering
+
+        keys = []
+        for term in ordering:
+            if isinstance(term, OrderBy) and isinstance(term.expression, F):
+                path, descending = term.expression.name, term.descending
+            elif isinstance(term, str) and term != '?':
+                path, descending = term.lstrip('-'), term.startswith('-')
+            else:
+                raise ValueError(f'Ключевая пагинация не поддерживает сортировку {term!r}')
+
+            expanded = _expand_ordering(model, path, descending)
+            if expanded is None:
+                # Аннотация queryset, например ранг поиска
+                annotation = queryset.query.annotations[path]
+                expanded = [(path, descending, False, annotation.output_field)]
+            keys.extend(expanded)
+
+        if not any(path in ('pk', model._meta.pk.name) for path, _, _, _ in keys):
+            # Направление id совпадает с последним ключом, чтобы сортировку покрывал один индекс
+            keys.append(('pk', keys[-1][1] if keys else False, False, model._meta.pk))
+
+        return [KeysetKey(f'keyset_{index}', *key) for index, key in enumerate(keys)]
+
+    def _key_expression(self, key):
+        # real из ts_rank сравнивается как double precision, иначе значение из курсора не совпадет
+        if key.field.get_internal_type() == 'FloatField':
+            return Cast(F(key.path), models.FloatField())
+        return F(key.path)
+
+    def _after_condition(self, keys, values):
+        """Условие «строго после» последней строки предыдущей страницы."""
+        values = [None if value is None else key.field.to_python(value)
+                  for key, value in zip(keys, values)]
+
+        uniform = len({key.descending for key in keys}) == 1
+        if uniform and not any(key.nullable for key in keys) and None not in values:
+            # Сравнение строк целиком использует составной индекс как границу диапазона
+            lookup = LessThan if keys[0].descending else GreaterThan
+            return lookup(
+                Row(*[F(key.alias) for key in keys]),
+                Row(*[Value(value, output_field=key.field) for key, value in zip(keys, values)]),
+            )
+
+        # NULL идут последними при возрастании и первыми при убывании, как принято в Postgres
+        def after(key, value):
+            if value is None:
+                return Q(**{f'{key.alias}__isnull': False}) if key.descending else Q(pk__in=[])
+            if key.descending:
+                return Q(**{f'{key.alias}__lt': value})
+            return Q(**{f'{key.alias}__gt': value}) | Q(**{f'{key.alias}__isnull': True})
+
+        def equal(key, value):
+            if value is None:
+                return Q(**{f'{key.alias}__isnull': True})
+            return Q(**{key.alias: value})
+
+        conditions = []
+        for index, (key, value) in enumerate(zip(keys, values)):
+            previous = [equal(prev_key, prev_value)
+                        for prev_key, prev_value in zip(keys[:index], values[:index])]
+            conditions.append(reduce(operator.and_, previous + [after(key, value)]))
+        return reduce(operator.or_, conditions)
+
+    def encode_cursor(self, keys, obj):
+        # Строка может быть объектом модели или словарем из .values()
+        row = obj if isinstance(obj, dict) else obj.__dict__
+        payload = {
+            'o': [f"{'-' if key.descending else ''}{key.path}" for key in keys],
+            'v': [row[key.alias] for key in keys],
+        }
+        data = json.dumps(payload, default=_cursor_default, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode('ascii')
+
+    def decode_cursor(self, request, keys):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            ordering = [f"{'-' if key.descending else ''}{key.path}" for key in keys]
+            # Курсор от другой сортировки указывал бы на чужую позицию
+            if payload['o'] != ordering or len(payload['v']) != len(keys):
+                raise ValueError
+            return payload['v']
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        keys = self.get_keys(queryset)
+
+        queryset = queryset.annotate(**{key.alias: self._key_expression(key) for key in keys})
+        queryset = queryset.order_by(*[
+            F(key.alias).desc(nulls_first=True) if key.descending else F(key.alias).asc(nulls_last=True)
+            for key in keys
+        ])
+
+        values = self.decode_cursor(request, keys)
+        if values is not None:
+            try:
+                queryset = queryset.filter(self._after_condition(keys, values))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        self.next_cursor = self.encode_cursor(keys, self.page[-1]) if self.has_next else None
+        return self.page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def estimate_count(queryset):
+    """
+    Оценка числа строк планировщиком Postgres без выполнения запроса.
+    Для выборки без условий берется статистика таблицы из pg_class, иначе
+    оценка верхнего узла EXPLAIN. None, если оценка недоступна.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    query = queryset.query
+    if not query.where and not query.distinct and not query.combinator:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # -1 у таблицы, для которой еще не собиралась статистика
+        if row and row[0] >= 0:
+            return int(row[0])
+
+    plan = json.loads(queryset.order_by().values('pk').explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimated_count(queryset, threshold=None):
+    """Оценка выше порога ESTIMATED_COUNT_THRESHOLD, ниже - точный COUNT(*). Возвращает (число, оценка ли)."""
+    if threshold is None:
+        threshold = settings.ESTIMATED_COUNT_THRESHOLD
+    estimate = estimate_count(queryset)
+    if estimate is None or estimate < threshold:
+        return queryset.count(), False
+    return estimate, True
+
+
+class EstimatedPage(Page):
+    """Страница, о наличии следующей страницы которой известно по лишней строке, а не по count."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator Django с оценкой числа объектов для больших выборок.
+    При оценке номер страницы не ограничивается num_pages: оценка может быть меньше
+    настоящего числа, и последние объекты иначе были бы недоступны.
+    """
+
+    @cached_property
+    def _estimated_count(self):
+        return estimated_count(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self._estimated_count[0]
+
+    @property
+    def count_estimated(self):
+        return self._estimated_count[1]
+
+    def validate_number(self, number):
+        if self.count_estimated and str(number).isdigit() and int(number) > self.num_pages:
+            return int(number)
+        return super().validate_number(number)
+
+    def page(self, number):
+        if not self.count_estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedPage(object_list[:self.per_page], number, self,
+                             has_more=len(object_list) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Номера страниц с оценкой общего числа объектов по ?count=estimated:
+    выше ESTIMATED_COUNT_THRESHOLD возвращается оценка планировщика, ниже - точный COUNT(*).
+    Поле count_estimated в ответе сообщает, что именно вернулось.
+    """
+    count_query_param = 'count'
+    estimated_count_mode = 'estimated'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimate = request.query_params.get(self.count_query_param) == self.estimated_count_mode
+        self.django_paginator_class = EstimatedCountPaginator if self.estimate else Paginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if not self.estimate:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.page.paginator.count,
+            'count_estimated': self.page.paginator.count_estimated,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_estimated'] = {'type': 'boolean'}
+        return response_schema
+
+
+class KeysetOrPageNumberPagination(EstimatedCountPagination):
+    """
+    Номера страниц по умолчанию. Клиент включает ключевую пагинацию
+    параметром ?pagination=cursor, дальше переходит по ссылкам next.
+    """
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        return (request.query_params.get(self.mode_query_param) == self.keyset_mode
+                or self.keyset_class.cursor_query_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_class() if self.use_keyset(request) else None
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return ''
+        return super().to_html()
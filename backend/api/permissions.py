@@ -1,6 +1,8 @@
 from rest_framework import permissions
 import logging
 from django.utils.timezone import now
+from .instrumentation import timed
+from .access import PUBLIC_CLEARANCE, get_access_profile, resolve_grant
 
 logger = logging.getLogger('api.security')
 
@@ -14,7 +16,19 @@ class HasRequiredClearanceLevel(permissions.BasePermission):
             return True
         return False
 
+    @timed('permission')
     def has_object_permission(self, request, view, obj):
+        # DRF может проверять один объект несколько раз за запрос (get_object в retrieve)
+        decisions = getattr(request, '_clearance_decisions', None)
+        if decisions is None:
+            decisions = request._clearance_decisions = {}
+
+        key = (type(obj).__name__, obj.pk)
+        if key not in decisions:
+            decisions[key] = self._check_object_permission(request, obj)
+        return decisions[key]
+
+    def _check_object_permission(self, request, obj):
         log_context = self._build_log_context(request, obj)
 
         try:
@@ -33,7 +47,7 @@ class HasRequiredClearanceLevel(permissions.BasePermission):
             log_context['required_clearance'] = required_level
 
             # Если объект 1 УД и ниже - любые ограничения отсутствуют
-            if required_level <= 1:
+            if required_level <= PUBLIC_CLEARANCE:
                 self._log_event(logging.DEBUG, "Access granted: minimal clearance",
                                 log_context, reason='no_clearance_required')
                 return True
@@ -43,61 +57,32 @@ class HasRequiredClearanceLevel(permissions.BasePermission):
                                 log_context, reason='not_authenticated')
                 return False
 
-            try:
-                employee = request.user.employee
-            except AttributeError:
+            profile = get_access_profile(request.user)
+            if profile is None:
                 self._log_event(logging.WARNING, "Access denied: no employee profile",
                                 log_context, reason='no_employee_profile')
                 return False
 
-            user_level = employee.clearance_level.number
+            user_level = profile.clearance
             log_context['user_clearance'] = user_level
 
-            if user_level < required_level:
+            if user_level is None or user_level < required_level:
                 self._log_event(logging.WARNING, "Access denied: insufficient clearance",
                                 log_context, reason='insufficient_clearance')
                 return False
 
-            allowed_employees = getattr(obj, 'allowed_employees', None)
-            allowed_divisions = getattr(obj, 'allowed_divisions', None)
-            allowed_departments = getattr(obj, 'allowed_departments', None)
-            allowed_clusters = getattr(obj, 'allowed_clusters', None)
-
-            # Если allowed_* пустые или не существуют - доступно всем с нужным УД
-            has_any_restriction = any(
-                field is not None and field.exists()
-                for field in (allowed_employees, allowed_divisions,
-                              allowed_departments, allowed_clusters)
-            )
-
-            if not has_any_restriction:
-                self._log_event(logging.INFO, "Access granted: has required clearance",
-                                log_context, reason='has_required_clearance')
-                return True
-
-            if allowed_employees and allowed_employees.filter(id=employee.id).exists():
-                self._log_event(logging.INFO, "Access granted: in allowed employees",
-                                log_context, reason='in_allowed_employees')
-                return True
-
-            if allowed_divisions and allowed_divisions.filter(id=employee.division_id).exists():
-                self._log_event(logging.INFO, "Access granted: in allowed divisions",
-                                log_context, reason='in_allowed_divisions')
-                return True
-
-            if allowed_departments and allowed_departments.filter(id=employee.department_id).exists():
-                self._log_event(logging.INFO, "Access granted: in allowed departments",
-                                log_context, reason='in_allowed_departments')
-                return True
-
-            if allowed_clusters and allowed_clusters.filter(id=employee.cluster_id).exists():
-                self._log_event(logging.INFO, "Access granted: in allowed clusters",
-                                log_context, reason='in_allowed_clusters')
-                return True
+            reason = resolve_grant(obj, profile)
+            if reason is None:
+                self._log_event(logging.WARNING, "Access denied: not in any allowed list",
+                                log_context, reason='not_in_allowed_lists')
+                return False
 
-            self._log_event(logging.WARNING, "Access denied: not in any allowed list",
-                            log_context, reason='not_in_allowed_lists')
-            return False
+            if reason == 'has_required_clearance':
+                message = "Access granted: has required clearance"
+            else:
+                message = f"Access granted: {reason.replace('_', ' ')}"
+            self._log_event(logging.INFO, message, log_context, reason=reason)
+            return True
 
         except Exception as e:
             logger.error("Clearance check error: %s", str(e),
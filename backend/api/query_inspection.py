@@ -0,0 +1,154 @@
+import logging
+import os
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('api.performance')
+
+# Списки IN (%s, %s, ...) и VALUES разной длины считаются одним видом запроса
+IN_LIST_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryBudgetExceeded(Exception):
+    """Повторяющиеся запросы (N+1) или превышение бюджета запросов представления."""
+
+
+def query_shape(sql):
+    """Текст запроса без значений: запросы, различающиеся только параметрами, совпадают."""
+    shape = STRING_LITERAL_RE.sub('?', sql)
+    shape = NUMBER_LITERAL_RE.sub('?', shape)
+    return IN_LIST_RE.sub('(...)', shape)
+
+
+def _callsite():
+    # Ближайший кадр кода проекта: вызов, который порождает повторяющиеся запросы
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        if frame.filename.startswith(PROJECT_ROOT) and 'site-packages' not in frame.filename:
+            return f'{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryInspector:
+    """Счетчик запросов по виду для connection.execute_wrapper."""
+
+    def __init__(self, repeat_threshold):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.shapes = Counter()
+        self.callsites = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = query_shape(sql)
+        self.count += 1
+        self.shapes[shape] += 1
+        # Стек разбирается один раз, когда вид запроса становится подозрительным
+        if self.shapes[shape] == self.repeat_threshold:
+            self.callsites[shape] = _callsite()
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        """[(вид запроса, число выполнений, место вызова)] для видов не реже repeat_threshold."""
+        return [
+            (shape, count, self.callsites.get(shape))
+            for shape, count in self.shapes.most_common()
+            if count >= self.repeat_threshold
+        ]
+
+    def problems(self, budget=None):
+        """Описания нарушений: повторяющиеся запросы и превышение бюджета."""
+        problems = [
+            f'{count} одинаковых запросов ({callsite or "место вызова неизвестно"}): {shape[:300]}'
+            for shape, count, callsite in self.repeated()
+        ]
+        if budget is not None and self.count > budget:
+            problems.append(f'{self.count} запросов при бюджете {budget}')
+        return problems
+
+
+@contextmanager
+def inspect_queries(repeat_threshold=None):
+    """Считает запросы всех подключений внутри блока."""
+    if repeat_threshold is None:
+        repeat_threshold = settings.QUERY_REPEAT_THRESHOLD
+    inspector = QueryInspector(repeat_threshold)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(inspector))
+        yield inspector
+
+
+@contextmanager
+def query_budget(budget, repeat_threshold=None):
+    """Для тестов: QueryBudgetExceeded, если блок выполнил больше budget запросов или N+1."""
+    with inspect_queries(repeat_threshold) as inspector:
+        yield inspector
+    problems = inspector.problems(budget)
+    if problems:
+        raise QueryBudgetExceeded('; '.join(problems))
+
+
+def view_query_budget(view_class, action):
+    """
+    Бюджет из атрибута представления query_budget: число для всех действий
+    или словарь {действие: число}. None, если бюджет не задан.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(action)
+    return budget
+
+
+def _resolved_view(request):
+    match = getattr(request, 'resolver_match', None)
+    func = match.func if match is not None else None
+    view_class = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    # У ViewSet действие определяется по методу запроса
+    actions = getattr(func, 'actions', None) or {}
+    return view_class, actions.get(request.method.lower())
+
+
+class QueryInspectionMiddleware:
+    """
+    Режим разработки и тестов (QUERY_INSPECTION=log|raise): ищет в каждом запросе
+    одинаковые по виду запросы к БД, повторенные QUERY_REPEAT_THRESHOLD раз и более,
+    и проверяет бюджет query_budget представления. Нарушения пишутся в журнал,
+    в режиме raise запрос завершается исключением QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.QUERY_INSPECTION
+        if mode not in ('log', 'raise'):
+            return self.get_response(request)
+
+        with inspect_queries() as inspector:
+            response = self.get_response(request)
+
+        view_class, action = _resolved_view(request)
+        problems = inspector.problems(view_query_budget(view_class, action))
+        if problems:
+            logger.warning(
+                "Query inspection problems",
+                extra={
+                    'event_type': 'query_inspection',
+                    'method': request.method,
+                    'view': view_class.__name__ if view_class else None,
+                    'action': action,
+                    'queries': inspector.count,
+                    'problems': problems,
+                },
+            )
+            if mode == 'raise':
+                raise QueryBudgetExceeded(f'{request.method} {request.path}: ' + '; '.join(problems))
+        return response
@@ -0,0 +1,178 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from .instrumentation import timed
+from .models import AccessEvent
+
+
+def _query_param_set(request, param):
+    """Имена из параметра вида ?fields=id,title, None если параметр не передан."""
+    if request is None:
+        return None
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Состав ответа по параметрам запроса:
+    ?fields=id,title - только перечисленные поля;
+    ?expand=author,type - связи из Meta.expandable_fields выводятся вложенными объектами,
+    остальные - id. Без ?expand раскрываются связи из Meta.default_expand.
+
+    Параметры применяет только корневой сериализатор, вложенные выводятся по умолчанию.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request') if self._is_root() else None
+
+        expand = _query_param_set(request, self.expand_query_param)
+        if expand is None:
+            expand = set(getattr(self.Meta, 'default_expand', ()))
+
+        for name, (serializer_class, options) in getattr(self.Meta, 'expandable_fields', {}).items():
+            if name not in fields:
+                continue
+            if name in expand:
+                fields[name] = serializer_class(read_only=True, **options)
+            elif not isinstance(fields[name], (serializers.RelatedField, serializers.ManyRelatedField)):
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, **options)
+
+        only = _query_param_set(request, self.fields_query_param)
+        if only:
+            fields = type(fields)((name, field) for name, field in fields.items() if name in only)
+        return fields
+
+    @timed('serialize')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
+
+
+def _field_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+def _collect_paths(serializer, model, prefix, prefetch_root, columns, select, prefetch):
+    """
+    Обходит поля сериализатора и собирает, что нужно загрузить из БД:
+    столбцы модели верхнего уровня, пути select_related и prefetch_related
+    (для каждого prefetch - пути select_related внутри его выборки).
+    Возвращает False, если поле верхнего уровня берется из свойства модели
+    и набор столбцов определить нельзя.
+    """
+    method_relations = getattr(getattr(serializer, 'Meta', None), 'method_field_relations', {})
+    exact = True
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.SerializerMethodField):
+            sources = method_relations.get(name, ())
+            nested = None
+        elif field.source == '*':
+            continue
+        else:
+            sources = (field.source,)
+            nested = _field_serializer(field)
+
+        for source in sources:
+            current_model = model
+            path = prefix
+            root = prefetch_root
+            parts = source.split('.')
+            for index, part in enumerate(parts):
+                try:
+                    model_field = current_model._meta.get_field(part)
+                except FieldDoesNotExist:
+                    # Свойство модели: на связанных моделях они загружаются целиком
+                    if not path:
+                        exact = False
+                    break
+
+                if not model_field.is_relation:
+                    if not path:
+                        columns.add(part)
+                    break
+
+                is_last = index == len(parts) - 1
+                if (is_last and nested is None
+                        and not model_field.many_to_many and not model_field.one_to_many):
+                    # Только id связанного объекта: хватает столбца внешнего ключа
+                    if not path:
+                        columns.add(part)
+                    break
+
+                path = f'{path}__{part}' if path else part
+                if model_field.many_to_many or model_field.one_to_many:
+                    root = path
+                    prefetch.setdefault(path, set())
+                elif root:
+                    prefetch[root].add(path[len(root) + 2:])
+                else:
+                    select.add(path)
+                current_model = model_field.related_model
+            else:
+                if nested is not None:
+                    _collect_paths(nested, current_model, path, root, set(), select, prefetch)
+
+    return exact
+
+
+def _leaf_paths(paths):
+    # Вложенные пути select_related покрывают свои префиксы
+    return sorted(path for path in paths if not any(other.startswith(f'{path}__') for other in paths))
+
+
+def _related_model(model, path):
+    for part in path.split('__'):
+        model = model._meta.get_field(part).related_model
+    return model
+
+
+def optimize_for_serializer(queryset, serializer, select_related=()):
+    """
+    Подгоняет queryset под поля сериализатора (с учетом ?fields= и ?expand=):
+    только нужные select_related/prefetch_related и .only() по выводимым столбцам.
+    select_related - связи, которые нужны представлению помимо сериализатора.
+    """
+    columns, select, prefetch = set(), set(select_related), {}
+    exact = _collect_paths(serializer, queryset.model, '', '', columns, select, prefetch)
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select:
+        queryset = queryset.select_related(*_leaf_paths(select))
+    for path in sorted(prefetch):
+        # Связи объектов M2M загружаются в том же запросе prefetch, а не отдельными
+        related_model = _related_model(queryset.model, path)
+        related = related_model._default_manager.all()
+        if prefetch[path]:
+            related = related.select_related(*_leaf_paths(prefetch[path]))
+        queryset = queryset.prefetch_related(Prefetch(path, queryset=related))
+
+    if exact:
+        pk_name = queryset.model._meta.pk.name
+        relations = {path.split('__', 1)[0] for path in select}
+        queryset = queryset.only(pk_name, *sorted(columns | relations))
+    return queryset
+
+
+class AccessEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AccessEvent
+        fields = ['id', 'timestamp', 'user_id', 'username', 'action', 'object_type', 'object_id',
+                  'object_title', 'required_clearance', 'ip', 'duration_ms']
+        read_only_fields = fields
@@ -0,0 +1,192 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .access import GRANT_FIELDS, personal_grant_fields
+from .access_index import INDEXED_MODELS, schedule_sync
+from .cache import CACHE_NAMESPACES, bump_namespaces_on_commit
+from .models import AccessEntry
+from .tokens import revoke_all_claims, revoke_user_claims
+
+# Цели выдачи доступа и их области в индексе
+GRANT_TARGET_SCOPES = {
+    'employees.Employee': AccessEntry.SCOPE_EMPLOYEE,
+    'employees.Division': AccessEntry.SCOPE_DIVISION,
+    'employees.Department': AccessEntry.SCOPE_DEPARTMENT,
+    'employees.Cluster': AccessEntry.SCOPE_CLUSTER,
+}
+
+
+def access_object_changed(sender, instance, **kwargs):
+    schedule_sync(sender, [instance.pk])
+
+
+def clearance_level_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    for label in INDEXED_MODELS:
+        model = apps.get_model(label)
+        AccessEntry.objects.filter(
+            object_type=model._meta.label_lower,
+            object_id__in=model.objects.filter(required_clearance=instance).values('pk'),
+        ).exclude(required_clearance=instance.number).update(required_clearance=instance.number)
+
+
+def grant_target_deleted(sender, instance, **kwargs):
+    # Каскадное удаление through-строк не отправляет m2m_changed
+    scope = GRANT_TARGET_SCOPES[sender._meta.label]
+    affected = AccessEntry.objects.filter(scope=scope, scope_id=instance.pk).values_list(
+        'object_type', 'object_id')
+
+    by_type = {}
+    for object_type, object_id in affected:
+        by_type.setdefault(object_type, []).append(object_id)
+
+    for object_type, ids in by_type.items():
+        schedule_sync(apps.get_model(object_type), ids)
+
+
+def _grants_changed_handler(model, field):
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    through = field.remote_field.through
+
+    def handler(sender, instance, action, reverse, pk_set, **kwargs):
+        if not reverse:
+            if action in ('post_add', 'post_remove', 'post_clear'):
+                schedule_sync(model, [instance.pk])
+            return
+
+        # Изменение со стороны сотрудника или подразделения: instance - цель выдачи
+        if action == 'pre_clear':
+            instance._access_cleared_ids = list(
+                through.objects.filter(**{f'{target}_id': instance.pk})
+                .values_list(f'{source}_id', flat=True)
+            )
+        elif action == 'post_clear':
+            schedule_sync(model, getattr(instance, '_access_cleared_ids', []))
+        elif action in ('post_add', 'post_remove'):
+            schedule_sync(model, pk_set or [])
+
+    return handler
+
+
+def connect_access_index_signals():
+    for label in INDEXED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(access_object_changed, sender=model,
+                          dispatch_uid=f'access_index_save_{label}')
+        post_delete.connect(access_object_changed, sender=model,
+                            dispatch_uid=f'access_index_delete_{label}')
+
+        for field_name, _, _ in GRANT_FIELDS:
+            field = model._meta.get_field(field_name)
+            m2m_changed.connect(_grants_changed_handler(model, field),
+                                sender=field.remote_field.through, weak=False,
+                                dispatch_uid=f'access_index_m2m_{label}_{field_name}')
+
+    for label in GRANT_TARGET_SCOPES:
+        pre_delete.connect(grant_target_deleted, sender=apps.get_model(label),
+                           dispatch_uid=f'access_index_target_{label}')
+
+    post_save.connect(clearance_level_saved, sender=apps.get_model('employees.ClearanceLevel'),
+                      dispatch_uid='access_index_clearance_level')
+
+
+def employee_claims_changed(sender, instance, **kwargs):
+    revoke_user_claims(instance.user_id)
+
+
+def user_claims_changed(sender, instance, update_fields=None, **kwargs):
+    # Обновление last_login при каждом входе не меняет утверждения токена
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    revoke_user_claims(instance.pk)
+
+
+def org_structure_changed(sender, instance, created=False, **kwargs):
+    if not created:
+        revoke_all_claims()
+
+
+def _revoke_employees_claims_on_commit(employee_model, employee_ids):
+    def revoke():
+        user_ids = employee_model.objects.filter(pk__in=employee_ids).values_list('user_id', flat=True)
+        revoke_user_claims(*user_ids)
+
+    if employee_ids:
+        # Отзыв до коммита не помешал бы выдать токен со старым списком personal_grants
+        transaction.on_commit(revoke)
+
+
+def _personal_grants_changed_handler(field):
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    through = field.remote_field.through
+
+    def handler(sender, instance, action, reverse, pk_set, **kwargs):
+        # Изменение со стороны сотрудника: instance - сотрудник
+        if reverse:
+            if action in ('post_add', 'post_remove', 'post_clear'):
+                _revoke_employees_claims_on_commit(type(instance), [instance.pk])
+            return
+
+        if action == 'pre_clear':
+            instance._claims_cleared_ids = list(
+                through.objects.filter(**{f'{source}_id': instance.pk})
+                .values_list(f'{target}_id', flat=True)
+            )
+        elif action == 'post_clear':
+            _revoke_employees_claims_on_commit(field.related_model, getattr(instance, '_claims_cleared_ids', []))
+        elif action in ('post_add', 'post_remove'):
+            _revoke_employees_claims_on_commit(field.related_model, list(pk_set or []))
+
+    return handler
+
+
+def connect_claims_revocation_signals():
+    employee = apps.get_model('employees.Employee')
+    post_save.connect(employee_claims_changed, sender=employee, dispatch_uid='claims_employee_save')
+    post_delete.connect(employee_claims_changed, sender=employee, dispatch_uid='claims_employee_delete')
+
+    post_save.connect(user_claims_changed, sender=apps.get_model('auth.User'),
+                      dispatch_uid='claims_user_save')
+
+    for label in ('employees.ClearanceLevel', 'employees.Division', 'employees.Department'):
+        post_save.connect(org_structure_changed, sender=apps.get_model(label),
+                          dispatch_uid=f'claims_org_save_{label}')
+
+    # Утверждение personal_grants: персональные выдачи allowed_employees
+    for field in personal_grant_fields():
+        m2m_changed.connect(_personal_grants_changed_handler(field),
+                            sender=field.remote_field.through, weak=False,
+                            dispatch_uid=f'claims_personal_grants_{field.model._meta.label}')
+
+
+def _namespaces_by_model():
+    namespaces = {}
+    for namespace, labels in CACHE_NAMESPACES.items():
+        for label in labels:
+            namespaces.setdefault(label, []).append(namespace)
+    return namespaces
+
+
+def _cache_invalidation_handler(namespaces):
+    def handler(sender, action=None, **kwargs):
+        if action is None or action in ('post_add', 'post_remove', 'post_clear'):
+            bump_namespaces_on_commit(namespaces)
+    return handler
+
+
+def connect_cache_invalidation_signals():
+    for label, namespaces in _namespaces_by_model().items():
+        model = apps.get_model(label)
+        handler = _cache_invalidation_handler(namespaces)
+        post_save.connect(handler, sender=model, weak=False,
+                          dispatch_uid=f'cache_namespace_save_{label}')
+        post_delete.connect(handler, sender=model, weak=False,
+                            dispatch_uid=f'cache_namespace_delete_{label}')
+
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(handler, sender=field.remote_field.through, weak=False,
+                                dispatch_uid=f'cache_namespace_m2m_{label}_{field.name}')
@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.cache import local_cache
+from documentation.models import Documentation, DocumentType
+from employees.models import ClearanceLevel, Cluster, Department, Division, Employee, Position
+from research.models import Research, ResearchStatus
+
+# Тесты не зависят от Redis и фонового сброса журнала обращений
+TEST_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                           'LOCATION': 'api-tests'}},
+    'ACCESS_EVENTS_ENABLED': False,
+    'QUERY_INSPECTION': 'off',
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class SeededTestCase(TestCase):
+    """
+    Оргструктура, сотрудники (с пустыми связями и фото), документы и исследования
+    с выдачами allowed_*. Объектов больше QUERY_REPEAT_THRESHOLD, чтобы N+1 был заметен.
+    """
+    objects_count = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        # Индекс доступа пересчитывается сигналами после коммита
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.create_data()
+
+    @classmethod
+    def create_data(cls):
+        cls.levels = [ClearanceLevel.objects.create(number=number) for number in range(1, 6)]
+        cls.cluster = Cluster.objects.create(name='Кластер А')
+        other_cluster = Cluster.objects.create(name='Кластер Б')
+        cls.department = Department.objects.create(name='Департамент 1', cluster=cls.cluster)
+        other_department = Department.objects.create(name='Департамент 2', cluster=other_cluster)
+        cls.division = Division.objects.create(name='Отдел 1', department=cls.department)
+        other_division = Division.objects.create(name='Отдел 2', department=other_department)
+        position = Position.objects.create(name='Научный сотрудник', cluster=cls.cluster)
+
+        cls.user = User.objects.create_user('reader', password='pw', is_staff=True, is_superuser=True)
+        cls.employee = Employee.objects.create(
+            user=cls.user, name='Анна Смирнова', clearance_level=cls.levels[3],
+            division=cls.division, position=position, profile_picture='profiles/anna.png',
+        )
+        # Сотрудник без уровня допуска, должности и фото: пустые внешние ключи в ответе
+        cls.bare_employee = Employee.objects.create(
+            user=User.objects.create_user('bare'), name='Борис Петров', division=other_division,
+        )
+        cls.employees = [cls.employee, cls.bare_employee] + [
+            Employee.objects.create(
+                user=User.objects.create_user(f'employee{index}'), name=f'Сотрудник {index}',
+                clearance_level=cls.levels[index % 5], division=(cls.division, other_division)[index % 2],
+                position=position if index % 3 else None,
+            )
+            for index in range(cls.objects_count)
+        ]
+
+        document_types = [DocumentType.objects.create(name=name) for name in ('Отчет', 'Протокол')]
+        statuses = [ResearchStatus.objects.create(name=name) for name in ('Активно', 'Завершено')]
+        cls.documents, cls.research = [], []
+        for index in range(cls.objects_count):
+            document = Documentation.objects.create(
+                title=f'Отчет об испытании {index}', type=document_types[index % 2],
+                content=f'Протокол испытания образца номер {index} в лаборатории',
+                author=cls.employees[index % len(cls.employees)],
+                required_clearance=cls.levels[index % 5],
+            )
+            research = Research.objects.create(
+                title=f'Исследование образца {index}', status=statuses[index % 2],
+                content=f'Наблюдение за образцом {index} и протокол испытания',
+                lead=cls.employees[(index + 1) % len(cls.employees)],
+                required_clearance=cls.levels[index % 5],
+            )
+            research.team.set(cls.employees[:3])
+            cls.documents.append(document)
+            cls.research.append(research)
+
+        # Выдачи доступа: объекты, видимые читателю по разным спискам, и недоступные ему
+        for items in (cls.documents, cls.research):
+            items[1].allowed_clusters.add(cls.cluster)
+            items[2].allowed_departments.add(other_department)
+            items[3].allowed_divisions.add(cls.division)
+            items[4].allowed_employees.add(cls.employee)
+            items[5].allowed_employees.add(cls.bare_employee)
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
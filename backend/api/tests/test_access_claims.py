@@ -0,0 +1,84 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.access import access_fingerprint, get_access_profile
+from api.tokens import ClaimsRefreshToken, ClaimsUser, claims_revoked
+from documentation.models import Documentation
+from employees.models import Employee
+from research.models import Research
+
+from .base import SeededTestCase
+
+
+class PersonalGrantsClaimsTests(SeededTestCase):
+    """Персональные выдачи в профиле доступа и в утверждениях access-токена."""
+
+    def access_token(self, user):
+        return ClaimsRefreshToken.for_user(user).access_token
+
+    def fresh_user(self, user):
+        # Профиль запоминается в объекте пользователя
+        return User.objects.get(pk=user.pk)
+
+    def test_profile_personal_grants(self):
+        self.assertEqual(get_access_profile(self.fresh_user(self.user)).personal_grants,
+                         ('documentation.documentation', 'research.research'))
+        other = self.employees[3]
+        self.assertEqual(get_access_profile(other.user).personal_grants, ())
+
+    def test_fingerprint_without_queries(self):
+        profile = get_access_profile(self.fresh_user(self.user))
+        other = get_access_profile(self.employees[3].user)
+        with self.assertNumQueries(0):
+            self.assertTrue(access_fingerprint(Documentation, profile).endswith(f':e{self.employee.id}'))
+            self.assertTrue(access_fingerprint(Documentation, other).endswith(':e-'))
+
+    def test_claims_round_trip(self):
+        token = self.access_token(self.user)
+        self.assertEqual(ClaimsUser(token)._access_profile, get_access_profile(self.fresh_user(self.user)))
+
+    def test_cached_list_without_queries(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token(self.user)}')
+        first = client.get('/api/documentation/')
+        with self.assertNumQueries(0):
+            second = client.get('/api/documentation/')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def assertRevoked(self, token, employee, revoked=True):
+        self.assertEqual(claims_revoked(token, employee.user_id), revoked)
+
+    def test_grant_changes_revoke_claims(self):
+        employee = self.employees[3]
+        document = self.documents[6]
+        token, other_token = self.access_token(employee.user), self.access_token(self.user)
+
+        for change in (
+            lambda: document.allowed_employees.add(employee),
+            lambda: document.allowed_employees.remove(employee),
+            lambda: document.allowed_employees.set([employee]),
+            lambda: document.allowed_employees.clear(),
+            lambda: employee.research_allowed.add(self.research[6]),
+            lambda: employee.research_allowed.clear(),
+        ):
+            with self.subTest(change=change):
+                # Отметки об отзыве хранятся в кеше
+                cache.clear()
+                with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                    change()
+                    # До коммита утверждения еще действительны
+                    self.assertRevoked(token, employee, revoked=False)
+                self.assertTrue(callbacks)
+                self.assertRevoked(token, employee)
+                self.assertRevoked(other_token, self.employee, revoked=False)
+
+    def test_unrelated_changes_keep_claims(self):
+        employee = self.employees[3]
+        token = self.access_token(employee.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Research.objects.get(pk=self.research[6].pk).allowed_employees.add(self.bare_employee)
+            Employee.objects.get(pk=self.bare_employee.pk).documentation_allowed.clear()
+        self.assertRevoked(token, employee, revoked=False)
+        self.assertRevoked(self.access_token(self.user), self.employee, revoked=False)
@@ -0,0 +1,217 @@
+import os
+from datetime import timedelta
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from api.audit_trail import AccessEventBuffer, record_access_event
+from api.models import AccessEvent
+from api.tokens import ClaimsRefreshToken
+
+from .base import SeededTestCase
+
+
+def make_event(index, **fields):
+    return {
+        'timestamp': timezone.now(), 'user_id': None, 'username': f'user{index}', 'action': 'view',
+        'object_type': 'documentation.documentation', 'object_id': index, **fields,
+    }
+
+
+class AccessEventBufferTests(SeededTestCase):
+    """Сброс буфера вызывается напрямую, без фонового потока."""
+
+    def setUp(self):
+        super().setUp()
+        # Соединение теста открыто в транзакции и не должно закрываться при сбросе
+        patcher = mock.patch('api.audit_trail.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_buffer(self, batch_size=3, max_size=10):
+        buffer = AccessEventBuffer(batch_size=batch_size, flush_interval=60, max_size=max_size)
+        # Поток сброса уже «запущен» в этом процессе
+        buffer._pid = os.getpid()
+        return buffer
+
+    def usernames(self, buffer):
+        return [event['username'] for event in buffer._events]
+
+    def test_batch_wakes_flusher_and_is_saved(self):
+        buffer = self.make_buffer(batch_size=3)
+        for index in range(2):
+            buffer.add(make_event(index))
+        self.assertFalse(buffer._wakeup.is_set())
+        buffer.add(make_event(2))
+        self.assertTrue(buffer._wakeup.is_set())
+
+        buffer.add(make_event(3))
+        buffer.flush()
+        self.assertEqual(buffer._events, [])
+        self.assertEqual(sorted(AccessEvent.objects.values_list('username', flat=True)),
+                         ['user0', 'user1', 'user2', 'user3'])
+
+    def test_requeue_on_database_error(self):
+        buffer = self.make_buffer()
+        for index in range(3):
+            buffer.add(make_event(index))
+
+        with mock.patch.object(AccessEvent.objects, 'bulk_create', side_effect=DatabaseError('down')), \
+                self.assertLogs('audit', 'ERROR'):
+            buffer.flush()
+        self.assertEqual(self.usernames(buffer), ['user0', 'user1', 'user2'])
+        self.assertEqual(buffer.dropped, 0)
+
+        buffer.flush()
+        self.assertEqual(AccessEvent.objects.count(), 3)
+        self.assertEqual(buffer._events, [])
+
+    def test_requeue_trims_oldest(self):
+        buffer = self.make_buffer(max_size=4)
+        for index in range(3):
+            buffer.add(make_event(index))
+
+        def fail(*args, **kwargs):
+            # Пока идет сброс, запросы добавляют новые записи
+            for index in range(3, 6):
+                buffer.add(make_event(index))
+            raise DatabaseError('down')
+
+        with mock.patch.object(AccessEvent.objects, 'bulk_create', side_effect=fail), \
+                self.assertLogs('audit', 'ERROR'):
+            buffer.flush()
+        self.assertEqual(self.usernames(buffer), ['user2', 'user3', 'user4', 'user5'])
+        self.assertEqual(buffer.dropped, 2)
+
+    def test_add_trims_oldest(self):
+        dropped_before = REGISTRY.get_sample_value('access_events_dropped_total') or 0
+        buffer = self.make_buffer(batch_size=100, max_size=3)
+        for index in range(5):
+            buffer.add(make_event(index))
+        self.assertEqual(self.usernames(buffer), ['user2', 'user3', 'user4'])
+        self.assertEqual(buffer.dropped, 2)
+        self.assertEqual(REGISTRY.get_sample_value('access_events_dropped_total') - dropped_before, 2)
+
+        with self.assertLogs('audit', 'WARNING') as logs:
+            buffer.flush()
+        self.assertEqual(logs.records[0].event_type, 'access_events_dropped')
+        self.assertEqual(logs.records[0].dropped, 2)
+        self.assertEqual(AccessEvent.objects.count(), 3)
+
+        # О тех же отброшенных записях повторно не сообщается
+        with self.assertNoLogs('audit', 'WARNING'):
+            buffer.flush()
+
+
+class RecordAccessEventTests(SeededTestCase):
+
+    def record(self, request, obj, **kwargs):
+        buffer = mock.Mock()
+        with override_settings(ACCESS_EVENTS_ENABLED=True), \
+                mock.patch('api.audit_trail.get_buffer', return_value=buffer):
+            record_access_event(request, obj, 'documentation.documentation', 'view', **kwargs)
+        buffer.add.assert_called_once()
+        return buffer.add.call_args.args[0]
+
+    def test_fields(self):
+        document = self.documents[2]
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='203.0.113.7, 10.0.0.1')
+        request.user = self.user
+        event = self.record(request, document, duration_ms=12)
+
+        self.assertLess(timezone.now() - event.pop('timestamp'), timedelta(seconds=5))
+        self.assertEqual(event, {
+            'user_id': self.user.id,
+            'username': 'reader',
+            'action': 'view',
+            'object_type': 'documentation.documentation',
+            'object_id': document.id,
+            'object_title': document.title,
+            'required_clearance': document.required_clearance.number,
+            'ip': '203.0.113.7',
+            'duration_ms': 12,
+        })
+
+    def test_anonymous_without_object(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='not-an-ip')
+        request.user = mock.Mock(is_authenticated=False)
+        event = self.record(request, None)
+        self.assertEqual(
+            {key: event[key] for key in ('user_id', 'username', 'object_id', 'object_title',
+                                         'required_clearance', 'ip', 'duration_ms')},
+            {'user_id': None, 'username': '', 'object_id': None, 'object_title': '',
+             'required_clearance': None, 'ip': None, 'duration_ms': None},
+        )
+
+    def test_disabled(self):
+        with mock.patch('api.audit_trail.get_buffer') as get_buffer:
+            record_access_event(RequestFactory().get('/'), None, 'documentation.documentation', 'view')
+        get_buffer.assert_not_called()
+
+
+class AccessEventViewSetTests(SeededTestCase):
+    url = reverse('access-event-list')
+
+    @classmethod
+    def create_data(cls):
+        super().create_data()
+        cls.started = timezone.now().replace(microsecond=0) - timedelta(days=1)
+        # Часть записей с одинаковым временем: порядок внутри них задает id
+        AccessEvent.objects.bulk_create([
+            AccessEvent(
+                timestamp=cls.started + timedelta(minutes=index // 2), username='reader', action='view',
+                object_type=('documentation.documentation', 'research.research')[index % 2],
+                object_id=cls.documents[index % 3].id,
+            )
+            for index in range(30)
+        ])
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {ClaimsRefreshToken.for_user(user).access_token}')
+        return client
+
+    def get(self, params=None, url=None):
+        response = self.client_for(self.user).get(url or self.url, params)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return response.json()
+
+    def test_admin_only(self):
+        user = self.employees[3].user
+        self.assertFalse(user.is_staff)
+        self.assertEqual(self.client_for(user).get(self.url).status_code, 403)
+        self.assertEqual(APIClient().get(self.url).status_code, 401)
+
+    def expected_ids(self, **filters):
+        return list(AccessEvent.objects.filter(**filters).order_by('-timestamp', '-id')
+                    .values_list('id', flat=True))
+
+    def test_filters(self):
+        document_id = self.documents[1].id
+        data = self.get({'object_type': 'research.research', 'object_id': document_id})
+        self.assertEqual([item['id'] for item in data['results']],
+                         self.expected_ids(object_type='research.research', object_id=document_id))
+        self.assertTrue(data['results'])
+
+        after, before = self.started + timedelta(minutes=3), self.started + timedelta(minutes=6)
+        data = self.get({'timestamp_after': after.isoformat(), 'timestamp_before': before.isoformat()})
+        self.assertEqual([item['id'] for item in data['results']],
+                         self.expected_ids(timestamp__gte=after, timestamp__lt=before))
+        self.assertEqual(len(data['results']), 6)
+
+    def test_keyset_paging(self):
+        ids = []
+        data = self.get()
+        self.assertNotIn('count', data)
+        while True:
+            ids.extend(item['id'] for item in data['results'])
+            if not data['next']:
+                break
+            data = self.get(url=data['next'])
+        self.assertEqual(ids, self.expected_ids())
+        self.assertEqual(len(ids), 30)
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.cache import local_cache
+from api.compiled_serializers import CompiledListMixin, CompiledSerializer
+
+from .base import SeededTestCase
+
+
+class CompiledListTests(SeededTestCase):
+    """Список из скомпилированного плана совпадает побайтно с выводом сериализаторов DRF."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url):
+        # Ответ не должен прийти из кеша предыдущего запроса
+        cache.clear()
+        local_cache.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return response.content
+
+    def assertSameAsDrf(self, url):
+        with mock.patch.object(CompiledSerializer, 'to_representation', autospec=True,
+                               side_effect=CompiledSerializer.to_representation) as plan:
+            compiled_content = self.get(url)
+        # Тест имеет смысл, только если список действительно собран планом
+        self.assertTrue(plan.called, url)
+
+        with mock.patch.object(CompiledListMixin, 'get_compiled_serializer', return_value=None):
+            drf_content = self.get(url)
+
+        self.assertEqual(compiled_content, drf_content, url)
+        return compiled_content
+
+    def test_documents(self):
+        for url in (
+            '/api/documentation/',
+            '/api/documentation/?ordering=-title',
+            '/api/documentation/?pagination=cursor',
+            '/api/documentation/?fields=id,title,required_clearance_name',
+            # Вложенный сотрудник с фото и вложенными связями, уровень допуска из Meta.values_fields
+            '/api/documentation/?expand=author,type,required_clearance',
+            '/api/documentation/?expand=author&fields=id,author',
+        ):
+            with self.subTest(url=url):
+                self.assertSameAsDrf(url)
+
+    def test_documents_search_headline(self):
+        content = self.assertSameAsDrf('/api/documentation/?search=образца')
+        self.assertIn('"headline":"', content.decode())
+
+    def test_research(self):
+        for url in (
+            '/api/research/',
+            '/api/research/?fields=id,title,status_name,lead_name',
+            '/api/research/?expand=lead,status,required_clearance',
+            '/api/research/?search=испытания',
+        ):
+            with self.subTest(url=url):
+                self.assertSameAsDrf(url)
+
+    def test_employees(self):
+        for url in (
+            # По умолчанию связи раскрыты, у части сотрудников пустые уровень допуска и должность
+            '/api/employees/',
+            '/api/employees/?expand=',
+            '/api/employees/?expand=position,clearance_level',
+            '/api/employees/?fields=id,name,profile_picture',
+            '/api/employees/?ordering=-clearance_level__number',
+        ):
+            with self.subTest(url=url):
+                self.assertSameAsDrf(url)
+
+    def test_null_relations_and_files(self):
+        content = self.assertSameAsDrf('/api/employees/?fields=id,clearance_level,position,profile_picture')
+        self.assertIn(f'{{"id":{self.bare_employee.id},"clearance_level":null,"position":null,'
+                      f'"profile_picture":null}}', content.decode())
+        self.assertIn('"profile_picture":"http://testserver/media/profiles/anna.png"', content.decode())
@@ -0,0 +1,40 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+from django_redis.cache import RedisCache
+
+from api.instrumentation import InstrumentedCacheMixin, RequestProfile, _current_profile
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedCacheTests(SimpleTestCase):
+    """Вызовы бэкенда кеша относятся к участку cache текущего запроса."""
+
+    def setUp(self):
+        self.cache = InstrumentedLocMemCache('instrumentation-tests', {})
+        self.profile = RequestProfile()
+        token = _current_profile.set(self.profile)
+        self.addCleanup(_current_profile.reset, token)
+
+    def test_calls_counted(self):
+        self.cache.set('a', 1)
+        self.cache.add('b', 2)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        self.cache.set_many({'c': 3})
+        self.assertEqual(self.cache.incr('c'), 4)
+        self.assertEqual(self.cache.decr('c'), 3)
+        self.assertTrue(self.cache.has_key('c'))
+        self.assertTrue(self.cache.touch('c'))
+        self.cache.delete('a')
+        self.cache.delete_many(['b', 'c'])
+        self.assertEqual(self.profile.counts['cache'], 11)
+
+    def test_redis_cache_methods(self):
+        # Каждый перехваченный метод есть у RedisCache
+        for name, method in vars(InstrumentedCacheMixin).items():
+            if callable(method):
+                with self.subTest(method=name):
+                    self.assertTrue(callable(getattr(RedisCache, name, None)))
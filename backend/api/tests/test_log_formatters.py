@@ -0,0 +1,114 @@
+import copy
+import json
+import logging
+import sys
+
+from django.test import SimpleTestCase
+
+from api.log_formatters import MASKED_VALUE, MAX_DEPTH, MAX_ITEMS, MAX_STRING_LENGTH, TRUNCATED, AuditLogFormatter
+from api.log_queue import PipelineQueueHandler
+from api.management.commands.benchmark_log_formatter import LegacyAuditLogFormatter, sample_records
+from employees.models import ClearanceLevel
+
+EXTRA = {
+    'event_type': 'document_list',
+    'user_id': 12,
+    'required_clearance': ClearanceLevel(id=3, number=3),
+    'filters': {'search': ['отчет'], 'access_token': ['x'], 'nested': {'password': 'p', 'page': [1, 2]}},
+    'path': '/api/documentation/',
+    '_private': 'skipped',
+}
+
+
+class AuditLogFormatterTests(SimpleTestCase):
+    """Вывод совпадает с прежней реализацией для записей из разных источников."""
+
+    def format(self, record):
+        return json.loads(AuditLogFormatter().format(record))
+
+    def assertSameAsLegacy(self, record):
+        # Первое форматирование задает server_time, второе использует его же
+        current = self.format(record)
+        self.assertEqual(current, json.loads(LegacyAuditLogFormatter().format(record)))
+        return current
+
+    def test_logger_make_record(self):
+        record = logging.getLogger('documentation').makeRecord(
+            'documentation', logging.INFO, __file__, 10, 'Document list %s', ('retrieved',), None,
+            func='list', extra=EXTRA,
+        )
+        data = self.assertSameAsLegacy(record)
+        self.assertEqual(data['message'], 'Document list retrieved')
+        self.assertEqual(data['path'], '/api/documentation/')
+        self.assertEqual(data['context'], {
+            'event_type': 'document_list',
+            'user_id': 12,
+            'required_clearance': 'ClearanceLevel:3',
+            'filters': {'search': ['отчет'], 'access_token': MASKED_VALUE,
+                        'nested': {'password': MASKED_VALUE, 'page': [1, 2]}},
+        })
+
+    def test_make_log_record(self):
+        record = logging.makeLogRecord({'name': 'api.security', 'levelno': logging.WARNING,
+                                        'levelname': 'WARNING', 'msg': 'Access denied', **EXTRA})
+        self.assertEqual(set(self.assertSameAsLegacy(record)['context']),
+                         {'event_type', 'user_id', 'required_clearance', 'filters'})
+
+    def test_queued_copy(self):
+        # Запись, которую PipelineQueueHandler ставит в очередь
+        original = logging.getLogger('api').makeRecord(
+            'api', logging.INFO, __file__, 10, 'User %s', ('ivanov',), None, extra=EXTRA)
+        record = PipelineQueueHandler(None, ()).prepare(original)
+        self.assertEqual(self.assertSameAsLegacy(record)['message'], 'User ivanov')
+        self.assertEqual(self.format(copy.copy(original))['context'], self.format(record)['context'])
+
+    def test_exception(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = logging.getLogger('api').makeRecord(
+                'api', logging.ERROR, __file__, 10, 'Failed', None, sys.exc_info(), extra=EXTRA)
+        self.assertIn('ValueError: boom', self.assertSameAsLegacy(record)['exception'])
+
+    def test_sample_records(self):
+        for record in sample_records():
+            with self.subTest(event_type=record.event_type):
+                self.assertSameAsLegacy(record)
+
+    def context(self, **extra):
+        return self.format(logging.makeLogRecord({'msg': 'test', **extra}))['context']
+
+    def test_limits(self):
+        nested = value = {}
+        for _ in range(MAX_DEPTH + 2):
+            value['child'] = {}
+            value = value['child']
+        long_string = 'x' * (MAX_STRING_LENGTH + 10)
+
+        context = self.context(
+            nested=nested,
+            items=list(range(MAX_ITEMS + 5)),
+            mapping={f'k{index}': index for index in range(MAX_ITEMS + 5)},
+            strings=[long_string],
+            top_string=long_string,
+        )
+
+        depth, value = 0, context['nested']
+        while isinstance(value, dict):
+            value, depth = value['child'], depth + 1
+        self.assertEqual((value, depth), (TRUNCATED, MAX_DEPTH))
+        self.assertEqual(context['items'], list(range(MAX_ITEMS)) + [TRUNCATED])
+        self.assertEqual(len(context['mapping']), MAX_ITEMS + 1)
+        self.assertEqual(context['mapping'][TRUNCATED], 5)
+        self.assertEqual(context['strings'], ['x' * MAX_STRING_LENGTH + TRUNCATED])
+        # Строка верхнего уровня записывается как есть
+        self.assertEqual(context['top_string'], long_string)
+
+    def test_masking(self):
+        context = self.context(
+            payload=({'password': 'p', 'user': 'ivanov'},),
+            headers={'Authorization': 'Bearer t', 1: 'numeric key', 'API_KEY': 'k'},
+        )
+        self.assertEqual(context['payload'], [{'password': MASKED_VALUE, 'user': 'ivanov'}])
+        self.assertEqual(context['headers'], {'Authorization': MASKED_VALUE, '1': 'numeric key',
+                                              'API_KEY': MASKED_VALUE})
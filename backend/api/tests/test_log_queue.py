@@ -0,0 +1,54 @@
+import logging
+import threading
+
+from django.test import SimpleTestCase
+
+from api.log_queue import LogPipeline
+
+
+class BlockingHandler(logging.Handler):
+    """Держит поток очереди на первой записи, пока тест не отпустит его."""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.unblock = threading.Event()
+
+    def emit(self, record):
+        self.started.set()
+        self.unblock.wait(5)
+
+
+class LogPipelineDropTests(SimpleTestCase):
+
+    def test_concurrent_drops_counted(self):
+        pipeline = LogPipeline(maxsize=1, block_timeout=0.001)
+        handler = BlockingHandler()
+        self.addCleanup(pipeline.stop)
+        self.addCleanup(handler.unblock.set)
+
+        def put(level=logging.INFO):
+            pipeline.put(logging.makeLogRecord({'levelno': level, 'levelname': logging.getLevelName(level)}),
+                         (handler,))
+
+        # Первая запись занимает поток очереди, вторая заполняет очередь
+        put()
+        self.assertTrue(handler.started.wait(5))
+        put()
+
+        threads_count, per_thread = 8, 500
+        barrier = threading.Barrier(threads_count)
+
+        def drop_many():
+            barrier.wait()
+            for _ in range(per_thread):
+                put()
+
+        threads = [threading.Thread(target=drop_many) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        put(logging.WARNING)
+
+        self.assertEqual(pipeline.stats()['dropped'], {'INFO': threads_count * per_thread, 'WARNING': 1})
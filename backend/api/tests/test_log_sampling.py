@@ -0,0 +1,65 @@
+import logging
+import os
+from datetime import datetime
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.log_sampling import SamplingFilter
+
+
+def make_record(event_type, level=logging.INFO):
+    return logging.makeLogRecord({'levelno': level, 'levelname': logging.getLevelName(level),
+                                  'event_type': event_type})
+
+
+class SamplingFilterTests(SimpleTestCase):
+    """Сводка пишется сбросом фильтра, а не следующей записью того же события."""
+
+    def setUp(self):
+        self.filter = SamplingFilter(rules={'jwt_auth': {'rate': 1.0, 'limit': 2}}, interval=60)
+        # Поток сводок уже «запущен» в этом процессе
+        self.filter._pid = os.getpid()
+
+    def test_limit_and_pass_through(self):
+        kept = [self.filter.filter(make_record('jwt_auth')) for _ in range(5)]
+        self.assertEqual(kept, [True, True, False, False, False])
+        self.assertTrue(self.filter.filter(make_record('jwt_auth', logging.WARNING)))
+        self.assertTrue(self.filter.filter(make_record('login')))
+
+    def test_flush_reports_actual_window(self):
+        with mock.patch('api.log_sampling.time.time', return_value=1000.0):
+            self.filter.flush()
+        for _ in range(3):
+            self.filter.filter(make_record('jwt_auth'))
+
+        # Окно длиннее интервала: события после долгой паузы не пришли
+        with mock.patch('api.log_sampling.time.time', return_value=1250.5), \
+                self.assertLogs('api.log_sampling', 'INFO') as logs:
+            self.filter.flush()
+        record = logs.records[0]
+        self.assertEqual(record.event_type, 'log_sampling_summary')
+        self.assertEqual(datetime.fromisoformat(record.window_start).timestamp(), 1000.0)
+        self.assertEqual(datetime.fromisoformat(record.window_end).timestamp(), 1250.5)
+        self.assertEqual(record.window_seconds, 250.5)
+        self.assertEqual(record.events, [{'event_type': 'jwt_auth', 'seen': 3, 'kept': 2, 'dropped': 1}])
+
+        # Новое окно: счетчики и лимит начинаются заново, пустая сводка не пишется
+        with self.assertNoLogs('api.log_sampling', 'INFO'):
+            self.filter.flush()
+        self.assertTrue(self.filter.filter(make_record('jwt_auth')))
+
+    def test_stop_flushes_last_window(self):
+        self.filter.filter(make_record('jwt_auth'))
+        with self.assertLogs('api.log_sampling', 'INFO') as logs:
+            self.filter.stop()
+        self.assertEqual(logs.records[0].events[0]['seen'], 1)
+
+    def test_timer_started_once_per_process(self):
+        sampling = SamplingFilter(rules={'jwt_auth': {'rate': 1.0}}, interval=60)
+        with mock.patch('api.log_sampling.threading.Thread') as thread, \
+                mock.patch('api.log_sampling.atexit.register') as register:
+            for _ in range(3):
+                sampling.filter(make_record('jwt_auth'))
+        thread.return_value.start.assert_called_once()
+        register.assert_called_once_with(sampling.stop)
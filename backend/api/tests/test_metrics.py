@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import REGISTRY
+
+from api.metrics import OTHER_METHOD, UNRESOLVED_ROUTE
+
+
+class MetricsEndpointTests(SimpleTestCase):
+    """Доступ к /api/metrics: Bearer-токен METRICS_TOKEN, без токена - только при DEBUG."""
+    url = '/api/metrics'
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_closed_without_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_open_without_token_in_debug(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='scrape-secret', DEBUG=True)
+    def test_token_required_when_set(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds', response.content)
+
+
+class RequestLabelsTests(SimpleTestCase):
+    """Значения меток от клиента не порождают новые серии."""
+
+    def test_unknown_methods_share_one_series(self):
+        for method in ('FOO1', 'FOO2', 'PROPFIND'):
+            self.client.generic(method, '/api/health-unknown/')
+        self.assertIsNotNone(REGISTRY.get_sample_value(
+            'http_request_duration_seconds_count',
+            {'method': OTHER_METHOD, 'route': UNRESOLVED_ROUTE, 'status': '404'}))
+        for method in ('FOO1', 'FOO2', 'PROPFIND'):
+            self.assertIsNone(REGISTRY.get_sample_value(
+                'http_request_duration_seconds_count',
+                {'method': method, 'route': UNRESOLVED_ROUTE, 'status': '404'}))
+
+    def test_standard_method_kept(self):
+        self.client.delete('/api/health-unknown/')
+        self.assertIsNotNone(REGISTRY.get_sample_value(
+            'http_request_duration_seconds_count',
+            {'method': 'DELETE', 'route': UNRESOLVED_ROUTE, 'status': '404'}))
@@ -0,0 +1,101 @@
+from io import StringIO
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from api.cache import local_cache
+from api.models import AccessEvent
+from api.query_inspection import query_budget, view_query_budget
+from api.views import AccessEventViewSet
+from documentation.api.views import DocumentViewSet
+from employees.api.views import EmployeeViewSet
+from employees.models import Employee
+from research.api.views import ResearchViewSet
+
+from .base import SeededTestCase
+
+
+class QueryBudgetTests(SeededTestCase):
+    """Число запросов к БД на эндпоинтах API и страницах админки при пустом кеше."""
+
+    @classmethod
+    def create_data(cls):
+        super().create_data()
+        # Читатель без прав администратора: списки фильтруются по уровню допуска и выдачам
+        cls.reader = User.objects.create_user('plain_reader')
+        Employee.objects.create(user=cls.reader, name='Вера Орлова', clearance_level=cls.levels[3],
+                                division=cls.division)
+        cls.access_event = AccessEvent.objects.create(
+            timestamp=timezone.now(), user_id=cls.user.id, username=cls.user.username, action='view',
+            object_type='documentation', object_id=cls.documents[0].id, object_title=cls.documents[0].title,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+    def get(self, url, budget, user=None):
+        # Ответ не должен прийти из кеша, сессия хранится в кеше и создается заново
+        cache.clear()
+        local_cache.clear()
+        self.client.force_login(user or self.user)
+        with query_budget(budget):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return response
+
+    def assertWithinBudget(self, view_class, action, url, users=None):
+        budget = view_query_budget(view_class, action)
+        self.assertIsNotNone(budget, f'{view_class.__name__}.{action}')
+        for user in users or (self.user, self.reader):
+            with self.subTest(url=url, user=user.username):
+                self.get(url, budget, user)
+
+    def assertObjectsWithinBudget(self, view_class, basename, objects):
+        self.assertWithinBudget(view_class, 'list', reverse(f'{basename}-list'))
+        self.assertWithinBudget(view_class, 'list', reverse(f'{basename}-list') + '?search=образца')
+        # Открытый объект (1 УД) проверяется без профиля доступа,
+        # объекты с выдачей кластеру и отделу читателя - с профилем
+        for obj in (objects[0], objects[1], objects[3]):
+            self.assertWithinBudget(view_class, 'retrieve', reverse(f'{basename}-detail', args=[obj.id]))
+
+    def test_documents(self):
+        self.assertObjectsWithinBudget(DocumentViewSet, 'documentation', self.documents)
+
+    def test_research(self):
+        self.assertObjectsWithinBudget(ResearchViewSet, 'research', self.research)
+
+    def test_employees(self):
+        self.assertWithinBudget(EmployeeViewSet, 'list', reverse('employee-list'))
+        self.assertWithinBudget(EmployeeViewSet, 'retrieve', reverse('employee-detail', args=[self.employee.id]))
+        self.assertWithinBudget(EmployeeViewSet, 'my_profile', reverse('employee-my-profile'))
+
+    def test_access_events(self):
+        # Журнал доступен только администраторам
+        self.assertWithinBudget(AccessEventViewSet, 'list', reverse('access-event-list'), users=[self.user])
+        self.assertWithinBudget(AccessEventViewSet, 'retrieve',
+                                reverse('access-event-detail', args=[self.access_event.id]), users=[self.user])
+
+    def test_admin_changelists(self):
+        # Бюджета у страниц админки нет: проверяются только повторяющиеся запросы (N+1)
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            with self.subTest(model=opts.label):
+                self.get(reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist'),
+                         getattr(model_admin, 'query_budget', None))
+
+    def test_check_query_budgets_command(self):
+        # Команда находит все маршруты с query_budget, в том числе добавленные позже
+        out = StringIO()
+        call_command('check_query_budgets', username=self.user.username, stdout=out)
+        self.assertIn('Все бюджеты запросов соблюдены', out.getvalue())
+        self.assertNotIn('skip', out.getvalue())
+
+    def test_check_query_budgets_command_requires_staff_for_admin(self):
+        with self.assertRaisesMessage(CommandError, 'is_staff'):
+            call_command('check_query_budgets', username=self.bare_employee.user.username, stdout=StringIO())
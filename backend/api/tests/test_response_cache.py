@@ -0,0 +1,79 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.response import Response
+
+from api.cache import LOCK_TIMEOUT, LOCK_WAIT_TIMEOUT, cache_response, local_cache, response_cache_key
+
+from .base import TEST_SETTINGS
+
+
+class StubView:
+    basename = 'stub'
+
+    def __init__(self):
+        self.calls = 0
+
+    @cache_response(60, namespaces=('documentation',))
+    def list(self, request):
+        self.calls += 1
+        return Response({'value': self.calls})
+
+
+@override_settings(**TEST_SETTINGS)
+class ResponseCacheLockTests(SimpleTestCase):
+    """Пересчет ответа одним воркером: устаревшая запись, ожидание и его границы."""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.view = StubView()
+        self.request = RequestFactory().get('/api/stub/')
+        self.key = response_cache_key(self.view, self.request, ('documentation',))
+        self.lock_key = f'{self.key}:lock'
+
+    def hold_lock(self):
+        cache.set(self.lock_key, 1, LOCK_TIMEOUT)
+
+    def test_stale_entry_served_without_waiting(self):
+        cache.set(self.key, {'data': {'value': 'stale'}, 'expires': time.time() - 1}, 60)
+        self.hold_lock()
+        with mock.patch('api.cache.time.sleep') as sleep:
+            response = self.view.list(self.request)
+        self.assertEqual(response.data, {'value': 'stale'})
+        self.assertEqual(self.view.calls, 0)
+        sleep.assert_not_called()
+
+    def test_lock_holder_recomputes_stale_entry(self):
+        cache.set(self.key, {'data': {'value': 'stale'}, 'expires': time.time() - 1}, 60)
+        self.assertEqual(self.view.list(self.request).data, {'value': 1})
+        self.assertIsNone(cache.get(self.lock_key))
+
+    def test_entry_stored_during_wait(self):
+        self.hold_lock()
+
+        def store(interval):
+            cache.set(self.key, {'data': {'value': 'computed'}, 'expires': time.time() + 60}, 60)
+
+        with mock.patch('api.cache.time.sleep', side_effect=store):
+            response = self.view.list(self.request)
+        self.assertEqual(response.data, {'value': 'computed'})
+        self.assertEqual(self.view.calls, 0)
+
+    def test_lock_released_without_entry_stops_waiting(self):
+        self.hold_lock()
+        with mock.patch('api.cache.time.sleep', side_effect=lambda interval: cache.delete(self.lock_key)) as sleep:
+            response = self.view.list(self.request)
+        self.assertEqual(response.data, {'value': 1})
+        self.assertEqual(sleep.call_count, 1)
+
+    def test_wait_is_bounded(self):
+        self.hold_lock()
+        started = time.monotonic()
+        response = self.view.list(self.request)
+        elapsed = time.monotonic() - started
+        self.assertEqual(response.data, {'value': 1})
+        self.assertGreaterEqual(elapsed, LOCK_WAIT_TIMEOUT)
+        self.assertLess(elapsed, LOCK_WAIT_TIMEOUT + 0.2)
@@ -0,0 +1,38 @@
+from rest_framework.test import APIClient
+
+from .base import SeededTestCase
+
+
+class FullTextSearchTests(SeededTestCase):
+    """?search= по search_vector и по именам сотрудников из search_fields."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return {item['id'] for item in response.json()['results']}
+
+    def assertFound(self, url, objects):
+        visible = self.ids(url.split('?')[0])
+        expected = {obj.id for obj in objects} & visible
+        self.assertTrue(expected, url)
+        self.assertEqual(self.ids(url), expected)
+
+    def test_documents(self):
+        # Заголовок и содержимое - по search_vector (словоформы), автор - по подстроке имени
+        self.assertFound('/api/documentation/?search=испытания', self.documents)
+        self.assertFound('/api/documentation/?search=Смирнов',
+                         [document for document in self.documents if document.author == self.employee])
+        self.assertEqual(self.ids('/api/documentation/?search=отсутствует'), set())
+
+    def test_research(self):
+        self.assertFound('/api/research/?search=протоколы', self.research)
+        # Все слова запроса - в имени одного сотрудника: руководителя или участника команды
+        lead = self.employees[7]
+        self.assertFound(f'/api/research/?search={lead.name}',
+                         [research for research in self.research if research.lead == lead])
+        self.assertFound(f'/api/research/?search={self.bare_employee.name}', self.research)
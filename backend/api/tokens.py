@@ -0,0 +1,78 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .access import AccessProfile, get_access_profile
+
+# Утверждения токена, из которых собирается профиль доступа без обращения к БД
+ACCESS_CLAIMS = ('employee_id', 'clearance', 'division_id', 'department_id', 'cluster_id', 'personal_grants')
+
+REVOKED_USER_KEY = 'jwt_claims_revoked_{user_id}'
+REVOKED_ALL_KEY = 'jwt_claims_revoked_all'
+
+
+def add_access_claims(token, user):
+    """Записывает в токен уровень допуска и подразделения сотрудника."""
+    profile = get_access_profile(user)
+    token['username'] = user.username
+    # Журнал обращений (/api/audit/) доступен только сотрудникам с is_staff
+    token['is_staff'] = user.is_staff
+    for claim in ACCESS_CLAIMS:
+        token[claim] = getattr(profile, claim) if profile else None
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh-токен, access-токены которого несут утверждения профиля доступа."""
+
+    @classmethod
+    def for_user(cls, user):
+        return add_access_claims(super().for_user(user), user)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsUser(TokenUser):
+    """Облегченный пользователь, собранный из утверждений access-токена."""
+
+    def __init__(self, token):
+        super().__init__(token)
+        if token.get('employee_id') is None:
+            self._access_profile = None
+        else:
+            claims = {claim: token[claim] for claim in ACCESS_CLAIMS}
+            # В JSON кортеж становится списком
+            claims['personal_grants'] = tuple(claims['personal_grants'])
+            self._access_profile = AccessProfile(**claims)
+
+
+def has_access_claims(token):
+    return all(claim in token.payload for claim in ('username',) + ACCESS_CLAIMS)
+
+
+def claims_revoked(token, user_id):
+    """Утверждения токена устарели, если он выдан до отзыва для пользователя или для всех."""
+    revoked = cache.get_many([REVOKED_USER_KEY.format(user_id=user_id), REVOKED_ALL_KEY])
+    revoked_at = max(revoked.values(), default=None)
+    return revoked_at is not None and token.get('iat', 0) <= revoked_at
+
+
+def _revocation_timeout():
+    # Позже отзыва все выданные ранее access-токены уже истекли
+    return int(settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds())
+
+
+def revoke_user_claims(*user_ids):
+    revoked_at = int(time.time())
+    cache.set_many({REVOKED_USER_KEY.format(user_id=user_id): revoked_at for user_id in user_ids},
+                   _revocation_timeout())
+
+
+def revoke_all_claims():
+    cache.set(REVOKED_ALL_KEY, int(time.time()), _revocation_timeout())
@@ -0,0 +1,45 @@
+import re
+
+# Транслитерация русских имен в латиницу (близко к паспортной) и обратно
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'e', 'ж': 'zh',
+    'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts',
+    'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'yu',
+    'я': 'ya',
+}
+
+# Многобуквенные сочетания проверяются раньше одиночных букв
+LATIN_TO_CYRILLIC = {
+    'shch': 'щ', 'sch': 'щ', 'zh': 'ж', 'kh': 'х', 'ts': 'ц', 'ch': 'ч', 'sh': 'ш',
+    'yu': 'ю', 'ya': 'я', 'yo': 'ё', 'ye': 'е', 'a': 'а', 'b': 'б', 'c': 'к',
+    'd': 'д', 'e': 'е', 'f': 'ф', 'g': 'г', 'h': 'х', 'i': 'и', 'j': 'й', 'k': 'к',
+    'l': 'л', 'm': 'м', 'n': 'н', 'o': 'о', 'p': 'п', 'q': 'к', 'r': 'р', 's': 'с',
+    't': 'т', 'u': 'у', 'v': 'в', 'w': 'в', 'x': 'кс', 'y': 'ы', 'z': 'з',
+}
+
+VOWELS = set('aeiouаеёиоуыэюя')
+
+_LATIN_PATTERN = re.compile('|'.join(sorted(LATIN_TO_CYRILLIC, key=len, reverse=True)))
+
+
+def to_latin(text):
+    return ''.join(CYRILLIC_TO_LATIN.get(char, char) for char in text.lower())
+
+
+def to_cyrillic(text):
+    def replace(match):
+        letters = match.group(0)
+        # После гласной y читается как й: Aleksey, Nikolay
+        if letters == 'y' and match.start() > 0 and match.string[match.start() - 1] in VOWELS:
+            return 'й'
+        return LATIN_TO_CYRILLIC[letters]
+
+    return _LATIN_PATTERN.sub(replace, text.lower())
+
+
+def transliteration_variants(term):
+    """Слово запроса в исходном виде, в латинице и в кириллице, без повторов."""
+    variants = [term, to_latin(term), to_cyrillic(term)]
+    return [variant for index, variant in enumerate(variants)
+            if variant and variant.lower() not in {other.lower() for other in variants[:index]}]
@@ -1,8 +1,13 @@
 from django.urls import path, include
+from rest_framework.routers import DefaultRouter
 from . import views
 
+router = DefaultRouter()
+router.register(r'audit/access-events', views.AccessEventViewSet, basename='access-event')
+
 urlpatterns = [
     path('employees/', include('employees.api.urls')),
     path('documentation/', include('documentation.api.urls')),
     path('research/', include('research.api.urls')),
+    path('', include(router.urls)),
 ]
\ No newline at end of file
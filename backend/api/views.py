@@ -1,4 +1,5 @@
 import logging
+import sys
 from rest_framework import serializers
 from django.shortcuts import render
 from rest_framework import status
@@ -6,20 +7,32 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import RetrieveAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import viewsets
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.exceptions import AuthenticationFailed
+from django_filters.rest_framework import DjangoFilterBackend
+import django_filters
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import ClaimsRefreshToken, add_access_claims
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.conf import settings
 from employees.api.serializers import EmployeeSerializer
 from employees.models import Employee
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.middleware.csrf import get_token
 from rest_framework.throttling import ScopedRateThrottle
 from django.core.cache import cache
 from django.db import connection
 from django.utils import timezone
+from django.views import defaults
+from .db_pool import POOL_TIMEOUT_MESSAGE, is_pool_timeout
+from .metrics import LOGIN_ATTEMPTS, render_metrics
+from .models import AccessEvent
+from .pagination import KeysetPagination
+from .serializers import AccessEventSerializer
 
 auth_logger = logging.getLogger('api.auth')
 api_logger = logging.getLogger('api')
@@ -47,6 +60,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             response = super().post(request, *args, **kwargs)
             
             if response.status_code == 200:
+                LOGIN_ATTEMPTS.labels('success').inc()
                 auth_logger.info(f"Успешный вход пользователя {username} с IP {ip_address}",
                                extra={'action': 'login_success', 
                                       'user': username,
@@ -100,6 +114,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
                     )
                 
             else:
+                LOGIN_ATTEMPTS.labels('failure').inc()
                 auth_logger.warning(f"Неудачная попытка входа пользователя {username} с IP {ip_address}",
                                   extra={'action': 'login_failed',
                                          'user': username,
@@ -109,6 +124,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             return response
             
         except Exception as e:
+            # Неверные учетные данные приходят исключением AuthenticationFailed
+            LOGIN_ATTEMPTS.labels('failure' if isinstance(e, AuthenticationFailed) else 'error').inc()
             auth_logger.error(f"Ошибка при входе пользователя {username} с IP {ip_address} - {str(e)}",
                             extra={'action': 'login_error', 
                                    'user': username,
@@ -185,7 +202,7 @@ class CookieTokenRefreshView(APIView):
                     except Exception:
                         pass
                 
-                new_refresh = RefreshToken.for_user(user)
+                new_refresh = ClaimsRefreshToken.for_user(user)
                 new_access = str(new_refresh.access_token)
                 
                 self.logger.info("Refresh tokens rotated successfully", extra={
@@ -207,7 +224,7 @@ class CookieTokenRefreshView(APIView):
                 
                 return response
             
-            access_token = str(refresh.access_token)
+            access_token = str(add_access_claims(refresh.access_token, user))
             return Response({'access': access_token})
             
         except Exception as e:
@@ -349,7 +366,7 @@ class UserProfileView(RetrieveAPIView):
                        extra={'action': 'get_profile', 'user': username})
         
         try:
-            employee = Employee.objects.get(user=user)
+            employee = Employee.objects.get(user_id=user.id)
             data = {
                 'id': user.id,
                 'username': username,
@@ -373,6 +390,29 @@ class UserProfileView(RetrieveAPIView):
         
         return Response(response_data)
 
+def metrics(request):
+    """
+    Метрики в формате Prometheus для всех воркеров. Требуется Bearer-токен METRICS_TOKEN;
+    без токена эндпоинт открыт только при DEBUG.
+    """
+    if settings.METRICS_TOKEN:
+        if not constant_time_compare(request.headers.get('Authorization', ''),
+                                     f'Bearer {settings.METRICS_TOKEN}'):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+def server_error(request, *args, **kwargs):
+    """handler500: вне представлений DRF исчерпание пула БД тоже отдает 503 с Retry-After."""
+    if is_pool_timeout(sys.exc_info()[1]):
+        response = JsonResponse({'error': True, 'type': 'service_unavailable', 'message': POOL_TIMEOUT_MESSAGE},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = str(settings.DB_POOL_RETRY_AFTER)
+        return response
+    return defaults.server_error(request, *args, **kwargs)
+
 @api_view(['GET'])
 def health_check(request):
     """
@@ -399,4 +439,32 @@ def health_check(request):
             "status": "unhealthy",
             "error": str(e),
             "timestamp": timezone.now().isoformat()
-        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
\ No newline at end of file
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class AccessEventFilter(django_filters.FilterSet):
+    timestamp_after = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='gte')
+    timestamp_before = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='lt')
+
+    class Meta:
+        model = AccessEvent
+        fields = ['object_type', 'object_id', 'user_id', 'username', 'action']
+
+
+class AccessEventViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Журнал обращений к документам и исследованиям, только для администраторов.
+    Границы timestamp_after/timestamp_before отсекают лишние месячные секции таблицы;
+    пагинация по ключу, без COUNT(*) по всему журналу.
+    """
+    throttle_scope = 'api'
+    throttle_classes = [ScopedRateThrottle]
+    permission_classes = [IsAdminUser]
+
+    queryset = AccessEvent.objects.order_by('-timestamp')
+    serializer_class = AccessEventSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = AccessEventFilter
+    pagination_class = KeysetPagination
+    # Число запросов к БД (QUERY_INSPECTION, manage.py check_query_budgets)
+    query_budget = {'list': 2, 'retrieve': 2}
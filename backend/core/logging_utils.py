@@ -1,5 +1,6 @@
 import logging
 from django.utils.timezone import now
+from api.audit_trail import record_access_event
 
 def get_audit_logger():
     return logging.getLogger('audit')
@@ -64,6 +65,7 @@ def log_document_access(request, document, action, duration_ms=None):
         extra['filters'] = dict(request.GET)
     
     audit_logger.info(f"Document {action}", extra=extra)
+    record_access_event(request, document, 'documentation.documentation', action, duration_ms)
     
     if document and hasattr(document, 'required_clearance'):
         if document.required_clearance.number >= 4:
@@ -94,6 +96,7 @@ def log_research_access(request, research, action, duration_ms=None):
         extra['duration_ms'] = duration_ms
     
     audit_logger.info(f"Research {action}", extra=extra)
+    record_access_event(request, research, 'research.research', action, duration_ms)
     
     if research and hasattr(research, 'required_clearance'):
         if research.required_clearance.number >= 4:
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from .models import DocumentType, Documentation
 from employees.models import Cluster, Department, Division, Employee
+from api.pagination import EstimatedCountPaginator
 
 @admin.register(DocumentType)
 class DocumentTypeAdmin(admin.ModelAdmin):
@@ -17,8 +18,12 @@ class DocumentationAdmin(admin.ModelAdmin):
     search_fields = ('title', 'content', 'author__name')
     readonly_fields = ('created_date', 'updated_date')
     date_hierarchy = 'created_date'
-    list_select_related = ('type', 'author', 'required_clearance')
+    # Строка автора (Employee.__str__) включает должность и ее кластер
+    list_select_related = ('type', 'author__position__cluster', 'required_clearance')
     raw_id_fields = ('author',)
+    # Оценка числа строк вместо COUNT(*) на больших таблицах
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     filter_horizontal = ('allowed_clusters', 'allowed_departments', 'allowed_divisions', 'allowed_employees')
 
     fieldsets = (
@@ -50,7 +55,7 @@ class DocumentationAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
-            'type', 'author', 'required_clearance'
+            'type', 'author__position__cluster', 'required_clearance'
         ).prefetch_related(
             'allowed_clusters', 'allowed_departments', 'allowed_divisions', 'allowed_employees'
         )
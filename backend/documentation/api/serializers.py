@@ -1,11 +1,29 @@
 from rest_framework import serializers
 from ..models import Documentation, DocumentType
-from employees.models import Cluster, Department, Division, Employee
+from employees.models import ClearanceLevel, Cluster, Department, Division, Employee
+from employees.api.serializers import ClearanceLevelSerializer, EmployeeSerializer
+from api.serializers import DynamicFieldsMixin
 
-class DocumentListSerializer(serializers.ModelSerializer):
+
+class DocumentTypeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DocumentType
+        fields = ['id', 'name']
+
+
+# Связи, которые по ?expand= выводятся вложенными объектами вместо id
+DOCUMENT_EXPANDABLE_FIELDS = {
+    'type': (DocumentTypeSerializer, {}),
+    'author': (EmployeeSerializer, {}),
+    'required_clearance': (ClearanceLevelSerializer, {}),
+}
+
+
+class DocumentListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.name', read_only=True)
     type_name = serializers.CharField(source='type.name', read_only=True)
     required_clearance_name = serializers.CharField(source='required_clearance.name', read_only=True)
+    headline = serializers.SerializerMethodField()
 
     class Meta:
         model = Documentation
@@ -13,11 +31,22 @@ class DocumentListSerializer(serializers.ModelSerializer):
                   'type', 'type_name',
                   'author', 'author_name',
                   'created_date', 'updated_date',
-                  'required_clearance', 'required_clearance_name']
+                  'required_clearance', 'required_clearance_name',
+                  'headline']
+        # Значения для быстрого вывода списка из строк .values()
+        values_fields = {
+            'required_clearance_name': (('required_clearance__number',), ClearanceLevel.format_name),
+            'headline': (('search_headline',), None),
+        }
+        expandable_fields = DOCUMENT_EXPANDABLE_FIELDS
     read_only_fields = ['created_date', 'updated_date']
 
+    def get_headline(self, obj):
+        # Фрагмент содержимого с подсветкой совпадений, только при поиске
+        return getattr(obj, 'search_headline', None)
+
 
-class DocumentObjectSerializer(serializers.ModelSerializer):
+class DocumentObjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.name', read_only=True)
     type_name = serializers.CharField(source='type.name', read_only=True)
     required_clearance_name = serializers.CharField(source='required_clearance.name', read_only=True)
@@ -37,10 +66,6 @@ class DocumentObjectSerializer(serializers.ModelSerializer):
                   'required_clearance_name',
                   'allowed_clusters', 'allowed_departments',
                   'allowed_divisions', 'allowed_employees']
+        expandable_fields = DOCUMENT_EXPANDABLE_FIELDS
     read_only_fields = ['created_date', 'updated_date']
 
-
-class DocumentTypeSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = DocumentType
-        fields = ['id', 'name']
\ No newline at end of file
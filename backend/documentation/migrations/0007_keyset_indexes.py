@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0006_documentation_search_vector_and_more'),
+        ('employees', '0009_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentation',
+            index=models.Index(fields=['required_clearance', 'id'], name='documentati_require_3f8cdd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentation',
+            index=models.Index(fields=['created_date', 'id'], name='documentati_created_769390_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Cluster, Department, Division, Position, ClearanceLevel, Employee
+from api.pagination import EstimatedCountPaginator
 
 @admin.register(Cluster)
 class ClusterAdmin(admin.ModelAdmin):
@@ -51,8 +52,12 @@ class EmployeeAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'clearance_level', 'division__department__cluster', 'position', 'division')
     search_fields = ('name', 'user__username', 'user__email', 'division__name')
     readonly_fields = ('get_department', 'get_cluster')
-    list_select_related = ('position', 'division__department__cluster', 'clearance_level', 'user')
+    # Position.__str__ выводит кластер должности
+    list_select_related = ('position__cluster', 'division__department__cluster', 'clearance_level', 'user')
     raw_id_fields = ('user',)
+    # Оценка числа строк вместо COUNT(*) на больших таблицах
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (None, {
@@ -93,7 +98,7 @@ class EmployeeAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'division__department__cluster',
-            'position',
+            'position__cluster',
             'clearance_level',
             'user'
         )
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from ..models import Cluster, Department, Division, Position, ClearanceLevel, Employee
+from api.serializers import DynamicFieldsMixin
 
 class ClusterSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,20 +31,24 @@ class ClearanceLevelSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClearanceLevel
         fields = '__all__'
+        values_fields = {'name': (('number',), ClearanceLevel.format_name)}
 
-class EmployeeSerializer(serializers.ModelSerializer):
-    clearance_level = ClearanceLevelSerializer(read_only=True)
-    cluster = ClusterSerializer(read_only=True)
-    department = DepartmentSerializer(read_only=True)
-    division = DivisionSerializer(read_only=True)
-    position = PositionSerializer(read_only=True)
-
+class EmployeeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['id', 'name', 'is_active',
                   'clearance_level', 'cluster',
                   'department', 'division',
                   'position', 'profile_picture']
+        expandable_fields = {
+            'clearance_level': (ClearanceLevelSerializer, {}),
+            'cluster': (ClusterSerializer, {'source': 'division.department.cluster'}),
+            'department': (DepartmentSerializer, {'source': 'division.department'}),
+            'division': (DivisionSerializer, {}),
+            'position': (PositionSerializer, {}),
+        }
+        # Без ?expand= сотрудник выводится со всеми вложенными объектами, как раньше
+        default_expand = ('clearance_level', 'cluster', 'department', 'division', 'position')
         
 class EmployeeFilterSerializer(serializers.Serializer):
     clusters = ClusterSerializer(many=True, read_only=True)
@@ -5,14 +5,17 @@ from django_filters import rest_framework as django_filters
 from ..models import Employee, Cluster, Department, Division, Position, ClearanceLevel
 from .serializers import EmployeeSerializer, ClusterSerializer, DepartmentSerializer, DivisionSerializer, PositionSerializer, ClearanceLevelSerializer, EmployeeFilterSerializer
 from api.permissions import ReadOnly
+from api.filters import NameSearchFilter
+from api.pagination import KeysetOrPageNumberPagination
+from api.cache import cache_response
+from api.serializers import optimize_for_serializer
+from api.compiled_serializers import CompiledListMixin
 from core.logging_utils import log_suspicious_activity
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.throttling import ScopedRateThrottle
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
 import time
 import logging
 
@@ -47,23 +50,35 @@ class EmployeeFilter(django_filters.FilterSet):
         model = Employee
         fields = {}
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(CompiledListMixin, viewsets.ModelViewSet):
     throttle_scope = 'api'
     throttle_classes = [ScopedRateThrottle]
 
     def get_queryset(self):
-        return Employee.objects.select_related(
+        queryset = Employee.objects.select_related(
             'user',
             'clearance_level', 
             'division__department__cluster',
             'position' 
         ).order_by('name')
+
+        # Загружаются только связи и столбцы полей ответа (?fields=, ?expand=)
+        # (список из строк .values() собирает скомпилированный план сериализатора)
+        if self.action in ('list', 'retrieve') and self.compiled_serializer is None:
+            queryset = optimize_for_serializer(
+                queryset, self.get_serializer(),
+                select_related=('clearance_level', 'division') if self.action == 'retrieve' else (),
+            )
+        return queryset
     
     serializer_class = EmployeeSerializer
     permission_classes = [ReadOnly]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, NameSearchFilter, filters.OrderingFilter]
     filterset_class = EmployeeFilter
+    pagination_class = KeysetOrPageNumberPagination
+    # Число запросов к БД (QUERY_INSPECTION, manage.py check_query_budgets)
+    query_budget = {'list': 3, 'retrieve': 2, 'my_profile': 2}
     
     search_fields = ['name']
     
@@ -73,7 +88,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         'division__department__cluster__name'
     ]
 
-    @method_decorator(cache_page(60 * 5))
+    @cache_response(60 * 30, namespaces=('employees',))
     def list(self, request, *args, **kwargs):
         start_time = time.time()
         
@@ -116,7 +131,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             )
             raise
 
-    @method_decorator(cache_page(60 * 10))
+    @cache_response(60 * 60, namespaces=('employees',))
     def retrieve(self, request, *args, **kwargs):
         start_time = time.time()
         
@@ -144,7 +159,8 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 }
             )
             
-            return super().retrieve(request, *args, **kwargs)
+            # Объект уже загружен и проверен get_object: повторная выборка удваивала запросы
+            return Response(self.get_serializer(employee).data)
             
         except Exception as e:
             duration_ms = int((time.time() - start_time) * 1000)
@@ -170,7 +186,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 'clearance_level', 
                 'division__department__cluster',
                 'position'
-            ).get(user=request.user)
+            ).get(user_id=request.user.id)
             
             serializer = self.get_serializer(employee)
             duration_ms = int((time.time() - start_time) * 1000)
@@ -226,7 +242,7 @@ class ClusterViewSet(viewsets.ModelViewSet):
     queryset = Cluster.objects.all()
     serializer_class = ClusterSerializer
 
-    @method_decorator(cache_page(60 * 60))
+    @cache_response(60 * 60 * 6, namespaces=('org',), local=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -235,7 +251,7 @@ class DepartmentViewSet(viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
 
-    @method_decorator(cache_page(60 * 60))
+    @cache_response(60 * 60 * 6, namespaces=('org',), local=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -244,7 +260,7 @@ class DivisionViewSet(viewsets.ModelViewSet):
     queryset = Division.objects.all()
     serializer_class = DivisionSerializer
 
-    @method_decorator(cache_page(60 * 60))
+    @cache_response(60 * 60 * 6, namespaces=('org',), local=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -253,7 +269,7 @@ class PositionViewSet(viewsets.ModelViewSet):
     queryset = Position.objects.all()
     serializer_class = PositionSerializer
 
-    @method_decorator(cache_page(60 * 60))
+    @cache_response(60 * 60 * 6, namespaces=('org',), local=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -262,7 +278,7 @@ class ClearanceLevelViewSet(viewsets.ModelViewSet):
     queryset = ClearanceLevel.objects.all()
     serializer_class = ClearanceLevelSerializer
 
-    @method_decorator(cache_page(60 * 60))
+    @cache_response(60 * 60 * 6, namespaces=('org',), local=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -272,7 +288,7 @@ class EmployeeFiltersAPIView(APIView):
 
     queryset = Cluster.objects.all().order_by('id')
 
-    @method_decorator(cache_page(60 * 60))
+    @cache_response(60 * 60 * 6, namespaces=('org',), local=True)
     def get(self, request):
         username = request.user.username if request.user.is_authenticated else 'Anonymous'
         logger.info(f"Запрос фильтров сотрудников от пользователя: {username}",
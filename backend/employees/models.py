@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 
 # Модель Кластер
 class Cluster(models.Model):
@@ -62,9 +64,13 @@ class ClearanceLevel(models.Model):
         verbose_name = 'Уровень Допуска'
         verbose_name_plural = 'Уровни Допуска'
 
+    @staticmethod
+    def format_name(number):
+        return f"{number}-У.Д."
+
     @property
     def name(self):
-        return f"{self.number}-У.Д."
+        return self.format_name(self.number)
 
     def __str__(self):
         return self.name
@@ -91,6 +97,13 @@ class Employee(models.Model):
     class Meta:
         verbose_name = 'Сотрудник'
         verbose_name_plural = 'Сотрудники'
+        indexes = [
+            # Поиск по подстроке (UPPER(name) LIKE) и по триграммному сходству имени
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='employee_name_upper_trgm'),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='employee_name_trgm'),
+            # Ключевая пагинация справочника по имени с добавленным id
+            models.Index(fields=['name', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.position})"
\ No newline at end of file
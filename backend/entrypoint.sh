@@ -9,16 +9,59 @@ if [ -n "$DB_HOST" ] && [ -n "$DB_PORT" ]; then
     echo "PostgreSQL is ready."
 fi
 
+# Метрики воркеров gunicorn собираются через общий каталог; значения прошлого запуска удаляются,
+# значения завершившихся воркеров - хуком child_exit в gunicorn.conf.py
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Процесс записи журналов перезапускается при падении; по SIGTERM он дописывает
+# принятые строки и завершается
+supervise_log_writer() {
+    local writer status
+    trap 'kill -TERM "$writer" 2>/dev/null; wait "$writer" || true; exit 0' TERM INT
+    while true; do
+        python manage.py log_writer &
+        writer=$!
+        status=0
+        wait "$writer" || status=$?
+        echo "Log writer exited with status $status, restarting..." >&2
+        sleep 1
+    done
+}
+
+echo "Starting log writer..."
+supervise_log_writer &
+LOG_WRITER_PID=$!
+
 echo "Applying database migrations..."
 python manage.py migrate --noinput
 
+# Дальше секции создает сервис access-event-partitions (docker-compose.yml) раз в сутки
+echo "Creating access event partitions..."
+python manage.py access_event_partitions
+
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
 echo "Starting Gunicorn..."
-exec python -m gunicorn secret_lab.wsgi:application \
+python -m gunicorn secret_lab.wsgi:application \
+    --config gunicorn.conf.py \
     --bind 0.0.0.0:8000 \
     --workers 3 \
     --log-level info \
     --access-logfile - \
-    --error-logfile -
\ No newline at end of file
+    --error-logfile - &
+GUNICORN_PID=$!
+
+# Оболочка остается PID 1: SIGTERM передается gunicorn, после остановки воркеров
+# останавливается процесс записи журналов, чтобы последние пачки попали в файлы
+trap 'kill -TERM "$GUNICORN_PID" 2>/dev/null' TERM INT
+status=0
+while kill -0 "$GUNICORN_PID" 2>/dev/null; do
+    wait "$GUNICORN_PID" || status=$?
+done
+
+kill -TERM "$LOG_WRITER_PID" 2>/dev/null || true
+wait "$LOG_WRITER_PID" || true
+exit "$status"
@@ -0,0 +1,10 @@
+import os
+
+
+def child_exit(server, worker):
+    # Значения livesum-метрик (соединения пула БД) завершившегося воркера удаляются,
+    # иначе они суммируются с живыми воркерами до перезапуска контейнера
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import ResearchStatus, Research
+from api.pagination import EstimatedCountPaginator
 
 @admin.register(ResearchStatus)
 class ResearchStatusAdmin(admin.ModelAdmin):
@@ -17,8 +18,12 @@ class ResearchAdmin(admin.ModelAdmin):
     readonly_fields = ('created_date', 'updated_date')
     filter_horizontal = ('team', 'allowed_clusters', 'allowed_departments', 'allowed_divisions', 'allowed_employees')
     date_hierarchy = 'created_date'
-    list_select_related = ('lead', 'status', 'required_clearance')
+    # Строка руководителя (Employee.__str__) включает должность и ее кластер
+    list_select_related = ('lead__position__cluster', 'status', 'required_clearance')
     raw_id_fields = ('lead',)
+    # Оценка числа строк вместо COUNT(*) на больших таблицах
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (None, {
@@ -64,5 +69,5 @@ class ResearchAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
-            'lead', 'status', 'required_clearance'
+            'lead__position__cluster', 'status', 'required_clearance'
         ).prefetch_related('team', 'allowed_clusters', 'allowed_departments', 'allowed_divisions', 'allowed_employees')
\ No newline at end of file
@@ -1,11 +1,30 @@
 from rest_framework import serializers
 from ..models import Research, ResearchStatus
+from employees.models import ClearanceLevel
+from employees.api.serializers import ClearanceLevelSerializer, EmployeeSerializer
+from api.serializers import DynamicFieldsMixin
 
 
-class ResearchListSerializer(serializers.ModelSerializer):
+class ResearchStatusSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResearchStatus
+        fields = ['id', 'name']
+
+
+# Связи, которые по ?expand= выводятся вложенными объектами вместо id
+RESEARCH_EXPANDABLE_FIELDS = {
+    'status': (ResearchStatusSerializer, {}),
+    'lead': (EmployeeSerializer, {}),
+    'team': (EmployeeSerializer, {'many': True}),
+    'required_clearance': (ClearanceLevelSerializer, {}),
+}
+
+
+class ResearchListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     lead_name = serializers.CharField(source='lead.name', read_only=True)
     status_name = serializers.CharField(source='status.name', read_only=True)
     required_clearance_name = serializers.CharField(source='required_clearance.name', read_only=True)
+    headline = serializers.SerializerMethodField()
 
     class Meta:
         model = Research
@@ -13,11 +32,22 @@ class ResearchListSerializer(serializers.ModelSerializer):
                   'status', 'status_name',
                   'lead', 'lead_name',
                   'required_clearance', 'required_clearance_name',
-                  'created_date', 'updated_date']
+                  'created_date', 'updated_date',
+                  'headline']
+        # Значения для быстрого вывода списка из строк .values()
+        values_fields = {
+            'required_clearance_name': (('required_clearance__number',), ClearanceLevel.format_name),
+            'headline': (('search_headline',), None),
+        }
+        expandable_fields = RESEARCH_EXPANDABLE_FIELDS
     read_only_fields = ['created_date', 'updated_date']
+
+    def get_headline(self, obj):
+        # Фрагмент содержимого с подсветкой совпадений, только при поиске
+        return getattr(obj, 'search_headline', None)
     
 
-class ResearchObjectSerializer(serializers.ModelSerializer):
+class ResearchObjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     lead_name = serializers.CharField(source='lead.name', read_only=True)
     team_members = serializers.SerializerMethodField()
     status_name = serializers.CharField(source='status.name', read_only=True)
@@ -39,12 +69,9 @@ class ResearchObjectSerializer(serializers.ModelSerializer):
                   'created_date', 'updated_date',
                   'allowed_clusters', 'allowed_departments',
                   'allowed_divisions', 'allowed_employees']
+        expandable_fields = RESEARCH_EXPANDABLE_FIELDS
+        method_field_relations = {'team_members': ('team',)}
     read_only_fields = ['created_date', 'updated_date']
 
     def get_team_members(self, obj) -> list:
         return [employee.name for employee in obj.team.all()]
-    
-class ResearchStatusSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ResearchStatus
-        fields = ['id', 'name']
\ No newline at end of file
@@ -3,10 +3,14 @@ from django_filters.rest_framework import DjangoFilterBackend
 from ..models import Research, ResearchStatus
 from .serializers import ResearchListSerializer, ResearchObjectSerializer, ResearchStatusSerializer
 from api.permissions import ReadOnly, HasRequiredClearanceLevel
+from api.filters import ClearanceFilterBackend, FullTextSearchFilter
+from api.pagination import KeysetOrPageNumberPagination
+from api.cache import cache_response
+from api.serializers import optimize_for_serializer
+from api.compiled_serializers import CompiledListMixin
 from core.logging_utils import log_research_access, log_suspicious_activity
 from rest_framework.throttling import ScopedRateThrottle
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from rest_framework.response import Response
 import django_filters
 import time
 import logging
@@ -23,19 +27,21 @@ class ResearchFilter(django_filters.FilterSet):
         model = Research
         fields = {}
 
-class ResearchViewSet(viewsets.ModelViewSet):
+class ResearchViewSet(CompiledListMixin, viewsets.ModelViewSet):
     throttle_scope = 'api'
     throttle_classes = [ScopedRateThrottle]
 
     permission_classes = [HasRequiredClearanceLevel]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_class = ResearchFilter
+    pagination_class = KeysetOrPageNumberPagination
+    # Число запросов к БД (QUERY_INSPECTION, manage.py check_query_budgets)
+    query_budget = {'list': 5, 'retrieve': 8}
     
-    search_fields = ['title',
-                     'lead__name',
-                     'team__name',
-                     'content']
+    # Заголовок и содержимое ищутся по search_vector (FullTextSearchFilter)
+    search_fields = ['lead__name',
+                     'team__name']
     
     ordering_fields = ['title',
                        'lead__division__name',
@@ -47,7 +53,7 @@ class ResearchViewSet(viewsets.ModelViewSet):
     serializer_class = ResearchObjectSerializer
     
     def get_queryset(self):
-        return Research.objects.select_related(
+        queryset = Research.objects.select_related(
             'lead',
             'status',
             'required_clearance'
@@ -58,13 +64,27 @@ class ResearchViewSet(viewsets.ModelViewSet):
             'allowed_divisions',
             'allowed_employees'
         ).order_by('required_clearance')
+
+        # Загружаются только связи и столбцы полей ответа (?fields=, ?expand=);
+        # детальному просмотру нужны связи для проверки доступа и журнала
+        # (список из строк .values() собирает скомпилированный план сериализатора)
+        if self.action in ('list', 'retrieve') and self.compiled_serializer is None:
+            queryset = optimize_for_serializer(
+                queryset, self.get_serializer(),
+                select_related=('status', 'required_clearance') if self.action == 'retrieve' else (),
+            )
+
+        # Список содержит только доступные объекты, детальный просмотр проверяется HasRequiredClearanceLevel
+        if self.action == 'list':
+            queryset = ClearanceFilterBackend().filter_queryset(self.request, queryset, self)
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
             return ResearchListSerializer
         return ResearchObjectSerializer
 
-    @method_decorator(cache_page(60 * 5))
+    @cache_response(60 * 30, namespaces=('research',), access_aware=True)
     def list(self, request, *args, **kwargs):
         start_time = time.time()
         
@@ -132,7 +152,8 @@ class ResearchViewSet(viewsets.ModelViewSet):
                 }
             )
             
-            return super().retrieve(request, *args, **kwargs)
+            # Объект уже загружен и проверен get_object: повторная выборка удваивала запросы
+            return Response(self.get_serializer(research).data)
             
         except Exception as e:
             duration_ms = int((time.time() - start_time) * 1000)
@@ -156,6 +177,6 @@ class ResearchStatusViewSet(viewsets.ModelViewSet):
     queryset = ResearchStatus.objects.all()
     serializer_class = ResearchStatusSerializer
 
-    @method_decorator(cache_page(60 * 60))
+    @cache_response(60 * 60 * 6, namespaces=('research_statuses',), local=True)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0007_alter_division_department'),
+        ('research', '0004_research_allowed_clusters_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='research',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('content', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), output_field=django.contrib.postgres.search.SearchVectorField(), verbose_name='Поисковый Вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='research',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='research_re_search__0c4e7a_gin'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0009_keyset_indexes'),
+        ('research', '0005_research_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='research',
+            index=models.Index(fields=['required_clearance', 'id'], name='research_re_require_41cfe0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='research',
+            index=models.Index(fields=['created_date', 'id'], name='research_re_created_c7db1b_idx'),
+        ),
+    ]
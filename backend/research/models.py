@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from employees.models import Employee, ClearanceLevel, Cluster, Department, Division
 
 # Модель Статус Исследования
@@ -26,11 +28,24 @@ class Research(models.Model):
     allowed_departments = models.ManyToManyField(Department, blank=True, verbose_name="Доступ Департаментам")
     allowed_divisions = models.ManyToManyField(Division, blank=True, verbose_name="Доступ Отделам")
     allowed_employees = models.ManyToManyField(Employee, related_name="research_allowed", blank=True, verbose_name="Доступ Сотрудникам")
+    search_vector = models.GeneratedField(
+        expression=(SearchVector('title', weight='A', config='russian')
+                    + SearchVector('content', weight='B', config='russian')),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name='Поисковый Вектор',
+    )
 
     class Meta:
         verbose_name = 'Исследование'
         verbose_name_plural = 'Исследования'
         ordering = ['-created_date']
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            # Ключевая пагинация по сортировкам списка с добавленным id
+            models.Index(fields=['required_clearance', 'id']),
+            models.Index(fields=['created_date', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.status.name})"
\ No newline at end of file
@@ -110,6 +110,8 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_OBTAIN_SERIALIZER': 'api.tokens.ClaimsTokenObtainPairSerializer',
+    'TOKEN_USER_CLASS': 'api.tokens.ClaimsUser',
     
     'AUTH_COOKIE_ACCESS': 'access_token',
     'AUTH_COOKIE_REFRESH': 'refresh_token',
@@ -160,6 +162,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -173,7 +176,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'django.middleware.cache.UpdateCacheMiddleware',
+    'api.instrumentation.RequestProfilingMiddleware',
+    'api.metrics.MetricsMiddleware',
+    'api.query_inspection.QueryInspectionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -183,7 +188,6 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'api.middleware.RequestLoggingMiddleware',
-    'django.middleware.cache.FetchFromCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'secret_lab.urls'
@@ -217,9 +221,28 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'password'),
         'HOST': os.getenv('DB_HOST', 'db'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Соединение переиспользуется между запросами воркера и проверяется перед повторным использованием
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+        # Для pgbouncer в режиме transaction: серверные курсоры iterator() не переживают смену соединения
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'False').lower() == 'true',
+        'OPTIONS': {},
     }
 }
 
+# Пул соединений psycopg_pool в каждом воркере (DB_POOL=True) вместо CONN_MAX_AGE.
+# DB_POOL_TIMEOUT - сколько секунд запрос ждет свободное соединение, после чего получает 503
+if os.getenv('DB_POOL', 'False').lower() == 'true':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '4')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '5')),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+    }
+DB_POOL_RETRY_AFTER = int(os.getenv('DB_POOL_RETRY_AFTER', '1'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -271,7 +294,7 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'api.auth_logging.AuditedJWTAuthentication',
+        'api.auth_logging.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     # 'DEFAULT_PERMISSION_CLASSES': (
@@ -282,6 +305,16 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    # JSON кодируется и разбирается через orjson
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     
@@ -302,7 +335,7 @@ REST_FRAMEWORK = {
 
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        'BACKEND': 'api.instrumentation.InstrumentedRedisCache',
         'LOCATION': os.getenv('REDIS_URL', 'redis://redis:6379/1'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
@@ -317,6 +350,12 @@ CACHES = {
     }
 }
 
+# Индекс доступа (api.AccessEntry) вместо обхода allowed_* при проверке видимости
+ACCESS_CONTROL_INDEX = os.getenv('ACCESS_CONTROL_INDEX', 'True').lower() == 'true'
+
+# Начиная с этого числа строк пагинация и админка берут оценку планировщика вместо COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ESTIMATED_COUNT_THRESHOLD', '10000'))
+
 REDIS_CONFIG = {
     'maxmemory': '500mb',
     'maxmemory-policy': 'allkeys-lru',
@@ -330,7 +369,52 @@ SESSION_CACHE_ALIAS = 'default'
 CACHE_MIDDLEWARE_ALIAS = 'default'
 CACHE_MIDDLEWARE_SECONDS = 300
 CACHE_MIDDLEWARE_KEY_PREFIX = 'secret_lab'
-CACHE_MIDDLEWARE_ANONYMOUS_ONLY = True
+
+# Время запроса по участкам (БД, кеш, права, сериализация, рендеринг) в заголовке Server-Timing;
+# запросы дольше SLOW_REQUEST_MS записываются в журнал с той же разбивкой
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', str(DEBUG)).lower() == 'true'
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '1000'))
+
+# Метрики Prometheus (/api/metrics). Воркеры gunicorn объединяются через каталог
+# PROMETHEUS_MULTIPROC_DIR (задается в entrypoint.sh). Эндпоинт закрыт Bearer-токеном METRICS_TOKEN;
+# без токена метрики отдаются только при DEBUG
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Поиск N+1 и проверка query_budget представлений в каждом запросе: off, log или raise
+# (для разработки и тестов). Проверка в CI без сервера: manage.py check_query_budgets
+QUERY_INSPECTION = os.getenv('QUERY_INSPECTION', 'off').lower()
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', '5'))
+
+# Записи журналов пишутся потоком очереди в каждом воркере (api.log_queue)
+LOGGING_CONFIG = 'api.log_queue.configure_logging'
+LOG_QUEUE_ENABLED = os.getenv('LOG_QUEUE_ENABLED', 'True').lower() == 'true'
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv('LOG_QUEUE_BLOCK_TIMEOUT', '0.05'))
+
+# Журнал обращений к документам и исследованиям в БД (api.AccessEvent), запись пачками
+ACCESS_EVENTS_ENABLED = os.getenv('ACCESS_EVENTS_ENABLED', 'True').lower() == 'true'
+ACCESS_EVENTS_BATCH_SIZE = int(os.getenv('ACCESS_EVENTS_BATCH_SIZE', '500'))
+ACCESS_EVENTS_FLUSH_INTERVAL = float(os.getenv('ACCESS_EVENTS_FLUSH_INTERVAL', '5'))
+ACCESS_EVENTS_BUFFER_MAX_SIZE = int(os.getenv('ACCESS_EVENTS_BUFFER_MAX_SIZE', '50000'))
+
+# Единственный процесс записи файлов журналов для всех воркеров (manage.py log_writer)
+LOG_WRITER_SOCKET = os.getenv('LOG_WRITER_SOCKET', '/tmp/secret_lab_log_writer.sock')
+LOG_WRITER_SEND_TIMEOUT = float(os.getenv('LOG_WRITER_SEND_TIMEOUT', '1.0'))
+LOG_WRITER_FLUSH_INTERVAL = float(os.getenv('LOG_WRITER_FLUSH_INTERVAL', '0.2'))
+LOG_WRITER_FILES = {
+    'app': {'filename': 'logs/app.log', 'max_bytes': 1024*1024*10, 'backup_count': 5},
+    'errors': {'filename': 'logs/errors.log', 'max_bytes': 1024*1024*10, 'backup_count': 5},
+    'security': {'filename': 'logs/security.log', 'max_bytes': 1024*1024*10, 'backup_count': 10},
+}
+
+# Выборочная запись частых успешных событий: {event_type: доля сохраняемых, максимум за интервал}
+LOG_SAMPLING_ENABLED = os.getenv('LOG_SAMPLING_ENABLED', 'True').lower() == 'true'
+LOG_SAMPLING_INTERVAL = int(os.getenv('LOG_SAMPLING_INTERVAL', '60'))
+LOG_SAMPLING_RULES = {
+    'request_started': {'rate': float(os.getenv('LOG_SAMPLE_RATE_REQUESTS', '0.01')), 'limit': 60},
+    'jwt_auth': {'rate': float(os.getenv('LOG_SAMPLE_RATE_JWT_AUTH', '0.01')), 'limit': 60},
+    'clearance_check': {'rate': float(os.getenv('LOG_SAMPLE_RATE_CLEARANCE_CHECK', '0.1')), 'limit': 600},
+}
 
 LOGGING = {
     'version': 1,
@@ -353,6 +437,11 @@ LOGGING = {
         'require_debug_false': {
             '()': 'django.utils.log.RequireDebugFalse',
         },
+        'sampling': {
+            '()': 'api.log_sampling.SamplingFilter',
+            'rules': LOG_SAMPLING_RULES if LOG_SAMPLING_ENABLED else {},
+            'interval': LOG_SAMPLING_INTERVAL,
+        },
     },
     
     'handlers': {
@@ -368,32 +457,24 @@ LOGGING = {
             'formatter': 'json',
             'stream': sys.stdout,
         },
+        # Файлы пишет отдельный процесс manage.py log_writer (см. LOG_WRITER_FILES)
         'file_app': {
             'level': 'INFO',
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': 'logs/app.log',
-            'maxBytes': 1024*1024*10,
-            'backupCount': 5,
+            'class': 'api.log_writer.LogWriterHandler',
+            'destination': 'app',
             'formatter': 'json',
-            'encoding': 'utf-8',
         },
         'file_errors': {
             'level': 'WARNING',
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': 'logs/errors.log',
-            'maxBytes': 1024*1024*10,
-            'backupCount': 5,
+            'class': 'api.log_writer.LogWriterHandler',
+            'destination': 'errors',
             'formatter': 'json',
-            'encoding': 'utf-8',
         },
         'file_security': {
             'level': 'INFO',
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': 'logs/security.log',
-            'maxBytes': 1024*1024*10,
-            'backupCount': 10,
+            'class': 'api.log_writer.LogWriterHandler',
+            'destination': 'security',
             'formatter': 'json',
-            'encoding': 'utf-8',
         },
         'mail_admins': {
             'level': 'ERROR',
@@ -441,6 +522,7 @@ LOGGING = {
         },
         'api.security': {
             'handlers': ['file_security', 'json_console', 'mail_admins'],
+            'filters': ['sampling'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -36,4 +36,7 @@ urlpatterns = [
     path('api/auth/profile/', UserProfileView.as_view(), name='user_profile'),
     path('api/auth/csrf/', views.get_csrf_token, name='get_csrf_token'),
     path('api/health/', views.health_check, name='health-check'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path('api/metrics', views.metrics, name='metrics'),
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+handler500 = 'api.views.server_error'